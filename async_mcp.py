@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Asyncio variant of the MCP STDIO session used by `llm_query_trino.py`.
+
+The FastAPI app in `llm_trino_api.py` uses this so concurrent HTTP requests overlap
+their waits on the MCP server instead of blocking the event loop one at a time.
+Requests are pipelined: each one is written as soon as it arrives and a single
+background reader task hands responses back to their callers by JSON-RPC id.
+"""
+import asyncio
+import collections
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional, Tuple
+
+from llm_query_trino import (
+    DEFAULT_CATALOG,
+    DEFAULT_SCHEMA,
+    INITIALIZED_NOTIFICATION,
+    REQUEST_TIMEOUT,
+    STARTUP_TIMEOUT,
+    STDERR_HISTORY,
+    build_mcp_command,
+    dumps_bytes,
+    encode_initialize,
+    encode_query_call,
+    loads,
+    parse_query_response,
+)
+
+logger = logging.getLogger(__name__)
+
+# asyncio's default 64 KiB line limit is too small for large query results
+STREAM_LIMIT = 16 * 1024 * 1024
+
+class AsyncMCPSession:
+    """
+    A long-lived, pipelined MCP session over STDIO using asyncio subprocesses.
+    """
+
+    def __init__(
+        self,
+        catalog: str = DEFAULT_CATALOG,
+        client_name: str = "llm-trino-api",
+        startup_timeout: float = STARTUP_TIMEOUT,
+        request_timeout: float = REQUEST_TIMEOUT
+    ):
+        """
+        Initialize the session (the subprocess is not started until first use).
+
+        Args:
+            catalog: Default catalog the MCP server connects with
+            client_name: Client name reported during the initialize handshake
+            startup_timeout: Seconds to wait for the initialize response
+            request_timeout: Seconds to wait for the responses to a request
+        """
+        self.catalog = catalog
+        self.client_name = client_name
+        self.startup_timeout = startup_timeout
+        self.request_timeout = request_timeout
+        self.proc: Optional[asyncio.subprocess.Process] = None
+        # Only set once the initialized notification has been sent: until then
+        # nothing but the handshake may be written to the server
+        self._initialized = False
+        self.stderr_lines: collections.deque = collections.deque(maxlen=STDERR_HISTORY)
+        self._id_counter = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _build_command(self) -> List[str]:
+        """Build the command used to launch the MCP server with STDIO transport."""
+        return build_mcp_command(self.catalog)
+
+    def _next_id(self) -> int:
+        self._id_counter += 1
+        return self._id_counter
+
+    @property
+    def is_running(self) -> bool:
+        return self.proc is not None and self.proc.returncode is None
+
+    @property
+    def is_ready(self) -> bool:
+        """True once the server is running and the handshake has completed."""
+        return self._initialized and self.is_running
+
+    def _bind_loop(self) -> None:
+        """
+        Tie the session to the running event loop.
+
+        asyncio subprocess pipes only work on the loop that created them, so a
+        session reused from a new loop (e.g. successive asyncio.run() calls)
+        abandons the old subprocess and starts over.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+
+        if self.is_running:
+            try:
+                self.proc.kill()
+            except Exception:
+                pass
+        self.proc = None
+        self._initialized = False
+        self._reader_task = None
+        self._stderr_task = None
+        self._pending = {}
+        self._start_lock = asyncio.Lock()
+        self._loop = loop
+
+    async def _read_responses(self) -> None:
+        """Read response lines and resolve the matching pending futures."""
+        try:
+            while True:
+                line = await self.proc.stdout.readline()
+                if not line:
+                    break
+
+                try:
+                    response = loads(line)
+                except ValueError:
+                    continue
+
+                # Server notifications have no id and are ignored
+                future = self._pending.pop(response.get("id"), None)
+                if future and not future.done():
+                    future.set_result(response)
+        finally:
+            # The server went away - fail everyone still waiting
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("MCP server closed the connection"))
+
+    async def _drain_stderr(self, stream: asyncio.StreamReader) -> None:
+        """Keep reading the server's stderr so it can never fill the pipe buffer."""
+        while True:
+            line = await stream.readline()
+            if not line:
+                break
+            self.stderr_lines.append(line)
+
+    def _register(self, count: int) -> Tuple[List[int], List[asyncio.Future]]:
+        """Assign request ids and register a future for each pending response."""
+        loop = asyncio.get_running_loop()
+        request_ids = [self._next_id() for _ in range(count)]
+        futures = []
+        for request_id in request_ids:
+            future = loop.create_future()
+            self._pending[request_id] = future
+            futures.append(future)
+        return request_ids, futures
+
+    async def _exchange(
+        self,
+        payload: bytes,
+        request_ids: List[int],
+        futures: List[asyncio.Future],
+        timeout: Optional[float] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Write pre-encoded JSON-RPC lines in one write and await their responses.
+
+        Waits at most `timeout` seconds (default: the session's request timeout).
+        The ids are unregistered however the wait ends, so a timed out or
+        cancelled caller leaves nothing behind in `_pending`.
+        """
+        try:
+            self.proc.stdin.write(payload)
+            await self.proc.stdin.drain()
+            return list(await asyncio.wait_for(
+                asyncio.gather(*futures),
+                timeout=self.request_timeout if timeout is None else timeout
+            ))
+        finally:
+            for request_id in request_ids:
+                self._pending.pop(request_id, None)
+
+    async def _start(self) -> None:
+        """Spawn the MCP server and perform the initialize handshake."""
+        self.proc = await asyncio.create_subprocess_exec(
+            *self._build_command(),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LIMIT
+        )
+        self._reader_task = asyncio.create_task(self._read_responses())
+        self._stderr_task = asyncio.create_task(self._drain_stderr(self.proc.stderr))
+
+        # No start-up sleep: wait (bounded) for the initialize response instead
+        try:
+            request_ids, futures = self._register(1)
+            [response] = await self._exchange(
+                encode_initialize(request_ids[0], self.client_name), request_ids, futures,
+                timeout=self.startup_timeout
+            )
+            # A rejected handshake would otherwise leave a session every call fails on
+            if response is None:
+                raise RuntimeError("No initialize response")
+            if "error" in response:
+                raise RuntimeError(f"initialize failed: {response['error']}")
+
+            self.proc.stdin.write(INITIALIZED_NOTIFICATION)
+            await self.proc.stdin.drain()
+        except Exception as e:
+            await self.close()
+            raise RuntimeError("Failed to initialize MCP") from e
+
+        self._initialized = True
+
+    async def ensure_started(self) -> None:
+        """
+        Start the MCP server if it is not running (or has died).
+
+        Callers arriving while another one is starting the server wait on the
+        start lock, so no request is written before the handshake completes.
+        """
+        self._bind_loop()
+        if self.is_ready:
+            return
+
+        async with self._start_lock:
+            if not self.is_ready:
+                if self.is_running:
+                    # Left half started by a failed or cancelled start: begin again
+                    await self.close()
+                await self._start()
+
+    async def execute_batch(self, requests: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Send several JSON-RPC requests in a single write and await their responses.
+
+        Args:
+            requests: JSON-RPC requests without ids (ids are assigned here)
+
+        Returns:
+            Responses in the same order as the requests
+        """
+        if not requests:
+            return []
+
+        await self.ensure_started()
+
+        request_ids, futures = self._register(len(requests))
+        payload = b"".join(
+            dumps_bytes(dict(request, id=request_id)) + b"\n"
+            for request_id, request in zip(request_ids, requests)
+        )
+        return await self._exchange(payload, request_ids, futures)
+
+    async def execute_queries(
+        self,
+        sql_queries: List[str],
+        catalog: str = DEFAULT_CATALOG,
+        schema: Optional[str] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Execute several queries through the `execute_query` MCP tool in one write.
+
+        Args:
+            sql_queries: The SQL queries to execute
+            catalog: Catalog name
+            schema: Optional schema name
+
+        Returns:
+            The raw JSON-RPC responses in query order
+        """
+        if not sql_queries:
+            return []
+
+        await self.ensure_started()
+
+        request_ids, futures = self._register(len(sql_queries))
+        payload = b"".join(
+            encode_query_call(request_id, sql, catalog, schema)
+            for request_id, sql in zip(request_ids, sql_queries)
+        )
+        return await self._exchange(payload, request_ids, futures)
+
+    async def execute(self, sql: str, catalog: str = DEFAULT_CATALOG, schema: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Execute a query through the `execute_query` MCP tool.
+
+        Args:
+            sql: The SQL query to execute
+            catalog: Catalog name
+            schema: Optional schema name
+
+        Returns:
+            The raw JSON-RPC response
+        """
+        [response] = await self.execute_queries([sql], catalog, schema)
+        return response
+
+    async def close(self) -> None:
+        """Terminate the MCP server subprocess."""
+        process, self.proc = self.proc, None
+        self._initialized = False
+        if process is not None and process.returncode is None:
+            try:
+                process.stdin.close()
+            except Exception:
+                pass
+
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+
+        for task in (self._reader_task, self._stderr_task):
+            if task is not None:
+                task.cancel()
+        self._reader_task = None
+        self._stderr_task = None
+
+@dataclass
+class _PoolEntry:
+    session: AsyncMCPSession
+    refcount: int = 0
+    last_used: float = 0.0
+
+class AsyncMCPPool:
+    """
+    Async MCP sessions cached per (catalog, schema).
+
+    Requests for the same catalog and schema share one pipelined session; each
+    `acquire()` holds a reference for its duration. Sessions nobody holds are
+    closed once idle for `idle_timeout` seconds, and the least recently used
+    idle session is evicted when more than `max_sessions` are open.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 8,
+        idle_timeout: float = 300.0,
+        session_factory: Callable[..., AsyncMCPSession] = AsyncMCPSession
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            max_sessions: Maximum number of idle-or-busy sessions kept open
+            idle_timeout: Seconds an unreferenced session is kept before closing
+            session_factory: Callable creating a session for a catalog
+        """
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.session_factory = session_factory
+        self._entries: "OrderedDict[Tuple[str, Optional[str]], _PoolEntry]" = OrderedDict()
+
+    def _evict(self) -> List[AsyncMCPSession]:
+        """Remove expired and over-capacity idle sessions; return them for closing."""
+        now = time.monotonic()
+        evicted = []
+        for key, entry in list(self._entries.items()):
+            over_capacity = len(self._entries) > self.max_sessions
+            expired = now - entry.last_used > self.idle_timeout
+            if entry.refcount == 0 and (over_capacity or expired):
+                del self._entries[key]
+                evicted.append(entry.session)
+        return evicted
+
+    @asynccontextmanager
+    async def acquire(self, catalog: str = DEFAULT_CATALOG, schema: Optional[str] = None) -> AsyncIterator[AsyncMCPSession]:
+        """
+        Borrow the session for a catalog/schema for the duration of an `async with`.
+
+        Args:
+            catalog: Catalog name
+            schema: Optional schema name
+        """
+        key = (catalog, schema)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _PoolEntry(session=self.session_factory(catalog=catalog))
+            self._entries[key] = entry
+        else:
+            logger.debug("reused MCP session catalog=%s schema=%s refcount=%d", catalog, schema, entry.refcount + 1)
+        self._entries.move_to_end(key)
+        entry.refcount += 1
+
+        try:
+            yield entry.session
+        finally:
+            entry.refcount -= 1
+            entry.last_used = time.monotonic()
+            for session in self._evict():
+                await session.close()
+
+    async def close(self) -> None:
+        """Close every session in the pool."""
+        entries, self._entries = self._entries, OrderedDict()
+        for entry in entries.values():
+            await entry.session.close()
+
+async def query_trino_async(
+    session: AsyncMCPSession,
+    sql_query: str,
+    catalog: str = DEFAULT_CATALOG,
+    schema: Optional[str] = DEFAULT_SCHEMA
+) -> Dict[str, Any]:
+    """
+    Run a SQL query against Trino through an async MCP session.
+
+    Args:
+        session: The session to run the query on
+        sql_query: The SQL query to execute
+        catalog: Catalog name (default: memory)
+        schema: Schema name (default: bullshit)
+
+    Returns:
+        Dictionary with query results or error
+    """
+    try:
+        return parse_query_response(await session.execute(sql_query, catalog, schema))
+    except Exception as e:
+        return {"error": f"Error: {str(e)}"}
+
+async def query_trino_many_async(
+    session: AsyncMCPSession,
+    sql_queries: List[str],
+    catalog: str = DEFAULT_CATALOG,
+    schema: Optional[str] = DEFAULT_SCHEMA
+) -> List[Dict[str, Any]]:
+    """
+    Run several SQL queries against Trino through an async MCP session in one batch.
+
+    Args:
+        session: The session to run the queries on
+        sql_queries: The SQL queries to execute
+        catalog: Catalog name (default: memory)
+        schema: Schema name (default: bullshit)
+
+    Returns:
+        One result dictionary (results or error) per query, in order
+    """
+    try:
+        responses = await session.execute_queries(sql_queries, catalog, schema)
+        return [parse_query_response(response) for response in responses]
+    except Exception as e:
+        return [{"error": f"Error: {str(e)}"} for _ in sql_queries]
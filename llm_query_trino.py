@@ -5,152 +5,636 @@ This script handles all the MCP protocol complexity, so the LLM only needs to fo
 
 Usage:
   python llm_query_trino.py "SELECT * FROM memory.bullshit.real_bullshit_data LIMIT 5"
+
+By default queries go to the API of the running MCP server container (TRINO_MCP_API_URL,
+default http://localhost:9097). Set TRINO_MCP_TRANSPORT=stdio to spawn the MCP server
+over STDIO instead, e.g. for local debugging.
 """
+import atexit
+import base64
+import collections
 import json
+import operator
+import os
+import select
 import subprocess
 import sys
+import threading
 import time
 from typing import Dict, Any, List, Optional
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # pyarrow is optional; without it results always come back as JSON
+    pyarrow = None
+
 # Default configurations - modify as needed
 DEFAULT_CATALOG = "memory"
 DEFAULT_SCHEMA = "bullshit"
 
-def query_trino(sql_query: str, catalog: str = DEFAULT_CATALOG, schema: Optional[str] = DEFAULT_SCHEMA) -> Dict[str, Any]:
+# Transport used by query_trino():
+#   "http"  - POST to the API of the long-running MCP server container, so there is
+#             no interpreter start-up or handshake at all (default)
+#   "stdio" - spawn the MCP server via docker exec and talk JSON-RPC over STDIO
+MCP_TRANSPORT = os.environ.get("TRINO_MCP_TRANSPORT", "http")
+MCP_API_URL = os.environ.get("TRINO_MCP_API_URL", "http://localhost:9097")
+
+# Pipes are used in binary mode with a large block buffer: the payload is plain
+# UTF-8 JSON, so there is no need for a text codec or line buffering
+PIPE_BUFFER_SIZE = 65536
+
+# Seconds to wait for the MCP server to answer the initialize request
+STARTUP_TIMEOUT = 30.0
+
+# Seconds a caller waits for its responses before giving up on a hung server call
+REQUEST_TIMEOUT = 300.0
+
+# Number of recent MCP server stderr lines kept for diagnosing failures
+STDERR_HISTORY = 1000
+
+# Media type the MCP server uses for results sent as an Arrow IPC stream
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+if orjson is not None:
+    dumps_bytes = orjson.dumps
+    loads = orjson.loads
+else:
+    def dumps_bytes(obj: Any, default: Optional[Any] = None) -> bytes:
+        """Serialize obj to compact UTF-8 JSON bytes."""
+        return json.dumps(obj, separators=(",", ":"), default=default).encode("utf-8")
+
+    loads = json.loads
+
+# JSON-RPC messages are assembled from pre-encoded fragments: only the id and the
+# tool arguments change between calls, so there is no per-call dict to build
+RPC_PREFIX = b'{"jsonrpc":"2.0","id":'
+QUERY_CALL_SUFFIX = b',"method":"tools/call","params":{"name":"execute_query","arguments":%s}}\n'
+INITIALIZED_NOTIFICATION = dumps_bytes({
+    "jsonrpc": "2.0",
+    "method": "notifications/initialized",
+    "params": {}
+}) + b"\n"
+
+def encode_initialize(request_id: int, client_name: str) -> bytes:
+    """Encode an `initialize` request as a newline-terminated JSON line."""
+    params = dumps_bytes({
+        "protocolVersion": "2024-11-05",
+        "clientInfo": {
+            "name": client_name,
+            "version": "1.0.0"
+        },
+        "capabilities": {
+            "tools": True
+        }
+    })
+    return RPC_PREFIX + b"%d" % request_id + b',"method":"initialize","params":' + params + b"}\n"
+
+def encode_query_call(
+    request_id: int,
+    sql: str,
+    catalog: str = DEFAULT_CATALOG,
+    schema: Optional[str] = None
+) -> bytes:
+    """Encode an `execute_query` tools/call request as a newline-terminated JSON line."""
+    query_args = {"sql": sql, "catalog": catalog}
+    if schema:
+        query_args["schema"] = schema
+
+    return RPC_PREFIX + b"%d" % request_id + QUERY_CALL_SUFFIX % dumps_bytes(query_args)
+
+def build_mcp_command(catalog: str = DEFAULT_CATALOG) -> List[str]:
     """
-    Run a SQL query against Trino through MCP and return the results.
+    Build the command used to launch the MCP server with STDIO transport.
     
     Args:
-        sql_query: The SQL query to execute
-        catalog: Catalog name (default: memory)
-        schema: Schema name (default: bullshit)
+        catalog: Default catalog the MCP server connects with
         
     Returns:
-        Dictionary with query results or error
+        The command line as a list of arguments
     """
-    print(f"\n🔍 Running query via Trino MCP:\n{sql_query}")
-    
-    # Start the MCP server with STDIO transport
-    cmd = [
-        "docker", "exec", "-i", "trino_mcp_trino-mcp_1", 
-        "python", "-m", "trino_mcp.server", 
-        "--transport", "stdio", 
+    return [
+        "docker", "exec", "-i", "trino_mcp_trino-mcp_1",
+        "python", "-m", "trino_mcp.server",
+        "--transport", "stdio",
         "--debug",
         "--trino-host", "trino",
         "--trino-port", "8080",
-        "--trino-user", "trino", 
+        "--trino-user", "trino",
         "--trino-catalog", catalog
     ]
+
+def decode_arrow_ipc(payload: bytes) -> "pyarrow.Table":
+    """Read an Arrow IPC stream (as sent by the MCP server) into a pyarrow Table."""
+    return pyarrow.ipc.open_stream(payload).read_all()
+
+def arrow_result(table: "pyarrow.Table", query_id: str, execution_time_ms: float) -> Dict[str, Any]:
+    """
+    Build a result dictionary around an Arrow table.
     
-    try:
-        process = subprocess.Popen(
-            cmd,
+    The rows stay columnar in "table"; "rows" is left out and only materialized as
+    dictionaries by `result_rows()` when something actually needs them.
+    """
+    return {
+        "success": True,
+        "query_id": query_id,
+        "columns": table.column_names,
+        "row_count": table.num_rows,
+        "table": table,
+        "execution_time_ms": execution_time_ms
+    }
+
+def result_rows(results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return the rows of a result as dictionaries, converting an Arrow table if needed."""
+    if "rows" not in results and "table" in results:
+        return results["table"].to_pylist()
+    return results.get("rows", [])
+
+class MCPSession:
+    """
+    A long-lived MCP session over STDIO.
+
+    The MCP server subprocess is spawned and initialized lazily on first use and then
+    reused for every query, so back-to-back queries only pay for the `tools/call`
+    round trip instead of the docker exec + interpreter boot + handshake.
+    """
+
+    def __init__(
+        self,
+        catalog: str = DEFAULT_CATALOG,
+        client_name: str = "llm-query-client",
+        request_timeout: float = REQUEST_TIMEOUT
+    ):
+        """
+        Initialize the session (the subprocess is not started until first use).
+
+        Args:
+            catalog: Default catalog the MCP server connects with
+            client_name: Client name reported during the initialize handshake
+            request_timeout: Seconds to wait for the responses to a request
+        """
+        self.catalog = catalog
+        self.client_name = client_name
+        self.request_timeout = request_timeout
+        self.proc: Optional[subprocess.Popen] = None
+        # stdout is framed from raw reads into this buffer rather than with
+        # readline(), so every wait can be bounded with select()
+        self._stdout_buffer = bytearray()
+        self.stderr_lines: collections.deque = collections.deque(maxlen=STDERR_HISTORY)
+        self._id_counter = 0
+        self._lock = threading.Lock()
+
+    def _build_command(self) -> List[str]:
+        """Build the command used to launch the MCP server with STDIO transport."""
+        return build_mcp_command(self.catalog)
+
+    def _next_id(self) -> int:
+        self._id_counter += 1
+        return self._id_counter
+
+    def _drain_stderr(self, stream) -> None:
+        """
+        Keep reading the server's stderr so it can never fill the pipe buffer.
+
+        The server runs with --debug and logs heavily; if nobody reads stderr it
+        eventually blocks on a log write and stops answering requests.
+        """
+        for line in iter(stream.readline, b""):
+            self.stderr_lines.append(line)
+
+    def _exchange(
+        self,
+        request_ids: List[int],
+        payload: bytes,
+        timeout: Optional[float] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Write pre-encoded JSON-RPC lines in one write and collect the responses.
+
+        Responses are matched back to requests by id, so server notifications
+        interleaved with the replies are skipped. Waits at most `timeout` seconds
+        (default: the request timeout) for all of them.
+
+        Raises:
+            TimeoutError: If the responses did not all arrive in time
+        """
+        if timeout is None:
+            timeout = self.request_timeout
+        deadline = time.monotonic() + timeout
+
+        self.proc.stdin.write(payload)
+        self.proc.stdin.flush()
+
+        stdout_fd = self.proc.stdout.fileno()
+        buffer = self._stdout_buffer
+        responses: Dict[int, Dict[str, Any]] = {}
+        pending = set(request_ids)
+        while pending:
+            newline = buffer.find(b"\n")
+            if newline == -1:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not select.select([stdout_fd], [], [], remaining)[0]:
+                    raise TimeoutError(f"MCP server did not respond within {timeout} seconds")
+                chunk = os.read(stdout_fd, PIPE_BUFFER_SIZE)
+                if not chunk:
+                    break
+                buffer.extend(chunk)
+                continue
+
+            response_line = bytes(buffer[:newline])
+            del buffer[:newline + 1]
+            if not response_line.strip():
+                continue
+            response = loads(response_line)
+            if response.get("id") in pending:
+                pending.discard(response["id"])
+                responses[response["id"]] = response
+
+        return [responses.get(request_id) for request_id in request_ids]
+
+    def _start(self) -> None:
+        """Spawn the MCP server and perform the initialize handshake."""
+        self.proc = subprocess.Popen(
+            self._build_command(),
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1
+            bufsize=PIPE_BUFFER_SIZE
         )
+        threading.Thread(target=self._drain_stderr, args=(self.proc.stderr,), daemon=True).start()
+
+        # Step 1: Initialize MCP - sent right away; the server reads it once it is
+        # up, so its response doubles as the readiness signal (no start-up sleep)
+        request_id = self._next_id()
+        try:
+            [init_response] = self._exchange(
+                [request_id],
+                encode_initialize(request_id, self.client_name),
+                timeout=STARTUP_TIMEOUT
+            )
+        except Exception:
+            init_response = None
+        if not init_response or "error" in init_response:
+            self.close()
+            raise RuntimeError("Failed to initialize MCP")
+
+        # Step 2: Send initialized notification
+        self.proc.stdin.write(INITIALIZED_NOTIFICATION)
+        self.proc.stdin.flush()
+
+    def ensure_started(self) -> None:
+        """Start the MCP server if it is not running (or has died)."""
+        if self.proc is None or self.proc.poll() is not None:
+            self._start()
+
+    def execute(self, sql: str, catalog: str = DEFAULT_CATALOG, schema: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Execute a query through the `execute_query` MCP tool.
+
+        Args:
+            sql: The SQL query to execute
+            catalog: Catalog name
+            schema: Optional schema name
+
+        Returns:
+            The raw JSON-RPC response, or None if the server sent nothing back
+        """
+        [response] = self.execute_queries([sql], catalog, schema)
+        return response
+
+    def execute_queries(
+        self,
+        sql_queries: List[str],
+        catalog: str = DEFAULT_CATALOG,
+        schema: Optional[str] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Execute several queries through the `execute_query` MCP tool in one write.
+
+        Args:
+            sql_queries: The SQL queries to execute
+            catalog: Catalog name
+            schema: Optional schema name
+
+        Returns:
+            The raw JSON-RPC responses in query order; None for any missing response
+        """
+        if not sql_queries:
+            return []
+
+        with self._lock:
+            self.ensure_started()
+
+            request_ids = [self._next_id() for _ in sql_queries]
+            payload = b"".join(
+                encode_query_call(request_id, sql, catalog, schema)
+                for request_id, sql in zip(request_ids, sql_queries)
+            )
+            return self._exchange(request_ids, payload)
+
+    def execute_batch(self, requests: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Send several JSON-RPC requests in a single write and collect their responses.
+
+        All requests are written and flushed at once, so N requests cost one pipe
+        round trip instead of N. Responses are matched back to requests by id.
+
+        Args:
+            requests: JSON-RPC requests without ids (ids are assigned here)
+
+        Returns:
+            Responses in the same order as the requests; None for any missing response
+        """
+        if not requests:
+            return []
+
+        with self._lock:
+            self.ensure_started()
+
+            request_ids = [self._next_id() for _ in requests]
+            payload = b"".join(
+                dumps_bytes(dict(request, id=request_id)) + b"\n"
+                for request_id, request in zip(request_ids, requests)
+            )
+            return self._exchange(request_ids, payload)
+
+    def close(self) -> None:
+        """Terminate the MCP server subprocess."""
+        process, self.proc = self.proc, None
+        self._stdout_buffer.clear()
+        if process is None or process.poll() is not None:
+            return
+
+        try:
+            process.stdin.close()
+        except Exception:
+            pass
+
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+class HTTPQueryClient:
+    """
+    Client for the `/api/query` endpoint of the persistent MCP server container.
+
+    One `requests.Session` is reused so queries share a keep-alive connection.
+    """
+
+    def __init__(self, base_url: str = MCP_API_URL, timeout: float = 300.0):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: Base URL of the MCP server's API (default: TRINO_MCP_API_URL)
+            timeout: Request timeout in seconds
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._session = None
+
+    @property
+    def session(self):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    def query(self, sql: str, catalog: str = DEFAULT_CATALOG, schema: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Execute a query and return it in the same shape as `parse_query_response`.
+
+        Args:
+            sql: The SQL query to execute
+            catalog: Catalog name
+            schema: Optional schema name
+
+        Returns:
+            Dictionary with query results or error
+        """
+        request = {"query": sql, "catalog": catalog, "schema": schema}
+        if pyarrow is not None:
+            # The server only switches to Arrow for large results
+            request["format"] = "arrow"
         
-        # Wait for MCP server to start
-        time.sleep(2)
-        
-        # Helper function to send requests
-        def send_request(request, expect_response=True):
-            request_str = json.dumps(request) + "\n"
-            process.stdin.write(request_str)
-            process.stdin.flush()
-            
-            if not expect_response:
-                return None
-                
-            response_str = process.stdout.readline()
-            if response_str:
-                return json.loads(response_str)
-            return None
+        response = self.session.post(
+            f"{self.base_url}/api/query",
+            data=dumps_bytes(request),
+            headers={"Content-Type": "application/json"},
+            timeout=self.timeout
+        )
+        if response.headers.get("Content-Type", "").startswith(ARROW_STREAM_MEDIA_TYPE):
+            return arrow_result(
+                decode_arrow_ipc(response.content),
+                response.headers.get("X-Trino-Query-Id", "unknown"),
+                float(response.headers.get("X-Execution-Time-Ms", 0))
+            )
         
-        # Step 1: Initialize MCP
-        init_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "clientInfo": {
-                    "name": "llm-query-client",
-                    "version": "1.0.0"
-                },
-                "capabilities": {
-                    "tools": True
-                }
-            }
+        body = loads(response.content)
+        if not body.get("success"):
+            return {"error": body.get("message", f"HTTP {response.status_code}")}
+
+        results = body.get("results") or {}
+        return {
+            "success": True,
+            "query_id": results.get("query_id", "unknown"),
+            "columns": results.get("columns", []),
+            "row_count": results.get("row_count", 0),
+            "rows": results.get("rows", []),
+            "execution_time_ms": results.get("execution_time_ms", 0)
         }
+
+    def close(self) -> None:
+        """Close the HTTP session."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+# Shared session reused across queries (and across requests in llm_trino_api.py)
+_SESSION = MCPSession()
+atexit.register(_SESSION.close)
+
+_HTTP_CLIENT = HTTPQueryClient()
+atexit.register(_HTTP_CLIENT.close)
+
+def get_session() -> MCPSession:
+    """Return the shared MCP session."""
+    return _SESSION
+
+def extract_result_text(query_response: Optional[Dict[str, Any]]) -> str:
+    """
+    Return the tool's JSON payload from an `execute_query` response, unparsed.
+    
+    Args:
+        query_response: The JSON-RPC response (or None if nothing was received)
         
-        init_response = send_request(init_request)
-        if not init_response:
-            return {"error": "Failed to initialize MCP"}
+    Returns:
+        The JSON text the `execute_query` tool produced
         
-        # Step 2: Send initialized notification
-        init_notification = {
-            "jsonrpc": "2.0",
-            "method": "notifications/initialized",
-            "params": {}
-        }
+    Raises:
+        RuntimeError: If there is no response, the call or the tool failed, or there is no content
+    """
+    if not query_response:
+        raise RuntimeError("No response received for query")
+    
+    if "error" in query_response:
+        raise RuntimeError(str(query_response["error"]))
+    
+    result = query_response.get("result", {})
+    content = result.get("content") or [{}]
+    text = content[0].get("text")
+    # A failed tool call carries its error message as the content text
+    if result.get("isError"):
+        raise RuntimeError(text or "Tool call failed")
+    if text is None:
+        raise RuntimeError("Response has no result content")
+    return text
+
+def parse_query_response(query_response: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Turn a raw `execute_query` JSON-RPC response into a flat result dictionary.
+    
+    Args:
+        query_response: The JSON-RPC response (or None if nothing was received)
         
-        send_request(init_notification, expect_response=False)
+    Returns:
+        Dictionary with query results or error
+    """
+    if not query_response:
+        return {"error": "No response received for query"}
         
-        # Step 3: Execute query
-        query_args = {"sql": sql_query, "catalog": catalog}
-        if schema:
-            query_args["schema"] = schema
-            
-        query_request = {
-            "jsonrpc": "2.0",
-            "id": 2,
-            "method": "tools/call",
-            "params": {
-                "name": "execute_query",
-                "arguments": query_args
-            }
-        }
+    if "error" in query_response:
+        return {"error": query_response["error"]}
+    
+    if query_response.get("result", {}).get("isError"):
+        content = query_response["result"].get("content") or [{}]
+        return {"error": content[0].get("text") or "Tool call failed"}
+    
+    try:
+        # Extract nested result content
+        content_text = query_response.get("result", {}).get("content", [{}])[0].get("text", "{}")
+        result_data = loads(content_text)
+        
+        # Full results from the execute_query_arrow tool
+        if "arrow_ipc" in result_data:
+            return arrow_result(
+                decode_arrow_ipc(base64.b64decode(result_data["arrow_ipc"])),
+                result_data.get("query_id", "unknown"),
+                result_data.get("query_time_ms", 0)
+            )
         
-        query_response = send_request(query_request)
-        if not query_response:
-            return {"error": "No response received for query"}
-            
-        if "error" in query_response:
-            return {"error": query_response["error"]}
+        # Clean up the results for easier consumption
+        return {
+            "success": True,
+            "query_id": result_data.get("query_id", "unknown"),
+            "columns": result_data.get("columns", []),
+            "row_count": result_data.get("row_count", 0),
+            "rows": result_data.get("preview_rows", []),
+            "execution_time_ms": result_data.get("query_time_ms", 0)
+        }
+    except Exception as e:
+        return {
+            "error": f"Error parsing results: {str(e)}",
+            "raw_response": query_response
+        }
+
+def query_trino(sql_query: str, catalog: str = DEFAULT_CATALOG, schema: Optional[str] = DEFAULT_SCHEMA) -> Dict[str, Any]:
+    """
+    Run a SQL query against Trino through MCP and return the results.
+    
+    Args:
+        sql_query: The SQL query to execute
+        catalog: Catalog name (default: memory)
+        schema: Schema name (default: bullshit)
         
-        # Step 4: Parse the content
+    Returns:
+        Dictionary with query results or error
+    """
+    print(f"\n🔍 Running query via Trino MCP:\n{sql_query}")
+    
+    if MCP_TRANSPORT == "http":
         try:
-            # Extract nested result content
-            content_text = query_response.get("result", {}).get("content", [{}])[0].get("text", "{}")
-            result_data = json.loads(content_text)
-            
-            # Clean up the results for easier consumption
-            return {
-                "success": True,
-                "query_id": result_data.get("query_id", "unknown"),
-                "columns": result_data.get("columns", []),
-                "row_count": result_data.get("row_count", 0),
-                "rows": result_data.get("preview_rows", []),
-                "execution_time_ms": result_data.get("query_time_ms", 0)
-            }
+            return _HTTP_CLIENT.query(sql_query, catalog, schema)
         except Exception as e:
-            return {
-                "error": f"Error parsing results: {str(e)}",
-                "raw_response": query_response
-            }
-            
+            return {"error": f"Error: {str(e)}"}
+    
+    try:
+        return parse_query_response(_SESSION.execute(sql_query, catalog, schema))
     except Exception as e:
+        # Drop a possibly broken session so the next query starts fresh
+        _SESSION.close()
         return {"error": f"Error: {str(e)}"}
-    finally:
-        if 'process' in locals() and process.poll() is None:
-            process.terminate()
+
+def query_trino_many(
+    sql_queries: List[str],
+    catalog: str = DEFAULT_CATALOG,
+    schema: Optional[str] = DEFAULT_SCHEMA
+) -> List[Dict[str, Any]]:
+    """
+    Run several SQL queries against Trino through MCP in one pipelined batch
+    (over the HTTP transport they are sent back to back on one keep-alive connection).
+    
+    Args:
+        sql_queries: The SQL queries to execute
+        catalog: Catalog name (default: memory)
+        schema: Schema name (default: bullshit)
+        
+    Returns:
+        One result dictionary (results or error) per query, in order
+    """
+    print(f"\n🔍 Running {len(sql_queries)} queries via Trino MCP")
+    
+    if MCP_TRANSPORT == "http":
+        results = []
+        for sql in sql_queries:
             try:
-                process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                process.kill()
+                results.append(_HTTP_CLIENT.query(sql, catalog, schema))
+            except Exception as e:
+                results.append({"error": f"Error: {str(e)}"})
+        return results
+    
+    try:
+        responses = _SESSION.execute_queries(sql_queries, catalog, schema)
+        return [parse_query_response(response) for response in responses]
+    except Exception as e:
+        # Drop a possibly broken session so the next query starts fresh
+        _SESSION.close()
+        return [{"error": f"Error: {str(e)}"} for _ in sql_queries]
+
+def render_rows(rows: List[Dict[str, Any]], columns: List[str]) -> List[str]:
+    """
+    Render result rows as " | "-separated lines in column order.
+    
+    All cells of a row are fetched with one C-level itemgetter call and the lines are
+    built in a single comprehension; rows with missing columns fall back to per-column
+    lookups that print NULL.
+    
+    Args:
+        rows: Result rows as dictionaries keyed by column name
+        columns: Column names in display order
+        
+    Returns:
+        One rendered line per row
+    """
+    if len(columns) > 1:
+        getter = operator.itemgetter(*columns)
+    elif columns:
+        getter = lambda row, col=columns[0]: (row[col],)
+    else:
+        return ["" for _ in rows]
+    
+    join = " | ".join
+    try:
+        return [join(map(str, getter(row))) for row in rows]
+    except (KeyError, TypeError):
+        return [join([str(row.get(col, "NULL")) for col in columns]) for row in rows]
 
 def format_results(results: Dict[str, Any]) -> str:
     """Format query results for display"""
@@ -175,11 +659,7 @@ def format_results(results: Dict[str, Any]) -> str:
         output.append("-" * len(header))
     
     # Table rows
-    for row in results["rows"]:
-        values = []
-        for col in results["columns"]:
-            values.append(str(row.get(col, "NULL")))
-        output.append(" | ".join(values))
+    output.extend(render_rows(result_rows(results), results["columns"]))
     
     return "\n".join(output)
 
@@ -14,24 +14,50 @@ Example curl:
        -H "Content-Type: application/json" \\
        -d '{"query": "SELECT * FROM memory.bullshit.real_bullshit_data LIMIT 3"}'
 """
+from contextlib import asynccontextmanager
+
 import fastapi
 import pydantic
-from llm_query_trino import query_trino, format_results
-from typing import Optional, Dict, Any
+from fastapi.responses import StreamingResponse
+from async_mcp import AsyncMCPPool, query_trino_async, query_trino_many_async
+from llm_query_trino import dumps_bytes, extract_result_text, format_results
+from trino_pool import TrinoConnectionPool
+from typing import Optional, Dict, Any, List
+
+# Pipelined MCP sessions shared by all requests, one per catalog/schema
+mcp_pool = AsyncMCPPool()
+
+# Pooled direct Trino connections for /query_direct
+pool = TrinoConnectionPool()
+
+@asynccontextmanager
+async def lifespan(app: fastapi.FastAPI):
+    """Shut the shared MCP sessions and connection pool down with the app."""
+    try:
+        yield
+    finally:
+        await mcp_pool.close()
+        pool.close()
 
 # Create FastAPI app
 app = fastapi.FastAPI(
     title="Trino MCP API for LLMs",
     description="Simple API to query Trino via MCP protocol for LLMs",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
+# Envelope for successful ?raw=true responses - the tool's JSON payload is spliced in as-is
+# (failed tool calls take the usual QueryResponse error path)
+RAW_RESPONSE_PREFIX = b'{"success":true,"message":"Query executed successfully","results_raw":'
+
 # Define request model
 class QueryRequest(pydantic.BaseModel):
     query: str
     catalog: str = "memory"
     schema: Optional[str] = "bullshit"
     explain: bool = False
+    format: bool = True  # Set to False to skip building formatted_results
 
 # Define response model
 class QueryResponse(pydantic.BaseModel):
@@ -40,11 +66,27 @@ class QueryResponse(pydantic.BaseModel):
     results: Optional[Dict[str, Any]] = None
     formatted_results: Optional[str] = None
 
+# Define batch request/response models
+class BatchQueryRequest(pydantic.BaseModel):
+    queries: List[str]
+    catalog: str = "memory"
+    schema: Optional[str] = "bullshit"
+    format: bool = True
+
+class BatchQueryResponse(pydantic.BaseModel):
+    success: bool
+    message: str
+    results: List[QueryResponse] = []
+
 @app.post("/query", response_model=QueryResponse)
-async def trino_query(request: QueryRequest):
+async def trino_query(request: QueryRequest, raw: bool = False):
     """
     Execute a SQL query against Trino via MCP and return results.
     
+    With `?raw=true` the `execute_query` tool's JSON payload is passed through
+    untouched as `results_raw`, skipping parsing, validation and re-serialization
+    (no `formatted_results` in that mode).
+    
     Example:
     ```json
     {
@@ -60,8 +102,24 @@ async def trino_query(request: QueryRequest):
         if request.explain:
             query = f"EXPLAIN {query}"
             
+        if raw:
+            async with mcp_pool.acquire(request.catalog, request.schema) as session:
+                response = await session.execute(query, request.catalog, request.schema)
+            try:
+                result_text = extract_result_text(response)
+            except RuntimeError as e:
+                return QueryResponse(
+                    success=False,
+                    message=f"Query execution failed: {str(e)}"
+                )
+            return fastapi.Response(
+                content=RAW_RESPONSE_PREFIX + result_text.encode("utf-8") + b"}",
+                media_type="application/json"
+            )
+        
         # Execute the query
-        results = query_trino(query, request.catalog, request.schema)
+        async with mcp_pool.acquire(request.catalog, request.schema) as session:
+            results = await query_trino_async(session, query, request.catalog, request.schema)
         
         # Check for errors
         if "error" in results:
@@ -71,8 +129,8 @@ async def trino_query(request: QueryRequest):
                 results=results
             )
         
-        # Format results for human readability
-        formatted_results = format_results(results)
+        # Format results for human readability (unless the caller opted out)
+        formatted_results = format_results(results) if request.format else None
         
         return QueryResponse(
             success=True,
@@ -87,12 +145,138 @@ async def trino_query(request: QueryRequest):
             message=f"Error executing query: {str(e)}"
         )
 
+@app.post("/query_batch", response_model=BatchQueryResponse)
+async def trino_query_batch(request: BatchQueryRequest):
+    """
+    Execute several SQL queries against Trino via MCP in a single pipelined round trip.
+    
+    Example:
+    ```json
+    {
+        "queries": ["SELECT 1", "SELECT COUNT(*) FROM memory.bullshit.real_bullshit_data"],
+        "catalog": "memory",
+        "schema": "bullshit"
+    }
+    ```
+    """
+    try:
+        async with mcp_pool.acquire(request.catalog, request.schema) as session:
+            batch_results = await query_trino_many_async(session, request.queries, request.catalog, request.schema)
+        
+        responses = []
+        for results in batch_results:
+            if "error" in results:
+                responses.append(QueryResponse(
+                    success=False,
+                    message=f"Query execution failed: {results['error']}",
+                    results=results
+                ))
+            else:
+                responses.append(QueryResponse(
+                    success=True,
+                    message="Query executed successfully",
+                    results=results,
+                    formatted_results=format_results(results) if request.format else None
+                ))
+        
+        failed = sum(1 for response in responses if not response.success)
+        return BatchQueryResponse(
+            success=failed == 0,
+            message=f"{len(responses) - failed}/{len(responses)} queries executed successfully",
+            results=responses
+        )
+    
+    except Exception as e:
+        return BatchQueryResponse(
+            success=False,
+            message=f"Error executing queries: {str(e)}"
+        )
+
+@app.post("/query_direct", response_model=QueryResponse)
+def trino_query_direct(request: QueryRequest):
+    """
+    Execute a SQL query directly against Trino over a pooled DBAPI connection,
+    skipping MCP entirely. Takes the same body as /query.
+    """
+    try:
+        query = request.query
+        if request.explain:
+            query = f"EXPLAIN {query}"
+        
+        # The catalog/schema go on the borrowed connection's session rather than
+        # through a USE, and are reset when it goes back to the pool
+        with pool.acquire(request.catalog, request.schema) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query)
+                columns = [desc[0] for desc in cursor.description] if cursor.description else []
+                rows = cursor.fetchall() if cursor.description else []
+                query_id = cursor.query_id or "unknown"
+                execution_time_ms = cursor.stats.get("elapsedTimeMillis", 0)
+            finally:
+                cursor.close()
+        
+        results = {
+            "success": True,
+            "query_id": query_id,
+            "columns": columns,
+            "row_count": len(rows),
+            "rows": [dict(zip(columns, row)) for row in rows],
+            "execution_time_ms": execution_time_ms
+        }
+        
+        return QueryResponse(
+            success=True,
+            message="Query executed successfully",
+            results=results,
+            formatted_results=format_results(results) if request.format else None
+        )
+    
+    except Exception as e:
+        return QueryResponse(
+            success=False,
+            message=f"Error executing query: {str(e)}"
+        )
+
+def _stream_rows(request: QueryRequest):
+    """Yield the query result as NDJSON, one row object per line, as rows arrive."""
+    try:
+        query = request.query
+        if request.explain:
+            query = f"EXPLAIN {query}"
+        
+        with pool.acquire(request.catalog, request.schema) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query)
+                columns = [desc[0] for desc in cursor.description] if cursor.description else []
+                
+                # The cursor fetches from Trino page by page while we iterate
+                for row in cursor:
+                    yield dumps_bytes(dict(zip(columns, row)), default=str) + b"\n"
+            finally:
+                cursor.close()
+    except Exception as e:
+        yield dumps_bytes({"error": f"Error executing query: {str(e)}"}) + b"\n"
+
+@app.post("/query_stream")
+def trino_query_stream(request: QueryRequest):
+    """
+    Execute a SQL query directly against Trino and stream the rows back as
+    newline-delimited JSON, without holding the full result set in memory.
+    Takes the same body as /query.
+    """
+    return StreamingResponse(_stream_rows(request), media_type="application/x-ndjson")
+
 @app.get("/")
 async def root():
     """Root endpoint with usage instructions."""
     return {
         "message": "Trino MCP API for LLMs",
         "usage": "POST to /query with JSON body containing 'query', 'catalog' (optional), and 'schema' (optional)",
+        "direct_usage": "POST to /query_direct with the same body as /query to bypass MCP",
+        "stream_usage": "POST to /query_stream with the same body as /query to get rows as NDJSON",
+        "batch_usage": "POST to /query_batch with JSON body containing 'queries' (list), 'catalog' (optional), and 'schema' (optional)",
         "example": {
             "query": "SELECT * FROM memory.bullshit.real_bullshit_data LIMIT 3",
             "catalog": "memory",
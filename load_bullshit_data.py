@@ -5,34 +5,60 @@ instead of relying on the Hive metastore which seems to be having issues.
 """
 import pandas as pd
 import trino
+import random
+import socket
 import time
 import sys
 
+from trino_pool import TrinoConnectionPool
+
 # Configure Trino connection
 TRINO_HOST = "localhost"
 TRINO_PORT = 9095
 TRINO_USER = "trino"
 TRINO_CATALOG = "memory"
 
+# Parquet-backed table created by tools/setup_bullshit_table.py; when Trino can
+# read it, the data is copied server-side instead of through this script
+PARQUET_SOURCE_TABLE = "bullshit.datasets.employees"
+PARQUET_FILE = "data/bullshit_data.parquet"
+ROW_LIMIT = 100  # Take just 100 rows to keep it manageable
+
+# Upper bound (seconds) for the connection retry backoff
+MAX_RETRY_DELAY = 30
+
 def main():
     print("🚀 Loading bullshit data into Trino...")
     
-    # Load the parquet data
+    # Connect to Trino (the retrying connect is the pool's connection factory)
+    print(f"Connecting to Trino at {TRINO_HOST}:{TRINO_PORT}...")
+    pool = TrinoConnectionPool(factory=connect_to_trino, size=1)
+    
     try:
-        print("Reading the bullshit data...")
-        df = pd.read_parquet('data/bullshit_data.parquet')
-        print(f"Loaded {len(df)} rows of bullshit data")
-    except Exception as e:
-        print(f"❌ Failed to load parquet data: {e}")
+        with pool.acquire() as conn:
+            load_data(conn)
+    except ConnectionError as e:
+        print(f"❌ {e}")
         sys.exit(1)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        pool.close()
+        print("Connection closed")
 
-    # Connect to Trino
-    print(f"Connecting to Trino at {TRINO_HOST}:{TRINO_PORT}...")
+def connect_to_trino():
+    """
+    Open a Trino connection, retrying with exponential backoff while the server starts up.
     
-    # Try to connect with retries
+    Returns:
+        An open Trino DBAPI connection
+    """
     max_attempts = 10
     for attempt in range(1, max_attempts + 1):
         try:
+            # trino.dbapi.connect() is lazy, so probe the port first - this fails
+            # fast while Trino is still down instead of on the first query
+            socket.create_connection((TRINO_HOST, TRINO_PORT), timeout=0.5).close()
             conn = trino.dbapi.connect(
                 host=TRINO_HOST,
                 port=TRINO_PORT,
@@ -40,14 +66,130 @@ def main():
                 catalog=TRINO_CATALOG
             )
             print("✅ Connected to Trino")
-            break
+            return conn
         except Exception as e:
             print(f"Attempt {attempt}/{max_attempts} - Failed to connect: {e}")
             if attempt == max_attempts:
-                print("❌ Could not connect to Trino after multiple attempts")
-                sys.exit(1)
-            time.sleep(2)
+                raise ConnectionError("Could not connect to Trino after multiple attempts")
+            # Exponential backoff with jitter so parallel loaders don't retry in lockstep
+            delay = min(MAX_RETRY_DELAY, 0.5 * 2 ** (attempt - 1))
+            time.sleep(delay + random.uniform(0, delay))
+
+def read_parquet_data():
+    """
+    Read the generated bullshit data from parquet.
+    
+    Returns:
+        The bullshit data as a DataFrame
+    """
+    print("Reading the bullshit data...")
+    df = pd.read_parquet(PARQUET_FILE)
+    print(f"Loaded {len(df)} rows of bullshit data")
+    return df
+
+def load_from_parquet_table(cursor):
+    """
+    Create real_bullshit_data with a CTAS over the parquet-backed table, so Trino
+    reads the parquet natively and no rows pass through Python.
+    
+    Args:
+        cursor: An open Trino cursor
+        
+    Returns:
+        The number of rows loaded
+    """
+    cursor.execute(f"""
+    CREATE TABLE memory.bullshit.real_bullshit_data AS
+    SELECT
+        CAST(COALESCE(id, 0) AS BIGINT) AS id,
+        COALESCE(job_title, 'Unknown') AS job_title,
+        COALESCE(name, 'Anonymous') AS name,
+        CAST(COALESCE(salary, 0) AS DOUBLE) AS salary,
+        CAST(COALESCE(bullshit_factor, 0) AS DOUBLE) AS bullshit_factor,
+        COALESCE(bullshit_statement, 'No statement') AS bullshit_statement,
+        COALESCE(company, 'Unknown Co') AS company
+    FROM {PARQUET_SOURCE_TABLE}
+    ORDER BY id
+    LIMIT {ROW_LIMIT}
+    """)
+    row_count = cursor.fetchone()[0]
+    print(f"Copied {row_count} rows from {PARQUET_SOURCE_TABLE} inside Trino.")
+    return row_count
+
+def load_from_dataframe(cursor, df):
+    """
+    Create real_bullshit_data and insert the dataframe rows into it.
+    
+    Args:
+        cursor: An open Trino cursor
+        df: The bullshit data loaded from parquet
+        
+    Returns:
+        The number of rows loaded
+    """
+    # Take a subset of columns for simplicity
+    cols = ['id', 'name', 'job_title', 'salary', 'bullshit_factor', 'bullshit_statement', 'company']
+    df_subset = df[cols].head(ROW_LIMIT)
+    
+    # Handle NULL values - replace with empty strings for strings and 0 for numbers
+    df_subset = df_subset.fillna({
+        'name': 'Anonymous', 
+        'job_title': 'Unknown', 
+        'bullshit_statement': 'No statement',
+        'company': 'Unknown Co'
+    })
+    df_subset = df_subset.fillna(0)
+    
+    # Create the table structure
+    cursor.execute("""
+    CREATE TABLE memory.bullshit.real_bullshit_data (
+        id BIGINT,
+        job_title VARCHAR,
+        name VARCHAR,
+        salary DOUBLE,
+        bullshit_factor DOUBLE,
+        bullshit_statement VARCHAR,
+        company VARCHAR
+    )
+    """)
+    
+    # Insert data in batches with bound parameters - the Trino client escapes the
+    # values, and one multi-row INSERT per batch keeps the round trips down
+    # (the driver's executemany() would send one INSERT per row)
+    insert_cols = ['id', 'job_title', 'name', 'salary', 'bullshit_factor', 'bullshit_statement', 'company']
+    # Pull each column out once as a NumPy array (tolist() yields plain Python
+    # scalars the driver can bind) instead of boxing a pandas row per record
+    column_values = [df_subset[col].to_numpy().tolist() for col in insert_cols]
+    rows = list(zip(*column_values))
+    row_placeholder = "(" + ", ".join("?" for _ in insert_cols) + ")"
+    
+    batch_size = 500
+    total_batches = (len(rows) + batch_size - 1) // batch_size  # Ceiling division
+    
+    print(f"Inserting {len(rows)} rows in {total_batches} batches...")
+    
+    for batch_num in range(total_batches):
+        batch = rows[batch_num * batch_size:(batch_num + 1) * batch_size]
+        
+        insert_sql = (
+            "INSERT INTO memory.bullshit.real_bullshit_data VALUES "
+            + ", ".join([row_placeholder] * len(batch))
+        )
+        params = [value for row in batch for value in row]
+        cursor.execute(insert_sql, params)
+        cursor.fetchall()
+        
+        print(f"Batch {batch_num+1}/{total_batches} inserted.")
+    
+    return len(rows)
 
+def load_data(conn):
+    """
+    Create the bullshit schema, tables and view and load the data into them.
+    
+    Args:
+        conn: An open Trino DBAPI connection
+    """
     # Create cursor
     cursor = conn.cursor()
     
@@ -88,69 +230,15 @@ def main():
         (3, 'Developer', 'Testing Data', 120000, 5, FALSE, 'Option C')
         """)
         
-        # Now we'll load real data from our dataframe
-        # For memory connector, we need to create a new table with the data
+        # Now we'll load the real data - straight from parquet inside Trino when
+        # possible, otherwise by pushing our dataframe through INSERTs
         print("Creating real_bullshit_data table with our generated data...")
-        
-        # Take a subset of columns for simplicity
-        cols = ['id', 'name', 'job_title', 'salary', 'bullshit_factor', 'bullshit_statement', 'company']
-        df_subset = df[cols].head(100)  # Take just 100 rows to keep it manageable
-        
-        # Handle NULL values - replace with empty strings for strings and 0 for numbers
-        df_subset = df_subset.fillna({
-            'name': 'Anonymous', 
-            'job_title': 'Unknown', 
-            'bullshit_statement': 'No statement',
-            'company': 'Unknown Co'
-        })
-        df_subset = df_subset.fillna(0)
-        
-        # Create the table structure
-        cursor.execute("""
-        CREATE TABLE memory.bullshit.real_bullshit_data (
-            id BIGINT,
-            job_title VARCHAR,
-            name VARCHAR,
-            salary DOUBLE,
-            bullshit_factor DOUBLE,
-            bullshit_statement VARCHAR,
-            company VARCHAR
-        )
-        """)
-        
-        # Insert data in batches to avoid overly long SQL statements
-        batch_size = 10
-        total_batches = (len(df_subset) + batch_size - 1) // batch_size  # Ceiling division
-        
-        print(f"Inserting {len(df_subset)} rows in {total_batches} batches...")
-        
-        for batch_num in range(total_batches):
-            start_idx = batch_num * batch_size
-            end_idx = min(start_idx + batch_size, len(df_subset))
-            batch = df_subset.iloc[start_idx:end_idx]
-            
-            # Create VALUES part of SQL statement for this batch
-            values_list = []
-            for _, row in batch.iterrows():
-                # Clean string values to prevent SQL injection/syntax errors
-                job_title = str(row['job_title']).replace("'", "''")
-                name = str(row['name']).replace("'", "''")
-                statement = str(row['bullshit_statement']).replace("'", "''")
-                company = str(row['company']).replace("'", "''")
-                
-                values_str = f"({row['id']}, '{job_title}', '{name}', {row['salary']}, {row['bullshit_factor']}, '{statement}', '{company}')"
-                values_list.append(values_str)
-            
-            values_sql = ", ".join(values_list)
-            
-            # Insert batch
-            insert_sql = f"""
-            INSERT INTO memory.bullshit.real_bullshit_data VALUES
-            {values_sql}
-            """
-            cursor.execute(insert_sql)
-            
-            print(f"Batch {batch_num+1}/{total_batches} inserted.")
+        try:
+            row_count = load_from_parquet_table(cursor)
+        except Exception as e:
+            print(f"Could not copy from {PARQUET_SOURCE_TABLE} ({e}), inserting from Python instead...")
+            cursor.execute("DROP TABLE IF EXISTS memory.bullshit.real_bullshit_data")
+            row_count = load_from_dataframe(cursor, read_parquet_data())
         
         # Create a summary view
         print("Creating summary view...")
@@ -176,19 +264,15 @@ def main():
         print("\n" + " | ".join(columns))
         print("-" * 80)
         
-        rows = cursor.fetchall()
-        for row in rows:
+        # Iterate the cursor so rows are printed as Trino returns them
+        for row in cursor:
             print(" | ".join(str(cell) for cell in row))
         
-        print(f"\n✅ Successfully loaded {len(df_subset)} rows of bullshit data into Trino!")
+        print(f"\n✅ Successfully loaded {row_count} rows of bullshit data into Trino!")
         print("You can now query it with: SELECT * FROM memory.bullshit.real_bullshit_data")
         
-    except Exception as e:
-        print(f"❌ Error: {e}")
     finally:
         cursor.close()
-        conn.close()
-        print("Connection closed")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Shared MCP protocol driver for the test scripts.
+
+Every script used to repeat the initialize handshake, its own request/response
+loop and its own framing; they now go through one driver over either transport:
+
+    driver = MCPDriver.connect_stdio(("python", "-m", "trino_mcp.server", "--transport", "stdio"))
+    driver.initialize("my-test-client")
+    response = driver.call("tools/list")
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from _mcp_fixture import MCPStdioClient, dumps_bytes, get_client, loads
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+PROTOCOL_VERSION = "2024-11-05"
+
+# Seconds to wait for the initialize response while the server starts up
+STARTUP_TIMEOUT = 30
+
+# Largest SSE message event we are willing to parse (8 Mi characters)
+MAX_FRAME = 8 * 1024 * 1024
+
+# Top-level JSON-RPC fields callers look at; everything else is skipped
+MESSAGE_FIELDS = ("id", "result", "error")
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+def encode_request(request_id: Optional[int], method: str, params: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Encode a JSON-RPC request (or a notification, with no id) as one frame.
+
+    Args:
+        request_id: Request id, or None for a notification
+        method: JSON-RPC method name
+        params: Optional parameters
+
+    Returns:
+        The newline-terminated message bytes
+    """
+    message: Dict[str, Any] = {"jsonrpc": "2.0", "method": method}
+    if request_id is not None:
+        message["id"] = request_id
+    if params is not None:
+        message["params"] = params
+    return dumps_bytes(message) + b"\n"
+
+INITIALIZED_FRAME = encode_request(None, "notifications/initialized")
+
+def sse_frames(response: requests.Response) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (event, data) tuples from a streaming SSE response.
+
+    Frames are blank-line delimited "field: value" lines; multi-line data is
+    joined with newlines and comment lines (starting with ":") are ignored.
+    """
+    event, data = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            if data:
+                yield event, "\n".join(data)
+            event, data = "message", []
+            continue
+
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "event":
+            event = value
+        elif field == "data":
+            data.append(value)
+
+def parse_message(data: str) -> Dict[str, Any]:
+    """
+    Parse a JSON-RPC message from an SSE event, keeping only MESSAGE_FIELDS.
+
+    With ijson available the message is walked incrementally and any other
+    top-level members (e.g. a notification's params) are skipped rather than
+    built; otherwise the whole message is parsed with loads().
+    """
+    if ijson is None:
+        message = loads(data)
+        return {key: message[key] for key in MESSAGE_FIELDS if key in message}
+
+    try:
+        return {
+            key: value
+            for key, value in ijson.kvitems(data.encode("utf-8"), "", use_float=True)
+            if key in MESSAGE_FIELDS
+        }
+    except ijson.JSONError as e:
+        raise ValueError(str(e)) from e
+
+class MCPSSEClient:
+    """
+    An MCP server spoken to over SSE: requests are POSTed to the messages URL
+    announced by the stream, and responses arrive as SSE message events.
+
+    POSTs are queued on a single worker so they go out in order (the server
+    rejects requests that overtake the initialized notification) without the
+    caller waiting on each 202 before reading the stream.
+
+    The stream is read on a background thread that queues the events, so a
+    caller gives up waiting with a plain queue timeout: the stream itself is
+    never interrupted, and later reads pick up where the last one stopped.
+    """
+
+    def __init__(self, base_url: str, idle_timeout: float = 60):
+        """
+        Open the SSE stream and wait for the endpoint event.
+
+        Args:
+            base_url: Server URL, e.g. http://localhost:9096
+            idle_timeout: Seconds the stream may sit idle before reads fail
+        """
+        self.base_url = base_url.rstrip("/")
+
+        # One session for the SSE stream and every POST, so the POSTs reuse a
+        # keep-alive connection instead of setting up a new socket each time
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self._post_executor = ThreadPoolExecutor(max_workers=1)
+        self._pending_posts: List[Future] = []
+
+        # Session state shared by every MCPDriver on this transport
+        self.last_request_id = 0
+        self.initialize_response: Optional[Dict[str, Any]] = None
+
+        self.response = self.session.get(
+            f"{self.base_url}/sse",
+            headers={"Accept": "text/event-stream"},
+            stream=True,
+            timeout=(3.05, idle_timeout)
+        )
+        if self.response.status_code != 200:
+            self.close()
+            raise ConnectionError(f"Failed to connect to SSE endpoint: {self.response.status_code}")
+
+        # One reader for the whole stream, so events that arrive while we
+        # handle the endpoint event are not lost. None marks the end of the stream
+        self.response.encoding = "utf-8"
+        self._events: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue()
+        self._stream_closed = False
+        threading.Thread(target=self._read_stream, daemon=True).start()
+
+        self.messages_url = None
+        deadline = time.monotonic() + idle_timeout
+        while self.messages_url is None:
+            event = self._next_event(deadline)
+            if event is None:
+                self.close()
+                raise ConnectionError("Failed to get messages URL from SSE")
+            event_name, event_data = event
+            if event_name == "endpoint":
+                self.messages_url = f"{self.base_url}{event_data}"
+
+    def _read_stream(self) -> None:
+        """Queue every event on the stream until it closes or fails."""
+        try:
+            for event in sse_frames(self.response):
+                self._events.put(event)
+        except Exception:
+            # requests surfaces a read timeout mid-stream as a ConnectionError,
+            # and close() makes the blocked read fail
+            pass
+        finally:
+            self._events.put(None)
+
+    def _next_event(self, deadline: float) -> Optional[Tuple[str, str]]:
+        """Return the next queued event, or None on timeout or once the stream has closed."""
+        if self._stream_closed:
+            return None
+        remaining = deadline - time.monotonic()
+        try:
+            event = self._events.get(timeout=max(remaining, 0))
+        except queue.Empty:
+            return None
+        if event is None:
+            self._stream_closed = True
+        return event
+
+    def notify_many(self, frames: List[bytes]) -> None:
+        """Queue one POST per pre-encoded message, in order."""
+        for frame in frames:
+            self.notify(frame)
+
+    def notify(self, request: bytes) -> None:
+        """Queue a POST of a pre-encoded message without waiting for its 202."""
+        self._pending_posts.append(self._post_executor.submit(
+            self.session.post, self.messages_url, data=request, headers=JSON_HEADERS
+        ))
+
+    def check_sent(self) -> None:
+        """Raise if any queued POST was not accepted."""
+        pending, self._pending_posts = self._pending_posts, []
+        for future in pending:
+            status_code = future.result().status_code
+            if status_code != 202:
+                raise RuntimeError(f"Server rejected a message with HTTP {status_code}")
+
+    def read_response(self, timeout: float = 10) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the next JSON-RPC message event on the stream.
+
+        Args:
+            timeout: Seconds to wait before giving up
+
+        Returns:
+            The parsed message, or None on timeout or if the stream closed
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            event = self._next_event(deadline)
+            if event is None:
+                return None
+            event_name, event_data = event
+            if event_name != "message" or not event_data:
+                continue
+            # Never parse oversized frames - they would build an equally large dict tree
+            if len(event_data) > MAX_FRAME:
+                print(f"❌ Skipping oversized frame ({len(event_data)} chars, limit {MAX_FRAME})")
+                continue
+            try:
+                return parse_message(event_data)
+            except ValueError as e:
+                print(f"❌ Error parsing message: {e}")
+
+    def send(self, request: bytes, timeout: float = 10) -> Optional[Dict[str, Any]]:
+        """POST a pre-encoded request and wait for the next message on the stream."""
+        self.notify(request)
+        response = self.read_response(timeout)
+        self.check_sent()
+        return response
+
+    def close(self) -> None:
+        """Close the SSE stream and the HTTP session."""
+        self.response.close()
+        self._post_executor.shutdown()
+        self.session.close()
+
+Transport = Union[MCPStdioClient, MCPSSEClient]
+
+class MCPDriver:
+    """
+    Runs the MCP handshake and JSON-RPC calls over a STDIO or SSE transport.
+
+    The handshake result and the request ids live on the transport, not the
+    driver: STDIO transports are memoized, so a new driver can land on a
+    session that an earlier one already initialized and sent requests on.
+    """
+
+    def __init__(self, transport: Transport):
+        """
+        Wrap an already-connected transport.
+
+        Args:
+            transport: An MCPStdioClient or MCPSSEClient
+        """
+        self.transport = transport
+
+    @classmethod
+    def connect_stdio(
+        cls,
+        command: Tuple[str, ...],
+        pythonpath: Optional[str] = None,
+        stderr_to_file: bool = False
+    ) -> "MCPDriver":
+        """Drive the shared STDIO server subprocess for `command`."""
+        return cls(get_client(command, pythonpath, stderr_to_file))
+
+    @classmethod
+    def connect_sse(cls, url: str) -> "MCPDriver":
+        """Drive the server behind an SSE endpoint (e.g. http://localhost:9096)."""
+        return cls(MCPSSEClient(url))
+
+    def next_id(self) -> int:
+        """Return an id no earlier request on this session has used."""
+        self.transport.last_request_id += 1
+        return self.transport.last_request_id
+
+    def _claim_id(self, request_id: int) -> None:
+        """Keep next_id() from handing out an id the caller picked explicitly."""
+        self.transport.last_request_id = max(self.transport.last_request_id, request_id)
+
+    def send(self, frame: bytes, request_id: int, timeout: float = 10) -> Optional[Dict[str, Any]]:
+        """
+        Send a pre-encoded request and wait for the response with `request_id`.
+
+        Args:
+            frame: Bytes from encode_request()
+            request_id: The id encoded in `frame`
+            timeout: Seconds to wait for the response
+
+        Returns:
+            The JSON-RPC response, or None on timeout
+        """
+        self._claim_id(request_id)
+        deadline = time.monotonic() + timeout
+        response = self.transport.send(frame, timeout)
+        # Skip anything addressed elsewhere (server notifications carry no id)
+        while response is not None and response.get("id") != request_id:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            response = self.transport.read_response(remaining)
+        return response
+
+    def send_batch(self, requests: List[Tuple[int, bytes]], timeout: float = 10) -> List[Optional[Dict[str, Any]]]:
+        """
+        Pipeline several pre-encoded requests and collect their responses by id.
+
+        Every frame is written before any response is awaited, so independent
+        requests (e.g. two queries) run on the server at the same time.
+
+        Args:
+            requests: (request id, frame) pairs
+            timeout: Seconds to wait for all of the responses
+
+        Returns:
+            Responses in request order (None for any that timed out)
+        """
+        for request_id, _ in requests:
+            self._claim_id(request_id)
+        deadline = time.monotonic() + timeout
+        responses: Dict[int, Dict[str, Any]] = {}
+        self.transport.notify_many([frame for _, frame in requests])
+        try:
+            while len(responses) < len(requests):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                response = self.transport.read_response(remaining)
+                if response is None:
+                    break
+                responses[response.get("id")] = response
+        finally:
+            self.transport.check_sent()
+        return [responses.get(request_id) for request_id, _ in requests]
+
+    def call(
+        self,
+        method: str,
+        params: Optional[Dict[str, Any]] = None,
+        id: Optional[int] = None,
+        timeout: float = 10
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Call a JSON-RPC method and wait for its response.
+
+        Args:
+            method: JSON-RPC method name
+            params: Optional parameters
+            id: Request id (default: the next free id)
+            timeout: Seconds to wait for the response
+
+        Returns:
+            The JSON-RPC response, or None on timeout
+        """
+        request_id = self.next_id() if id is None else id
+        return self.send(encode_request(request_id, method, params), request_id, timeout)
+
+    def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """Send a JSON-RPC notification (no response is expected)."""
+        self.transport.notify(encode_request(None, method, params))
+
+    def initialize(self, client_name: str, timeout: float = STARTUP_TIMEOUT) -> Optional[Dict[str, Any]]:
+        """
+        Run the initialize handshake: initialize request, then the initialized notification.
+
+        A session is only initialized once; later calls return the first response.
+
+        Args:
+            client_name: Client name reported to the server
+            timeout: Seconds to wait for the initialize response
+
+        Returns:
+            The initialize response, or None if the server never answered
+        """
+        if self.transport.initialize_response is not None:
+            return self.transport.initialize_response
+
+        response = self.call("initialize", {
+            "protocolVersion": PROTOCOL_VERSION,
+            "clientInfo": {"name": client_name, "version": "1.0.0"},
+            "capabilities": {
+                "tools": True,
+                "resources": {"supportedSources": ["trino://catalog"]}
+            }
+        }, timeout=timeout)
+        if response is not None:
+            self.transport.notify(INITIALIZED_FRAME)
+            self.transport.initialize_response = response
+        return response
+
+    def call_tool(self, name: str, arguments: Dict[str, Any], timeout: float = 10) -> Optional[Dict[str, Any]]:
+        """Call an MCP tool (tools/call) and wait for its response."""
+        return self.call("tools/call", {"name": name, "arguments": arguments}, timeout=timeout)
+
+    def close(self) -> None:
+        """Close the underlying transport."""
+        self.transport.close()
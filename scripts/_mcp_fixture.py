@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Shared MCP server subprocess for the STDIO test scripts.
+
+Starting the server costs a fresh interpreter plus the Trino client import, so the
+scripts ask for a memoized client and send every request through it:
+
+    client = get_client(("python", "-m", "trino_mcp.server", "--transport", "stdio"))
+    response = client.send(INITIALIZE_FRAME)
+"""
+import atexit
+import json
+import os
+import selectors
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
+
+if orjson is not None:
+    dumps_bytes = orjson.dumps
+    loads = orjson.loads
+else:
+    def dumps_bytes(obj):
+        """Serialize obj to compact UTF-8 JSON bytes."""
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    loads = json.loads
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    """Serialize a JSON-RPC message as one newline-terminated STDIO frame."""
+    return dumps_bytes(message) + b"\n"
+
+class MCPStdioClient:
+    """
+    An MCP server subprocess spoken to over newline-delimited JSON-RPC.
+
+    Set `on_stdout` / `on_stderr` to a callable to see each decoded line as it
+    arrives. stderr is drained on a background thread so the server can never
+    block on a full pipe, unless it is sent to a temporary file instead (no
+    thread, no per-line work while the test runs; read it back on failure).
+    """
+
+    def __init__(
+        self,
+        command: Tuple[str, ...],
+        env: Optional[Dict[str, str]] = None,
+        stderr_to_file: bool = False
+    ):
+        """
+        Start the server subprocess.
+
+        Args:
+            command: Command line that runs the server with STDIO transport
+            env: Environment for the subprocess (default: inherit)
+            stderr_to_file: Write stderr to a temporary file rather than a pipe
+        """
+        self._stderr_file = tempfile.TemporaryFile(mode="w+b") if stderr_to_file else None
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=self._stderr_file or subprocess.PIPE,
+            bufsize=64 * 1024,  # Binary pipes, decoded once per complete line
+            env=env
+        )
+        self.on_stdout: Optional[Callable[[str], None]] = None
+        self.on_stderr: Optional[Callable[[str], None]] = None
+        self.stderr_lines: List[str] = []
+
+        # Session state shared by every caller of the memoized client (see MCPDriver)
+        self.last_request_id = 0
+        self.initialize_response: Optional[Dict[str, Any]] = None
+
+        # Wake up as soon as stdout is readable instead of polling with sleeps.
+        # stdout is framed from raw reads into our own buffer: a BufferedReader
+        # could hold a second pipelined response that select() never reports
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.process.stdout, selectors.EVENT_READ)
+        self._stdout_fd = self.process.stdout.fileno()
+        self._stdout_buffer = bytearray()
+
+        self._stderr_thread = None
+        if self._stderr_file is None:
+            self._stderr_thread = threading.Thread(target=self._read_stderr, daemon=True)
+            self._stderr_thread.start()
+
+    @property
+    def is_running(self) -> bool:
+        return self.process.poll() is None
+
+    def _read_stderr(self) -> None:
+        for line in self.process.stderr:
+            text = line.decode("utf-8", "replace").rstrip()
+            self.stderr_lines.append(text)
+            if self.on_stderr:
+                self.on_stderr(text)
+
+    def notify_many(self, frames: List[bytes]) -> None:
+        """Write several pre-encoded frames in a single write."""
+        self.process.stdin.write(b"".join(frames))
+        self.process.stdin.flush()
+
+    def stderr_output(self) -> str:
+        """Return everything the server has written to stderr so far."""
+        if self._stderr_file is None:
+            return "\n".join(self.stderr_lines)
+        self._stderr_file.seek(0)
+        return self._stderr_file.read().decode("utf-8", "replace")
+
+    def check_sent(self) -> None:
+        """
+        Raise if the server has exited.
+
+        A write to a pipe whose reader just died can still land in the pipe
+        buffer, so a clean write alone does not mean the server read it.
+        """
+        if not self.is_running:
+            raise RuntimeError(f"MCP server exited with code {self.process.returncode}")
+
+    def notify(self, request: Union[bytes, Dict[str, Any]]) -> None:
+        """
+        Write a request without waiting for a response (e.g. a notification).
+
+        Args:
+            request: A pre-encoded frame or a JSON-RPC message dict
+        """
+        if isinstance(request, dict):
+            request = encode_frame(request)
+        self.process.stdin.write(request)
+        self.process.stdin.flush()
+
+    def read_response(self, timeout: float = 10) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the next JSON-RPC line on stdout.
+
+        Args:
+            timeout: Seconds to wait before giving up
+
+        Returns:
+            The parsed response, or None on timeout or if the server exited
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            # Hand out any complete line that is already buffered
+            newline = self._stdout_buffer.find(b"\n")
+            if newline == -1:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._selector.select(remaining):
+                    return None
+
+                chunk = os.read(self._stdout_fd, 64 * 1024)
+                if not chunk:
+                    return None
+                self._stdout_buffer.extend(chunk)
+                continue
+
+            line = bytes(self._stdout_buffer[:newline]).strip()
+            del self._stdout_buffer[:newline + 1]
+            if not line:
+                continue
+
+            # Parsed straight from bytes; only decoded when someone wants to see it
+            if self.on_stdout:
+                self.on_stdout(line.decode("utf-8", "replace"))
+            try:
+                return loads(line)
+            except ValueError as e:
+                print(f"❌ Error parsing response as JSON: {e}")
+
+    def send(self, request: Union[bytes, Dict[str, Any]], timeout: float = 10) -> Optional[Dict[str, Any]]:
+        """
+        Write a request and wait for its response.
+
+        Args:
+            request: A pre-encoded frame or a JSON-RPC message dict
+            timeout: Seconds to wait for the response
+
+        Returns:
+            The parsed response, or None on timeout
+        """
+        self.notify(request)
+        return self.read_response(timeout)
+
+    def close(self, timeout: float = 5) -> bool:
+        """
+        Terminate the server subprocess.
+
+        Returns:
+            True if it exited on terminate, False if it had to be killed
+        """
+        if self.process.returncode is not None:
+            return True
+
+        self._selector.close()
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=timeout)
+            exited = True
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+            exited = False
+
+        # Let the stderr reader pick up whatever the server wrote on the way out
+        if self._stderr_thread is not None:
+            self._stderr_thread.join(timeout=1)
+        return exited
+
+# One running client per (command, PYTHONPATH, stderr mode), shared by every caller in the process
+_clients: Dict[Tuple[Tuple[str, ...], Optional[str], bool], MCPStdioClient] = {}
+
+def get_client(
+    command: Tuple[str, ...],
+    pythonpath: Optional[str] = None,
+    stderr_to_file: bool = False
+) -> MCPStdioClient:
+    """
+    Return the shared client for `command`, starting the server if needed.
+
+    Args:
+        command: Command line that runs the server with STDIO transport
+        pythonpath: Optional PYTHONPATH for the server process
+        stderr_to_file: Write stderr to a temporary file rather than a pipe
+
+    Returns:
+        A running MCPStdioClient
+    """
+    key = (command, pythonpath, stderr_to_file)
+    client = _clients.get(key)
+    if client is None or not client.is_running:
+        env = dict(os.environ, PYTHONPATH=pythonpath) if pythonpath else None
+        client = _clients[key] = MCPStdioClient(command, env, stderr_to_file)
+    return client
+
+@atexit.register
+def close_clients() -> None:
+    """Terminate every shared server process."""
+    while _clients:
+        _, client = _clients.popitem()
+        client.close()
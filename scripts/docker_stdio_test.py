@@ -3,15 +3,133 @@
 Minimalist MCP STDIO test to run inside the container.
 This script avoids importing any external modules and uses just the Python standard library.
 """
+import fcntl
 import json
+import os
+import select
 import subprocess
 import time
 import sys
-import threading
+
+# Seconds to wait for the initialize response while the server starts up
+STARTUP_TIMEOUT = 30
+
+# Requests that never change are built and encoded once, at import time
+FIXED_REQUESTS = {
+    "initialize": {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "initialize",
+        "params": {
+            "protocolVersion": "2024-11-05", 
+            "clientInfo": {
+                "name": "container-stdio-test",
+                "version": "1.0.0"
+            },
+            "capabilities": {
+                "tools": True,
+                "resources": {
+                    "supportedSources": ["trino://catalog"]
+                }
+            }
+        }
+    },
+    "initialized": {
+        "jsonrpc": "2.0",
+        "method": "notifications/initialized",
+        "params": {}  # Empty params object is required
+    },
+    "tools/list": {
+        "jsonrpc": "2.0",
+        "id": 2,
+        "method": "tools/list"
+    },
+    "resources/list": {
+        "jsonrpc": "2.0",
+        "id": 5,
+        "method": "resources/list",
+        "params": {
+            "source": "trino://catalog"
+        }
+    },
+    "shutdown": {
+        "jsonrpc": "2.0",
+        "id": 6,
+        "method": "shutdown"
+    },
+    "exit": {
+        "jsonrpc": "2.0",
+        "method": "exit",
+        "params": {}  # Empty params may be needed
+    }
+}
+
+# Output is collected here and written in one go, instead of a print() (and a
+# write syscall when stdout is a pipe) per line
+OUTPUT = []
+
+def log(*args):
+    """Buffer a line of output."""
+    OUTPUT.append(" ".join(map(str, args)) + "\n")
+
+def flush_log():
+    """Write all buffered output at once."""
+    sys.stdout.write("".join(OUTPUT))
+    sys.stdout.flush()
+    OUTPUT.clear()
+
+def log_error(*args):
+    """Print an error right away, after any output buffered before it."""
+    flush_log()
+    print(*args, flush=True)
+
+# execute_query calls share everything but the id and the SQL
+QUERY_CALL_TEMPLATE = {
+    "jsonrpc": "2.0",
+    "method": "tools/call"
+}
+
+def query_call(request_id, sql, catalog="memory"):
+    """Build an execute_query tools/call request from QUERY_CALL_TEMPLATE."""
+    return {
+        **QUERY_CALL_TEMPLATE,
+        "id": request_id,
+        "params": {
+            "name": "execute_query",
+            "arguments": {
+                "sql": sql,
+                "catalog": catalog
+            }
+        }
+    }
+
+def encode_request(request):
+    """Encode a JSON-RPC message as a newline-terminated UTF-8 frame."""
+    return (json.dumps(request) + "\n").encode("utf-8")
+
+ENCODED_REQUESTS = {name: encode_request(request) for name, request in FIXED_REQUESTS.items()}
+
+def query_summary(response):
+    """
+    Pull the fields the test prints out of an execute_query tool response.
+    
+    The tool's result is a JSON document carried as a string in content[0].text;
+    only that payload is decoded, and only columns, row_count and preview_rows are kept.
+    """
+    content = response.get("result", {}).get("content") or [{}]
+    try:
+        payload = json.loads(content[0].get("text") or "{}")
+    except json.JSONDecodeError:
+        payload = {}
+    return {
+        "columns": payload.get("columns", []),
+        "row_count": payload.get("row_count", 0),
+        "preview_rows": payload.get("preview_rows", [])
+    }
 
 def test_mcp_stdio():
     """Run a test of the MCP server using STDIO transport inside the container."""
-    print("🚀 Testing MCP with STDIO transport (container version)")
+    log("🚀 Testing MCP with STDIO transport (container version)")
     
     # Start the MCP server with STDIO transport
     # We're directly using the module since we're in the container
@@ -32,233 +150,222 @@ def test_mcp_stdio():
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1  # Line buffered
+            bufsize=65536  # Binary pipes; requests are written straight to the stdin fd
         )
         
-        # Set up a thread to monitor stderr and print it
-        def print_stderr():
+        # Server stderr is drained from the same select() loop as stdout instead of
+        # a reader thread, so its fd must never block
+        stderr_fd = process.stderr.fileno()
+        fcntl.fcntl(stderr_fd, fcntl.F_SETFL, fcntl.fcntl(stderr_fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+        
+        def drain_stderr():
+            chunks = []
             while True:
-                line = process.stderr.readline()
-                if not line:
+                try:
+                    chunk = os.read(stderr_fd, 65536)
+                except BlockingIOError:
                     break
-                print(f"🔴 SERVER ERROR: {line.strip()}")
-                
-        stderr_thread = threading.Thread(target=print_stderr, daemon=True)
-        stderr_thread.start()
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            
+            if chunks:
+                lines = b"".join(chunks).decode("utf-8", errors="replace").splitlines()
+                log("\n".join(f"🔴 SERVER ERROR: {line.strip()}" for line in lines))
         
-        print("Starting server process...")
-        # Sleep to allow server to initialize
-        time.sleep(2)
+        log("Starting server process...")
+        # No start-up sleep: the initialize request is sent right away and the server
+        # reads it once it is up, so its response doubles as the readiness signal
 
-        # Helper function to send a request and get a response
-        def send_request(request_data, request_desc="", expect_response=True):
-            request_json = json.dumps(request_data) + "\n"
-            print(f"\n📤 Sending {request_desc}: {request_json.strip()}")
+        # Responses are framed straight from the raw stdout fd: read 64 KiB at a time
+        # and split on newlines, without going through a text-mode line scanner
+        stdout_fd = process.stdout.fileno()
+        stdout_buffer = bytearray()
+        stdin_fd = process.stdin.fileno()
+        
+        # Helper function to read the next response frame (with timeout)
+        def read_response(request_desc="", timeout=10):
+            log(f"Waiting for {request_desc} response...")
+            # Monotonic deadline: immune to wall-clock jumps, computed once
+            deadline = time.monotonic() + timeout
             
-            try:
-                process.stdin.write(request_json)
-                process.stdin.flush()
-            except BrokenPipeError:
-                print(f"❌ Broken pipe when sending {request_desc}")
-                return None
+            while True:
+                # Hand out any complete frame that is already buffered
+                newline = stdout_buffer.find(b"\n")
+                if newline != -1:
+                    response_line = bytes(stdout_buffer[:newline]).strip()
+                    del stdout_buffer[:newline + 1]
+                    if response_line:
+                        log(f"📩 Received response: {response_line.decode('utf-8', errors='replace')}")
+                        try:
+                            return json.loads(response_line)
+                        except json.JSONDecodeError as e:
+                            log_error(f"❌ Error parsing response: {e}")
+                    continue
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
                 
-            # If we don't expect a response (notification), just return
-            if not expect_response:
-                print(f"✅ Sent {request_desc} (no response expected)")
-                return True
-            
-            # Read response with timeout
-            print(f"Waiting for {request_desc} response...")
-            start_time = time.time()
-            timeout = 10
-            
-            while time.time() - start_time < timeout:
                 # Check if process is still running
                 if process.poll() is not None:
-                    print(f"Server process exited with code {process.returncode}")
+                    log_error(f"Server process exited with code {process.returncode}")
                     return None
                 
-                # Try to read a line from stdout
-                response_line = process.stdout.readline().strip()
-                if response_line:
-                    print(f"📩 Received response: {response_line}")
-                    try:
-                        return json.loads(response_line)
-                    except json.JSONDecodeError as e:
-                        print(f"❌ Error parsing response: {e}")
+                # Block until stdout (or stderr) is readable instead of polling every 100ms
+                ready, _, _ = select.select([stdout_fd, stderr_fd], [], [], remaining)
+                if not ready:
+                    break
                 
-                # Wait a bit before trying again
-                time.sleep(0.1)
+                if stderr_fd in ready:
+                    drain_stderr()
+                if stdout_fd in ready:
+                    chunk = os.read(stdout_fd, 65536)
+                    if not chunk:
+                        log_error("Server closed stdout")
+                        return None
+                    stdout_buffer.extend(chunk)
             
-            print(f"⏱️ Timeout waiting for {request_desc} response")
+            log_error(f"⏱️ Timeout waiting for {request_desc} response")
             return None
         
-        # STEP 1: Initialize the server
-        print("\n=== STEP 1: Initialize Server ===")
-        initialize_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05", 
-                "clientInfo": {
-                    "name": "container-stdio-test",
-                    "version": "1.0.0"
-                },
-                "capabilities": {
-                    "tools": True,
-                    "resources": {
-                        "supportedSources": ["trino://catalog"]
-                    }
-                }
-            }
-        }
+        # Helper function to send a request and get a response (True for notifications)
+        def send_request(request_data, request_desc="", timeout=10):
+            [response] = send_batch([request_data], request_desc, timeout)
+            return response
+        
+        # Helper function to send several requests in one write and collect the
+        # responses by id; notifications (no id) get True in their slot. Requests
+        # are FIXED_REQUESTS names (sent pre-encoded) or dicts encoded here.
+        def send_batch(requests, request_desc="", timeout=10):
+            payload = b"".join(
+                ENCODED_REQUESTS[request] if isinstance(request, str) else encode_request(request)
+                for request in requests
+            )
+            requests = [FIXED_REQUESTS[request] if isinstance(request, str) else request for request in requests]
+            log(f"\n📤 Sending {request_desc}: {payload.decode('utf-8').strip()}")
+            
+            try:
+                # Straight to the pipe fd, bypassing the file object's buffering
+                view = memoryview(payload)
+                while view:
+                    view = view[os.write(stdin_fd, view):]
+            except BrokenPipeError:
+                log_error(f"❌ Broken pipe when sending {request_desc}")
+                return [None for _ in requests]
+            
+            pending = {request["id"] for request in requests if "id" in request}
+            if not pending:
+                # Only notifications - no response expected
+                drain_stderr()
+                log(f"✅ Sent {request_desc} (no response expected)")
+            
+            responses = {}
+            while pending:
+                response = read_response(request_desc, timeout)
+                if not response:
+                    break
+                if response.get("id") in pending:
+                    pending.discard(response["id"])
+                    responses[response["id"]] = response
+            
+            return [responses.get(request["id"]) if "id" in request else True for request in requests]
         
-        init_response = send_request(initialize_request, "initialize request")
+        # STEP 1: Initialize the server
+        log("\n=== STEP 1: Initialize Server ===")
+        # Allow for the server's start-up time on this first response
+        init_response = send_request("initialize", "initialize request", timeout=STARTUP_TIMEOUT)
         if not init_response:
             raise Exception("Failed to initialize MCP server")
 
         server_info = init_response.get("result", {}).get("serverInfo", {})
-        print(f"✅ Connected to server: {server_info.get('name')} {server_info.get('version')}")
-        
-        # STEP 2: Send initialized notification (no response expected)
-        print("\n=== STEP 2: Send Initialized Notification ===")
-        initialized_notification = {
-            "jsonrpc": "2.0",
-            "method": "notifications/initialized",
-            "params": {}  # Empty params object is required
-        }
-        _ = send_request(initialized_notification, "initialized notification", expect_response=False)
+        log(f"✅ Connected to server: {server_info.get('name')} {server_info.get('version')}")
         
-        # STEP 3: List available tools
-        print("\n=== STEP 3: List Available Tools ===")
-        tools_request = {
-            "jsonrpc": "2.0",
-            "id": 2,
-            "method": "tools/list"
-        }
-        
-        tools_response = send_request(tools_request, "tools list request")
+        # STEP 2 + 3: Send initialized notification and list tools in one write
+        log("\n=== STEP 2: Send Initialized Notification ===")
+        log("=== STEP 3: List Available Tools ===")
+        _, tools_response = send_batch(
+            ["initialized", "tools/list"],
+            "initialized notification + tools list request"
+        )
         if not tools_response:
-            print("❌ Failed to list tools")
+            log_error("❌ Failed to list tools")
         else:
             tools = tools_response.get("result", {}).get("tools", [])
-            print(f"✅ Available tools: {len(tools)}")
+            log(f"✅ Available tools: {len(tools)}")
             for tool in tools:
-                print(f"  - {tool.get('name')}: {tool.get('description', 'No description')}")
+                log(f"  - {tool.get('name')}: {tool.get('description', 'No description')}")
         
         # STEP 4: Execute a simple query
         if tools_response:
-            print("\n=== STEP 4: Execute Simple Query ===")
-            query_request = {
-                "jsonrpc": "2.0",
-                "id": 3,
-                "method": "tools/call",
-                "params": {
-                    "name": "execute_query",
-                    "arguments": {
-                        "sql": "SELECT 'Hello, world!' AS greeting",
-                        "catalog": "memory"
-                    }
-                }
-            }
+            log("\n=== STEP 4: Execute Simple Query ===")
+            query_request = query_call(3, "SELECT 'Hello, world!' AS greeting")
             
             query_response = send_request(query_request, "query execution")
             if not query_response:
-                print("❌ Failed to execute query")
+                log_error("❌ Failed to execute query")
             elif "error" in query_response:
-                print(f"❌ Query error: {json.dumps(query_response.get('error', {}), indent=2)}")
+                log_error(f"❌ Query error: {json.dumps(query_response.get('error', {}), indent=2)}")
             else:
-                result = query_response.get("result", {})
-                print(f"✅ Query executed successfully:")
-                print(f"  Columns: {', '.join(result.get('columns', []))}")
-                print(f"  Row count: {result.get('row_count', 0)}")
-                print(f"  Preview rows: {json.dumps(result.get('preview_rows', []), indent=2)}")
+                result = query_summary(query_response)
+                log(f"✅ Query executed successfully:")
+                log(f"  Columns: {', '.join(result['columns'])}")
+                log(f"  Row count: {result['row_count']}")
+                log(f"  Preview rows: {json.dumps(result['preview_rows'], indent=2)}")
         
             # STEP 5: Try to query a bullshit table
-            print("\n=== STEP 5: Query Bullshit Table ===")
-            bs_query_request = {
-                "jsonrpc": "2.0",
-                "id": 4,
-                "method": "tools/call",
-                "params": {
-                    "name": "execute_query",
-                    "arguments": {
-                        "sql": "SELECT * FROM memory.bullshit.bullshit_data LIMIT 3",
-                        "catalog": "memory"
-                    }
-                }
-            }
+            log("\n=== STEP 5: Query Bullshit Table ===")
+            bs_query_request = query_call(4, "SELECT * FROM memory.bullshit.bullshit_data LIMIT 3")
             
             bs_query_response = send_request(bs_query_request, "bullshit table query")
             if not bs_query_response:
-                print("❌ Failed to execute bullshit table query")
+                log_error("❌ Failed to execute bullshit table query")
             elif "error" in bs_query_response:
-                print(f"❌ Query error: {json.dumps(bs_query_response.get('error', {}), indent=2)}")
+                log_error(f"❌ Query error: {json.dumps(bs_query_response.get('error', {}), indent=2)}")
             else:
-                result = bs_query_response.get("result", {})
-                print(f"✅ Bullshit query executed successfully:")
-                print(f"  Columns: {', '.join(result.get('columns', []))}")
-                print(f"  Row count: {result.get('row_count', 0)}")
-                print(f"  Preview rows: {json.dumps(result.get('preview_rows', []), indent=2)}")
+                result = query_summary(bs_query_response)
+                log(f"✅ Bullshit query executed successfully:")
+                log(f"  Columns: {', '.join(result['columns'])}")
+                log(f"  Row count: {result['row_count']}")
+                log(f"  Preview rows: {json.dumps(result['preview_rows'], indent=2)}")
         
         # STEP 6: Try resources listing
-        print("\n=== STEP 6: List Resources ===")
-        resources_request = {
-            "jsonrpc": "2.0",
-            "id": 5,
-            "method": "resources/list",
-            "params": {
-                "source": "trino://catalog"
-            }
-        }
-        
-        resources_response = send_request(resources_request, "resources list request")
+        log("\n=== STEP 6: List Resources ===")
+        resources_response = send_request("resources/list", "resources list request")
         if not resources_response:
-            print("❌ Failed to list resources")
+            log_error("❌ Failed to list resources")
         elif "error" in resources_response:
-            print(f"❌ Resources error: {json.dumps(resources_response.get('error', {}), indent=2)}")
+            log_error(f"❌ Resources error: {json.dumps(resources_response.get('error', {}), indent=2)}")
         else:
             resources = resources_response.get("result", {}).get("items", [])
-            print(f"✅ Available resources: {len(resources)}")
+            log(f"✅ Available resources: {len(resources)}")
             for resource in resources:
-                print(f"  - {resource.get('source')}: {resource.get('path')}")
+                log(f"  - {resource.get('source')}: {resource.get('path')}")
         
         # STEP 7: Shutdown
-        print("\n=== STEP 7: Shutdown ===")
-        shutdown_request = {
-            "jsonrpc": "2.0",
-            "id": 6,
-            "method": "shutdown"
-        }
-        
-        shutdown_response = send_request(shutdown_request, "shutdown request")
-        print("✅ Server shutdown request sent")
-        
-        # Send exit notification (no response expected)
-        exit_notification = {
-            "jsonrpc": "2.0",
-            "method": "exit",
-            "params": {}  # Empty params may be needed
-        }
-        
-        _ = send_request(exit_notification, "exit notification", expect_response=False)
+        log("\n=== STEP 7: Shutdown ===")
+        # Exit notification (no response expected) goes out in the same write
+        shutdown_response, _ = send_batch(
+            ["shutdown", "exit"],
+            "shutdown request + exit notification"
+        )
+        log("✅ Server shutdown request sent")
         
     except Exception as e:
-        print(f"❌ Error: {e}")
+        log_error(f"❌ Error: {e}")
     finally:
         # Make sure to terminate the process
         if 'process' in locals() and process.poll() is None:
-            print("Terminating server process...")
+            log("Terminating server process...")
             process.terminate()
             try:
                 process.wait(timeout=5)
             except subprocess.TimeoutExpired:
-                print("Process didn't terminate, killing it...")
+                log("Process didn't terminate, killing it...")
                 process.kill()
         
-        print("\n🏁 Test completed!")
+        log("\n🏁 Test completed!")
+        flush_log()
 
 if __name__ == "__main__":
     test_mcp_stdio() 
\ No newline at end of file
@@ -3,48 +3,53 @@
 Direct test of Trino client session catalog handling.
 This script tests various ways to set the catalog name in Trino.
 """
+import os
 import sys
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import trino
 
-def test_trino_sessions():
-    """Test different approaches to setting the catalog in Trino sessions"""
-    print("🔬 Testing Trino session catalog handling")
-    
-    # Test 1: Default connection and USE statements
-    print("\n=== Test 1: Default connection with USE statements ===")
+# Set TRINO_DEBUG to print full tracebacks for failed tests
+DEBUG = bool(os.environ.get("TRINO_DEBUG"))
+
+def report_failure(output, test_name, e):
+    """Record a failed test, with the full traceback only in debug mode."""
+    output.append(f"❌ {test_name} failed: {e!r}")
+    if DEBUG:
+        output.append("".join(traceback.format_exception(type(e), e, e.__traceback__)).rstrip())
+
+def run_query(output, cursor, sql):
+    """Run a query on a cursor and record its result or error."""
     try:
-        conn = trino.dbapi.connect(
-            host="trino",
-            port=8080,
-            user="trino",
-            http_scheme="http"
-        )
-        
-        print("Connection established")
-        cursor1 = conn.cursor()
+        cursor.execute(sql)
+        result = cursor.fetchall()
+        output.append(f"Result: {result}")
+    except Exception as e:
+        output.append(f"❌ Query failed: {e}")
+
+def test_use_statement(shared_conn):
+    """Test 1: Default connection and USE statements"""
+    output = ["\n=== Test 1: Default connection with USE statements ==="]
+    try:
+        output.append("Using shared connection")
+        cursor1 = shared_conn.cursor()
         
         # Try to set catalog with USE statement
-        print("Setting catalog with USE statement")
+        output.append("Setting catalog with USE statement")
         cursor1.execute("USE memory")
         
         # Try a query with the set catalog
-        print("Executing query with set catalog")
-        try:
-            cursor1.execute("SELECT 1 as test")
-            result = cursor1.fetchall()
-            print(f"Result: {result}")
-        except Exception as e:
-            print(f"❌ Query failed: {e}")
-            
-        conn.close()
+        output.append("Executing query with set catalog")
+        run_query(output, cursor1, "SELECT 1 as test")
     except Exception as e:
-        print(f"❌ Test 1 failed: {e}")
-        traceback.print_exception(type(e), e, e.__traceback__)
-    
-    # Test 2: Connection with catalog parameter
-    print("\n=== Test 2: Connection with catalog parameter ===")
+        report_failure(output, "Test 1", e)
+    return output
+
+def test_catalog_parameter():
+    """Test 2: Connection with catalog parameter"""
+    output = ["\n=== Test 2: Connection with catalog parameter ==="]
     try:
         conn = trino.dbapi.connect(
             host="trino",
@@ -54,52 +59,35 @@ def test_trino_sessions():
             catalog="memory"
         )
         
-        print("Connection established with catalog parameter")
+        output.append("Connection established with catalog parameter")
         cursor2 = conn.cursor()
         
         # Try a query with the catalog parameter
-        print("Executing query with catalog parameter")
-        try:
-            cursor2.execute("SELECT 1 as test")
-            result = cursor2.fetchall()
-            print(f"Result: {result}")
-        except Exception as e:
-            print(f"❌ Query failed: {e}")
+        output.append("Executing query with catalog parameter")
+        run_query(output, cursor2, "SELECT 1 as test")
             
         conn.close()
     except Exception as e:
-        print(f"❌ Test 2 failed: {e}")
-        traceback.print_exception(type(e), e, e.__traceback__)
-    
-    # Test 3: Explicit catalog in query
-    print("\n=== Test 3: Explicit catalog in query ===")
+        report_failure(output, "Test 2", e)
+    return output
+
+def test_explicit_catalog(shared_conn):
+    """Test 3: Explicit catalog in query"""
+    output = ["\n=== Test 3: Explicit catalog in query ==="]
     try:
-        conn = trino.dbapi.connect(
-            host="trino",
-            port=8080,
-            user="trino",
-            http_scheme="http"
-        )
-        
-        print("Connection established")
-        cursor3 = conn.cursor()
+        output.append("Reusing shared connection")
+        cursor3 = shared_conn.cursor()
         
         # Try a query with explicit catalog in the query
-        print("Executing query with explicit catalog")
-        try:
-            cursor3.execute("SELECT 1 as test FROM memory.information_schema.tables WHERE 1=0")
-            result = cursor3.fetchall()
-            print(f"Result: {result}")
-        except Exception as e:
-            print(f"❌ Query failed: {e}")
-            
-        conn.close()
+        output.append("Executing query with explicit catalog")
+        run_query(output, cursor3, "SELECT 1 as test FROM memory.information_schema.tables WHERE 1=0")
     except Exception as e:
-        print(f"❌ Test 3 failed: {e}")
-        traceback.print_exception(type(e), e, e.__traceback__)
-    
-    # Test 4: Connection parameters with session properties
-    print("\n=== Test 4: Connection with session properties ===")
+        report_failure(output, "Test 3", e)
+    return output
+
+def test_session_properties():
+    """Test 4: Connection parameters with session properties"""
+    output = ["\n=== Test 4: Connection with session properties ==="]
     try:
         conn = trino.dbapi.connect(
             host="trino",
@@ -110,24 +98,49 @@ def test_trino_sessions():
             session_properties={"catalog": "memory"}
         )
         
-        print("Connection established with session properties")
+        output.append("Connection established with session properties")
         cursor4 = conn.cursor()
         
         # Try a query with session properties
-        print("Executing query with session properties")
-        try:
-            cursor4.execute("SELECT 1 as test")
-            result = cursor4.fetchall()
-            print(f"Result: {result}")
-        except Exception as e:
-            print(f"❌ Query failed: {e}")
+        output.append("Executing query with session properties")
+        run_query(output, cursor4, "SELECT 1 as test")
             
         conn.close()
     except Exception as e:
-        print(f"❌ Test 4 failed: {e}")
-        traceback.print_exception(type(e), e, e.__traceback__)
+        report_failure(output, "Test 4", e)
+    return output
+
+def test_trino_sessions():
+    """Test different approaches to setting the catalog in Trino sessions"""
+    # All output is collected and written in one go at the end
+    output = ["🔬 Testing Trino session catalog handling"]
+    
+    # Tests 1 and 3 use the same connection parameters, so they share one
+    # connection (and its HTTP session) and only open their own cursors.
+    # Test 3 names the catalog in the query, so the USE from Test 1 doesn't matter.
+    shared_conn = trino.dbapi.connect(
+        host="trino",
+        port=8080,
+        user="trino",
+        http_scheme="http"
+    )
+    
+    # The tests are independent and mostly wait on Trino, so run them concurrently.
+    # Each test collects its own output, added as a block when it finishes.
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(test_use_statement, shared_conn),
+            executor.submit(test_catalog_parameter),
+            executor.submit(test_explicit_catalog, shared_conn),
+            executor.submit(test_session_properties)
+        ]
+        for future in as_completed(futures):
+            output.extend(future.result())
+    
+    shared_conn.close()
     
-    print("\n🏁 Testing complete!")
+    output.append("\n🏁 Testing complete!")
+    sys.stdout.write("\n".join(output) + "\n")
 
 if __name__ == "__main__":
-    test_trino_sessions() 
\ No newline at end of file
+    test_trino_sessions()
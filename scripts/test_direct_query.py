@@ -3,6 +3,7 @@
 Direct test script that bypasses MCP and uses the Trino client directly.
 This helps determine if the issue is with the MCP protocol or with Trino.
 """
+import sys
 import time
 import argparse
 from typing import Optional, Dict, Any
@@ -11,11 +12,29 @@ from typing import Optional, Dict, Any
 from src.trino_mcp.trino_client import TrinoClient
 from src.trino_mcp.config import TrinoConfig
 
+# Output is collected here and written in one go at the end
+OUTPUT = []
+
+def log(*args):
+    """Buffer a line of output."""
+    OUTPUT.append(" ".join(map(str, args)) + "\n")
+
+def flush_log():
+    """Write all buffered output at once."""
+    sys.stdout.write("".join(OUTPUT))
+    sys.stdout.flush()
+    OUTPUT.clear()
+
+def log_error(*args):
+    """Print an error right away, after any output buffered before it."""
+    flush_log()
+    print(*args, flush=True)
+
 def main():
     """
     Run direct queries against Trino without using MCP.
     """
-    print("Direct Trino test - bypassing MCP")
+    log("Direct Trino test - bypassing MCP")
     
     # Configure Trino client
     config = TrinoConfig(
@@ -31,74 +50,83 @@ def main():
     
     try:
         # Connect to Trino
-        print("Connecting to Trino...")
+        log("Connecting to Trino...")
         client.connect()
-        print("Connected successfully!")
+        log("Connected successfully!")
         
         # List catalogs
-        print("\nListing catalogs:")
+        log("\nListing catalogs:")
         catalogs = client.get_catalogs()
         for catalog in catalogs:
-            print(f"- {catalog['name']}")
+            log(f"- {catalog['name']}")
             
         # List schemas in memory catalog
-        print("\nListing schemas in memory catalog:")
+        log("\nListing schemas in memory catalog:")
         schemas = client.get_schemas("memory")
+        schema_names = {schema['name'] for schema in schemas}
         for schema in schemas:
-            print(f"- {schema['name']}")
+            log(f"- {schema['name']}")
             
         # Look for our test schema
-        if any(schema['name'] == 'bullshit' for schema in schemas):
-            print("\nFound our test schema 'bullshit'")
+        if 'bullshit' in schema_names:
+            log("\nFound our test schema 'bullshit'")
             
             # List tables
-            print("\nListing tables in memory.bullshit:")
+            log("\nListing tables in memory.bullshit:")
             tables = client.get_tables("memory", "bullshit")
+            table_names = {table['name'] for table in tables}
             for table in tables:
-                print(f"- {table['name']}")
+                log(f"- {table['name']}")
                 
             # Query the data table
-            if any(table['name'] == 'bullshit_data' for table in tables):
-                print("\nQuerying memory.bullshit.bullshit_data:")
-                result = client.execute_query("SELECT * FROM memory.bullshit.bullshit_data")
+            if 'bullshit_data' in table_names:
+                log("\nQuerying memory.bullshit.bullshit_data:")
                 
                 # Print columns
-                print(f"Columns: {', '.join(result.columns)}")
+                columns = client.get_table_columns("memory", "bullshit", "bullshit_data")
+                log(f"Columns: {', '.join(columns)}")
                 
-                # Print rows
-                print(f"Rows ({result.row_count}):")
-                for row in result.rows:
-                    print(f"  {row}")
+                # Print rows as they are fetched instead of materializing the whole table
+                log("Rows:")
+                row_count = 0
+                for batch in client.execute_query_stream("SELECT * FROM memory.bullshit.bullshit_data"):
+                    for row in batch:
+                        log(f"  {row}")
+                    row_count += len(batch)
+                    # One write per fetched batch keeps the buffer bounded too
+                    flush_log()
+                log(f"({row_count} rows)")
                     
                 # Query the summary view
-                if any(table['name'] == 'bullshit_summary' for table in tables):
-                    print("\nQuerying memory.bullshit.bullshit_summary:")
+                if 'bullshit_summary' in table_names:
+                    log("\nQuerying memory.bullshit.bullshit_summary:")
                     result = client.execute_query(
                         "SELECT * FROM memory.bullshit.bullshit_summary ORDER BY count DESC"
                     )
                     
                     # Print columns
-                    print(f"Columns: {', '.join(result.columns)}")
+                    log(f"Columns: {', '.join(result.columns)}")
                     
                     # Print rows
-                    print(f"Rows ({result.row_count}):")
+                    log(f"Rows ({result.row_count}):")
                     for row in result.rows:
-                        print(f"  {row}")
+                        log(f"  {row}")
                 else:
-                    print("Summary view not found")
+                    log("Summary view not found")
             else:
-                print("Data table not found")
+                log("Data table not found")
         else:
-            print("Test schema 'bullshit' not found")
+            log("Test schema 'bullshit' not found")
             
     except Exception as e:
-        print(f"Error: {e}")
+        log_error(f"Error: {e}")
     finally:
         # Disconnect
-        if client.conn:
-            print("\nDisconnecting from Trino...")
+        if client.is_connected:
+            log("\nDisconnecting from Trino...")
             client.disconnect()
-            print("Disconnected.")
+            log("Disconnected.")
+        flush_log()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
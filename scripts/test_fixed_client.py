@@ -3,38 +3,122 @@
 Fixed test script for the MCP server that uses the correct notification format.
 This should actually work with MCP 1.3.0.
 """
+import asyncio
+import importlib.util
 import json
-import requests
 import sys
-import time
-import sseclient
+from collections import namedtuple
+
+import httpx
 from rich.console import Console
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
+
 console = Console()
+# Errors bypass the buffered console below and show up immediately
+error_console = Console(stderr=True)
+
+# With the optional h2 package, the SSE stream and every POST are multiplexed
+# over one HTTP/2 connection; otherwise the POSTs share one keep-alive connection
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+if orjson is not None:
+    dumps_bytes = orjson.dumps
+    loads = orjson.loads
+else:
+    def dumps_bytes(obj):
+        """Serialize obj to compact UTF-8 JSON bytes."""
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    loads = json.loads
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+SSEEvent = namedtuple("SSEEvent", ["event", "data"])
+
+INITIALIZE_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2024-11-05",
+        "clientInfo": {
+            "name": "fixed-test-client",
+            "version": "1.0.0"
+        },
+        "capabilities": {
+            "tools": True,
+            "resources": {
+                "supportedSources": ["trino://catalog"]
+            }
+        }
+    }
+}
+
+# Encoded before the SSE connection is opened, so the initialize POST can go out
+# the moment the endpoint event arrives
+INITIALIZE_PAYLOAD = dumps_bytes(INITIALIZE_REQUEST)
 
-def test_mcp():
+async def post_json(http, url, message):
+    """POST a JSON-RPC message (a dict, or already-encoded bytes)."""
+    content = message if isinstance(message, bytes) else dumps_bytes(message)
+    return await http.post(url, content=content, headers=JSON_HEADERS)
+
+async def iter_sse_events(response):
+    """
+    Yield the events of a streaming SSE response.
+    
+    Lines are read straight off the httpx stream; a blank line ends an event.
+    """
+    event, data = "message", []
+    async for line in response.aiter_lines():
+        if not line:
+            if data:
+                yield SSEEvent(event, "\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip())
+
+async def test_mcp():
     """
     Test the MCP server with proper message formats.
     Fixes the notification format to work with MCP 1.3.0.
     """
     console.print("[bold green]🚀 Starting MCP client test with fixed notification format[/]")
     
-    # Connect to SSE endpoint
-    console.print("[bold blue]Connecting to SSE endpoint...[/]")
-    headers = {"Accept": "text/event-stream"}
-    sse_response = requests.get("http://localhost:9096/sse", headers=headers, stream=True)
-    client = sseclient.SSEClient(sse_response)
-    
+    async with httpx.AsyncClient(timeout=None, http2=HTTP2) as http:
+        # Connect to SSE endpoint
+        console.print("[bold blue]Connecting to SSE endpoint...[/]")
+        headers = {"Accept": "text/event-stream"}
+        async with http.stream("GET", "http://localhost:9096/sse", headers=headers) as sse_response:
+            # Rich buffers everything printed inside `with console:` and writes it
+            # out in one go on exit, instead of one write per console.print()
+            with console:
+                await run_session(http, iter_sse_events(sse_response))
+        console.print("[bold green]Test completed. Connection closed.[/]")
+
+async def run_session(http, events):
+    """Run the MCP exchange over an open SSE event stream."""
     # Get the messages URL from the first event
     messages_url = None
     session_id = None
+    initialize_post = None
     
-    for event in client.events():
+    async for event in events:
+        if event.event == "endpoint":
+            # Send initialize right away; the logging below overlaps with the request
+            messages_url = f"http://localhost:9096{event.data}"
+            initialize_post = asyncio.create_task(post_json(http, messages_url, INITIALIZE_PAYLOAD))
+        
         console.print(f"[cyan]SSE event:[/] {event.event}")
         console.print(f"[cyan]SSE data:[/] {event.data}")
         
-        if event.event == "endpoint":
-            messages_url = f"http://localhost:9096{event.data}"
+        if messages_url:
             # Extract session ID from URL
             if "session_id=" in event.data:
                 session_id = event.data.split("session_id=")[1]
@@ -43,132 +127,108 @@ def test_mcp():
             break
     
     if not messages_url:
-        console.print("[bold red]Failed to get messages URL from SSE[/]")
+        error_console.print("[bold red]Failed to get messages URL from SSE[/]")
         return
     
-    # Now we have the messages URL, send initialize request
-    console.print(f"\n[bold blue]Sending initialize request to {messages_url}[/]")
-    initialize_request = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "initialize",
-        "params": {
-            "protocolVersion": "2024-11-05",
-            "clientInfo": {
-                "name": "fixed-test-client",
-                "version": "1.0.0"
-            },
-            "capabilities": {
-                "tools": True,
-                "resources": {
-                    "supportedSources": ["trino://catalog"]
-                }
-            }
-        }
-    }
+    # Now we have the messages URL; the initialize request is already in flight
+    console.print(f"\n[bold blue]Sent initialize request to {messages_url}[/]")
     
     try:
-        response = requests.post(messages_url, json=initialize_request)
+        response = await initialize_post
         console.print(f"[cyan]Status code:[/] {response.status_code}")
         console.print(f"[cyan]Response:[/] {response.text}")
         
         # Continue listening for events to get the response
         console.print("\n[bold blue]Listening for response events...[/]")
         
-        # Start a timeout counter
-        start_time = time.time()
-        timeout = 30  # 30 seconds timeout
-        
-        # Keep listening for events
-        for event in client.events():
-            # Skip ping events
-            if event.event == "ping":
-                continue
+        # One deadline for the whole exchange instead of a clock check per event
+        await asyncio.wait_for(handle_events(http, events, messages_url), timeout=30)
                 
-            console.print(f"[magenta]Event type:[/] {event.event}")
-            console.print(f"[magenta]Event data:[/] {event.data}")
+    except asyncio.TimeoutError:
+        error_console.print("[bold yellow]Timeout waiting for response[/]")
+    except Exception as e:
+        error_console.print(f"[bold red]Error:[/] {e}")
+
+async def handle_events(http, events, messages_url):
+    """React to response events until the stream ends."""
+    async for event in events:
+        # Skip ping events
+        if event.event == "ping":
+            continue
             
-            # If we get a message event, parse it
-            if event.event == "message" and event.data:
-                try:
-                    data = json.loads(event.data)
-                    console.print(f"[green]Parsed message:[/] {json.dumps(data, indent=2)}")
+        console.print(f"[magenta]Event type:[/] {event.event}")
+        console.print(f"[magenta]Event data:[/] {event.data}")
+        
+        # If we get a message event, parse it
+        if event.event == "message" and event.data:
+            try:
+                data = loads(event.data)
+                console.print(f"[green]Parsed message:[/] {json.dumps(data, indent=2)}")
+                
+                # Check if this is a response to our initialize request
+                if "id" in data and data["id"] == 1:
+                    # Send an initialization notification with CORRECT FORMAT
+                    console.print("\n[bold blue]Sending initialized notification with correct format...[/]")
+                    initialized_notification = {
+                        "jsonrpc": "2.0",
+                        "method": "notifications/initialized",  # FIXED: correct method name
+                        "params": {}  # FIXED: added required params
+                    }
+                    response = await post_json(http, messages_url, initialized_notification)
+                    console.print(f"[cyan]Status code:[/] {response.status_code}")
+                    console.print(f"[cyan]Response:[/] {response.text}")
                     
-                    # Check if this is a response to our initialize request
-                    if "id" in data and data["id"] == 1:
-                        # Send an initialization notification with CORRECT FORMAT
-                        console.print("\n[bold blue]Sending initialized notification with correct format...[/]")
-                        initialized_notification = {
-                            "jsonrpc": "2.0",
-                            "method": "notifications/initialized",  # FIXED: correct method name
-                            "params": {}  # FIXED: added required params
-                        }
-                        response = requests.post(messages_url, json=initialized_notification)
-                        console.print(f"[cyan]Status code:[/] {response.status_code}")
-                        console.print(f"[cyan]Response:[/] {response.text}")
-                        
-                        # Now send a tools/list request
-                        console.print("\n[bold blue]Sending tools/list request...[/]")
-                        tools_request = {
-                            "jsonrpc": "2.0",
-                            "id": 2,
-                            "method": "tools/list"
-                        }
-                        response = requests.post(messages_url, json=tools_request)
-                        console.print(f"[cyan]Status code:[/] {response.status_code}")
-                        console.print(f"[cyan]Response:[/] {response.text}")
-                        
-                    # Check if this is a response to our tools/list request
-                    if "id" in data and data["id"] == 2:
-                        # Now send a resources/list request for trino catalogs
-                        console.print("\n[bold blue]Sending resources/list request for trino catalogs...[/]")
-                        resources_request = {
-                            "jsonrpc": "2.0",
-                            "id": 3,
-                            "method": "resources/list",
-                            "params": {
-                                "source": "trino://catalog"
-                            }
+                    # Now send a tools/list request
+                    console.print("\n[bold blue]Sending tools/list request...[/]")
+                    tools_request = {
+                        "jsonrpc": "2.0",
+                        "id": 2,
+                        "method": "tools/list"
+                    }
+                    response = await post_json(http, messages_url, tools_request)
+                    console.print(f"[cyan]Status code:[/] {response.status_code}")
+                    console.print(f"[cyan]Response:[/] {response.text}")
+                    
+                # Check if this is a response to our tools/list request
+                if "id" in data and data["id"] == 2:
+                    # Now send a resources/list request for trino catalogs
+                    console.print("\n[bold blue]Sending resources/list request for trino catalogs...[/]")
+                    resources_request = {
+                        "jsonrpc": "2.0",
+                        "id": 3,
+                        "method": "resources/list",
+                        "params": {
+                            "source": "trino://catalog"
                         }
-                        response = requests.post(messages_url, json=resources_request)
-                        console.print(f"[cyan]Status code:[/] {response.status_code}")
-                        console.print(f"[cyan]Response:[/] {response.text}")
-                        
-                    # If we get the resource list, try to execute a query
-                    if "id" in data and data["id"] == 3:
-                        console.print("\n[bold green]🔥 Got resources! Now trying to execute a query...[/]")
-                        query_request = {
-                            "jsonrpc": "2.0",
-                            "id": 4,
-                            "method": "tools/call",
-                            "params": {
-                                "name": "execute_query",
-                                "arguments": {
-                                    "sql": "SELECT 1 AS test_value, 'it works!' AS message",
-                                    "catalog": "memory"
-                                }
+                    }
+                    response = await post_json(http, messages_url, resources_request)
+                    console.print(f"[cyan]Status code:[/] {response.status_code}")
+                    console.print(f"[cyan]Response:[/] {response.text}")
+                    
+                # If we get the resource list, try to execute a query
+                if "id" in data and data["id"] == 3:
+                    console.print("\n[bold green]🔥 Got resources! Now trying to execute a query...[/]")
+                    query_request = {
+                        "jsonrpc": "2.0",
+                        "id": 4,
+                        "method": "tools/call",
+                        "params": {
+                            "name": "execute_query",
+                            "arguments": {
+                                "sql": "SELECT 1 AS test_value, 'it works!' AS message",
+                                "catalog": "memory"
                             }
                         }
-                        response = requests.post(messages_url, json=query_request)
-                        console.print(f"[cyan]Status code:[/] {response.status_code}")
-                        console.print(f"[cyan]Response:[/] {response.text}")
-                        
-                except Exception as e:
-                    console.print(f"[bold red]Error parsing message:[/] {e}")
+                    }
+                    response = await post_json(http, messages_url, query_request)
+                    console.print(f"[cyan]Status code:[/] {response.status_code}")
+                    console.print(f"[cyan]Response:[/] {response.text}")
                     
-            # Check timeout
-            if time.time() - start_time > timeout:
-                console.print("[bold yellow]Timeout waiting for response[/]")
-                break
-                
-    except KeyboardInterrupt:
-        console.print("\n[bold yellow]Exiting...[/]")
-    except Exception as e:
-        console.print(f"[bold red]Error:[/] {e}")
-    finally:
-        # Close the SSE connection
-        sse_response.close()
-        console.print("[bold green]Test completed. Connection closed.[/]")
-        
+            except Exception as e:
+                error_console.print(f"[bold red]Error parsing message:[/] {e}")
+    
 if __name__ == "__main__":
-    test_mcp() 
\ No newline at end of file
+    try:
+        asyncio.run(test_mcp())
+    except KeyboardInterrupt:
+        console.print("\n[bold yellow]Exiting...[/]") 
\ No newline at end of file
@@ -6,4 +6,5 @@ It enables AI systems to interact with Trino databases using the standardized
 MCP protocol.
 """
 
-__version__ = "0.1.2"
+__version_info__ = (0, 1, 2)
+__version__ = ".".join(map(str, __version_info__))
@@ -0,0 +1,216 @@
+"""
+In-process caching for the Trino MCP server.
+"""
+import enum
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar, Union, overload
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+D = TypeVar("D")
+
+
+class _Missing(enum.Enum):
+    """Distinguishes "not cached" from a cached None."""
+    MISSING = enum.auto()
+
+
+_MISSING = _Missing.MISSING
+
+
+class TTLCache(Generic[K, V]):
+    """
+    A small LRU cache whose entries also expire after a fixed time.
+    
+    Used for metadata lookups and query results, which are asked for over and
+    over; entries are reused until they expire. Failed loads are never cached.
+    
+    Safe to share between threads. Concurrent misses on the same key in get()
+    share the first caller's load instead of each running their own, and get its
+    result even when it is too costly to store. A load that was running when the
+    cache was cleared hands its result to its callers but does not store it.
+    
+    With a `cost` function the entries are also bounded by their total cost
+    (e.g. an estimate of their size in bytes), not just by their number.
+    
+    Typed by key and value, e.g. `TTLCache[str, TrinoQueryResult]`.
+    """
+    
+    def __init__(
+        self,
+        ttl: float,
+        maxsize: int,
+        max_cost: Optional[int] = None,
+        cost: Optional[Callable[[V], int]] = None,
+        max_entry_cost: Optional[int] = None
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            ttl: Seconds an entry stays valid.
+            maxsize: Maximum number of entries kept.
+            max_cost: Maximum total cost of the entries kept; needs `cost`.
+            cost: Returns the cost of a value.
+            max_entry_cost: Values costing more are never stored (default: max_cost).
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.max_cost = max_cost
+        self.max_entry_cost = max_cost if max_entry_cost is None else max_entry_cost
+        self._cost = cost
+        # Insertion ordered: least recently used first
+        self._entries: Dict[K, Tuple[float, V]] = {}
+        # Cost of every entry (only tracked with a cost function)
+        self._costs: Dict[K, int] = {}
+        self._total_cost = 0
+        self._lock = threading.Lock()
+        # The result of every load get() is running, by key
+        self._loading: Dict[K, Future[V]] = {}
+        # Bumped by clear(), so a load started before it stores nothing
+        self._generation = 0
+    
+    @overload
+    def lookup(self, key: K) -> Optional[V]: ...
+    
+    @overload
+    def lookup(self, key: K, default: D) -> Union[V, D]: ...
+    
+    def lookup(self, key: K, default: Any = None) -> Any:
+        """
+        Return the cached value for `key`, or `default` if missing or expired.
+        
+        Args:
+            key: The cache key.
+            default: Returned when there is no valid entry.
+        
+        Returns:
+            The cached value or `default`.
+        """
+        with self._lock:
+            return self._lookup(key, default)
+    
+    def _lookup(self, key: K, default: D) -> Union[V, D]:
+        """lookup() for a caller that holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        if entry[0] <= time.monotonic():
+            self._remove(key)
+            return default
+        
+        # Mark as most recently used
+        self._entries[key] = self._entries.pop(key)
+        return entry[1]
+    
+    def get(self, key: K, load: Callable[..., V], *args: Any) -> V:
+        """
+        Return the cached value for `key`, calling `load(*args)` on a miss or expiry.
+        
+        Passing the arguments through (rather than wrapping the call in a lambda)
+        lets callers hand over a bound method directly, with nothing allocated on
+        a hit.
+        
+        Args:
+            key: The cache key.
+            load: Produces the value; exceptions propagate (to every caller
+                sharing the load) and nothing is stored.
+            *args: Arguments for `load`.
+        
+        Returns:
+            The cached or freshly loaded value.
+        """
+        value = self.lookup(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        
+        with self._lock:
+            # Another thread may have stored it since the lookup above
+            value = self._lookup(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            running = self._loading.get(key)
+            if running is None:
+                future: Future[V] = Future()
+                self._loading[key] = future
+                generation = self._generation
+        if running is not None:
+            return running.result()
+        
+        try:
+            value = load(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            self._store(key, value, generation)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                if self._loading.get(key) is future:
+                    del self._loading[key]
+    
+    def put(self, key: K, value: V) -> None:
+        """
+        Store a value, e.g. to prime entries from a bulk lookup.
+        
+        A value costing more than `max_entry_cost` is not stored (and replaces
+        nothing).
+        
+        Args:
+            key: The cache key.
+            value: The value to cache.
+        """
+        self._store(key, value, None)
+    
+    def _store(self, key: K, value: V, generation: Optional[int]) -> None:
+        """put(), skipped if the cache was cleared since `generation` (when given)."""
+        cost = self._cost(value) if self._cost is not None else 0
+        if self.max_entry_cost is not None and cost > self.max_entry_cost:
+            return
+        
+        now = time.monotonic()
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._remove(key)
+            if len(self._entries) >= self.maxsize:
+                self._evict(now)
+            if self.max_cost is not None:
+                # Least recently used first, until the new entry fits
+                while self._entries and self._total_cost + cost > self.max_cost:
+                    self._remove(next(iter(self._entries)))
+            self._entries[key] = (now + self.ttl, value)
+            if self._cost is not None:
+                self._costs[key] = cost
+                self._total_cost += cost
+    
+    def _remove(self, key: K) -> None:
+        """Drop an entry, if present, along with its cost."""
+        if self._entries.pop(key, None) is not None:
+            self._total_cost -= self._costs.pop(key, 0)
+    
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, or the least recently used one if none have expired."""
+        expired = [key for key, (expires, _) in self._entries.items() if expires <= now]
+        for key in expired:
+            self._remove(key)
+        if not expired:
+            self._remove(next(iter(self._entries)))
+    
+    def clear(self) -> None:
+        """
+        Forget every cached entry.
+        
+        Loads still running finish for their current callers, but store nothing,
+        and later misses start a load of their own rather than sharing them.
+        """
+        with self._lock:
+            self._generation += 1
+            self._loading.clear()
+            self._entries.clear()
+            self._costs.clear()
+            self._total_cost = 0
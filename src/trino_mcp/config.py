@@ -2,10 +2,12 @@
 Configuration module for the Trino MCP server.
 """
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
+from trino_mcp import __version__
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class TrinoConfig:
     """Configuration for the Trino connection."""
     host: str = "localhost"
@@ -20,10 +22,26 @@ class TrinoConfig:
     request_timeout: float = 30.0
     http_headers: Dict[str, str] = field(default_factory=dict)
     verify: bool = True
+    # Number of pooled connections TrinoClient keeps open
+    pool_size: int = 10
+    # Seconds to wait for a free pooled connection before giving up
+    pool_timeout: float = 30.0
+    # Built once on first access to connection_params (the config is frozen)
+    _connection_params: Optional[Dict[str, Any]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @property
     def connection_params(self) -> Dict[str, Any]:
-        """Return connection parameters for the Trino client."""
+        """
+        Return connection parameters for the Trino client.
+        
+        The dict is built once and reused; the fields can't change afterwards
+        (cached_property needs an instance __dict__, which slots rules out).
+        """
+        if self._connection_params is not None:
+            return self._connection_params
+        
         params = {
             "host": self.host,
             "port": self.port,
@@ -43,20 +61,29 @@ class TrinoConfig:
             
         if self.http_headers:
             params["http_headers"] = self.http_headers
-            
+        
+        object.__setattr__(self, "_connection_params", params)
         return params
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ServerConfig:
     """Configuration for the MCP server."""
     name: str = "Trino MCP"
-    version: str = "0.1.0"
+    version: str = __version__
     transport_type: str = "stdio"  # "stdio" or "sse"
     host: str = "127.0.0.1"
     port: int = 3000
     debug: bool = False
+    # Prefetch catalogs, schemas and tables into the metadata cache at startup
+    warm_metadata: bool = False
     trino: TrinoConfig = field(default_factory=TrinoConfig)
+    # Numeric parts of `version`, for cheap tuple comparisons (e.g. >= (0, 2, 0))
+    version_info: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        version_info = tuple(int(part) for part in self.version.split(".") if part.isdigit())
+        object.__setattr__(self, "version_info", version_info)
 
 
 def load_config_from_env() -> ServerConfig:
@@ -1,29 +1,59 @@
 """
 MCP resources for interacting with Trino.
 """
+import asyncio
+import functools
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Coroutine, Dict, Hashable, List, Optional, Tuple, TypeVar, cast
 
+from loguru import logger
 from mcp.server.fastmcp import Context, FastMCP
 
 from trino_mcp.trino_client import TrinoClient
 
+T = TypeVar("T")
 
-def register_trino_resources(mcp: FastMCP, client: TrinoClient) -> None:
+# Most metadata queries the startup prefetch runs at once
+METADATA_CONCURRENCY = 8
+
+
+def register_trino_resources(mcp: FastMCP, client: TrinoClient) -> Callable[[], Coroutine[Any, Any, None]]:
     """
     Register Trino resources with the MCP server.
     
     Args:
         mcp: The MCP server instance.
         client: The Trino client instance.
+        
+    Returns:
+        A coroutine function that prefetches the catalogs, their schemas and
+        their tables into the client's metadata cache.
     """
+    cache = client.metadata_cache
+    
+    def cached(key: Tuple[Hashable, ...], load: Callable[..., T], *args: Any) -> T:
+        """
+        cache.get(), typed by what `load` returns.
+        
+        The metadata cache holds values of several kinds; each key prefix
+        ("columns", "tables", ...) only ever holds what its loader returns.
+        """
+        return cast(T, cache.get(key, load, *args))
+    
+    def get_columns(catalog: str, schema: str, table: str) -> List[Dict[str, Any]]:
+        """Cached column list shared by the columns and column resources."""
+        return cached(("columns", catalog, schema, table), client.get_columns, catalog, schema, table)
+    
+    def index_columns(catalog: str, schema: str, table: str) -> Dict[str, Dict[str, Any]]:
+        """Map column name to column, for get_column's cached lookups."""
+        return {col["name"]: col for col in get_columns(catalog, schema, table)}
     
     @mcp.resource("trino://catalog")
     def list_catalogs() -> List[Dict[str, Any]]:
         """
         List all available Trino catalogs.
         """
-        return client.get_catalogs()
+        return cached(("catalogs",), client.get_catalogs)
     
     @mcp.resource("trino://catalog/{catalog}")
     def get_catalog(catalog: str) -> Dict[str, Any]:
@@ -38,7 +68,39 @@ def register_trino_resources(mcp: FastMCP, client: TrinoClient) -> None:
         """
         List all schemas in a Trino catalog.
         """
-        return client.get_schemas(catalog)
+        return cached(("schemas", catalog), client.get_schemas, catalog)
+    
+    @mcp.resource("trino://catalog/{catalog}/tables")
+    def list_catalog_tables(catalog: str) -> List[Dict[str, Any]]:
+        """
+        List the tables of every schema in a Trino catalog.
+        """
+        def load() -> List[Dict[str, Any]]:
+            schemas = [schema["name"] for schema in list_schemas(catalog)]
+            tables_by_schema = client.get_tables_bulk(catalog, schemas)
+            
+            # One response answers every per-schema tables resource in the catalog
+            for schema, tables in tables_by_schema.items():
+                cache.put(("tables", catalog, schema), tables)
+            return [table for tables in tables_by_schema.values() for table in tables]
+        
+        return cached(("catalog_tables", catalog), load)
+    
+    @mcp.resource("trino://catalog/{catalog}/columns")
+    def list_catalog_columns(catalog: str) -> List[Dict[str, Any]]:
+        """
+        List the columns of every table in a Trino catalog.
+        """
+        def load() -> List[Dict[str, Any]]:
+            schemas = [schema["name"] for schema in list_schemas(catalog)]
+            columns_by_table = client.get_columns_bulk(catalog, schemas)
+            
+            # One response answers every per-table columns resource in the catalog
+            for (schema, table), columns in columns_by_table.items():
+                cache.put(("columns", catalog, schema, table), columns)
+            return [col for columns in columns_by_table.values() for col in columns]
+        
+        return cached(("catalog_columns", catalog), load)
     
     @mcp.resource("trino://catalog/{catalog}/schema/{schema}")
     def get_schema(catalog: str, schema: str) -> Dict[str, Any]:
@@ -52,31 +114,32 @@ def register_trino_resources(mcp: FastMCP, client: TrinoClient) -> None:
         """
         List all tables in a Trino schema.
         """
-        return client.get_tables(catalog, schema)
+        return cached(("tables", catalog, schema), client.get_tables, catalog, schema)
     
     @mcp.resource("trino://catalog/{catalog}/schema/{schema}/table/{table}")
     def get_table(catalog: str, schema: str, table: str) -> Dict[str, Any]:
         """
         Get information about a specific Trino table.
         """
-        return client.get_table_details(catalog, schema, table)
+        return cached(("table", catalog, schema, table), client.get_table_details, catalog, schema, table)
     
     @mcp.resource("trino://catalog/{catalog}/schema/{schema}/table/{table}/columns")
     def list_columns(catalog: str, schema: str, table: str) -> List[Dict[str, Any]]:
         """
         List all columns in a Trino table.
         """
-        return client.get_columns(catalog, schema, table)
+        return get_columns(catalog, schema, table)
     
     @mcp.resource("trino://catalog/{catalog}/schema/{schema}/table/{table}/column/{column}")
     def get_column(catalog: str, schema: str, table: str, column: str) -> Dict[str, Any]:
         """
         Get information about a specific Trino column.
         """
-        columns = client.get_columns(catalog, schema, table)
-        for col in columns:
-            if col["name"] == column:
-                return col
+        columns_by_name = cached(
+            ("columns_by_name", catalog, schema, table), index_columns, catalog, schema, table
+        )
+        if column in columns_by_name:
+            return columns_by_name[column]
         
         # If column not found, return a basic structure
         return {
@@ -98,3 +161,46 @@ def register_trino_resources(mcp: FastMCP, client: TrinoClient) -> None:
             "query_id": query_id,
             "error": "Query results not available. This resource is for demonstration purposes only."
         }
+    
+    async def warm_metadata() -> None:
+        """
+        Fetch the catalog list, every catalog's schemas and then their tables.
+        
+        One query answers the catalogs and schemas; if it fails, the schemas are
+        fetched one query per catalog instead. Tables take one query per catalog.
+        The per-catalog queries run concurrently, at most METADATA_CONCURRENCY
+        at a time, and a failing catalog only logs a warning; the others carry on.
+        """
+        limit = asyncio.Semaphore(METADATA_CONCURRENCY)
+        
+        async def limited(job: Callable[[], Coroutine[Any, Any, None]]) -> None:
+            async with limit:
+                await job()
+        
+        async def prefetch(what: str, load: Callable[[str], Any], catalogs: List[str]) -> None:
+            """Run load(catalog) on a worker thread for every catalog, logging failures."""
+            jobs = [functools.partial(asyncio.to_thread, load, catalog) for catalog in catalogs]
+            results = await asyncio.gather(*(limited(job) for job in jobs), return_exceptions=True)
+            for catalog, result in zip(catalogs, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Failed to prefetch {what} for catalog {catalog}: {result}")
+                elif isinstance(result, BaseException):
+                    raise result
+        
+        try:
+            schemas_by_catalog = await asyncio.to_thread(client.get_all_schemas)
+        except Exception as e:
+            logger.warning(f"Failed to list all schemas at once, falling back to per catalog: {e}")
+            catalogs = [catalog["name"] for catalog in await asyncio.to_thread(list_catalogs)]
+            await prefetch("schemas", list_schemas, catalogs)
+        else:
+            catalogs = list(schemas_by_catalog)
+            cache.put(("catalogs",), [{"name": catalog} for catalog in catalogs])
+            for catalog, schemas in schemas_by_catalog.items():
+                cache.put(("schemas", catalog), schemas)
+        
+        await prefetch("tables", list_catalog_tables, catalogs)
+        
+        logger.info(f"Prefetched metadata for {len(catalogs)} catalogs")
+    
+    return warm_metadata
@@ -4,37 +4,144 @@ Main module for the Trino MCP server.
 from __future__ import annotations
 
 import argparse
+import functools
+import itertools
 import json
 import sys
 import os
+import threading
 import asyncio
 import time
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import AsyncIterator, Dict, Any, List, Optional
+from decimal import Decimal
+from typing import AsyncIterator, Dict, Any, Iterator, List, Optional
 
 import uvicorn
 from fastapi import FastAPI, Response, Body
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from loguru import logger
 from mcp.server.fastmcp import Context, FastMCP
+from starlette.concurrency import run_in_threadpool
 
+from trino_mcp import __version__
 from trino_mcp.config import ServerConfig, TrinoConfig
 from trino_mcp.resources import register_trino_resources
 from trino_mcp.tools import register_trino_tools
-from trino_mcp.trino_client import TrinoClient
+from trino_mcp.trino_client import (
+    ARROW_AVAILABLE,
+    ARROW_STREAM_MEDIA_TYPE,
+    TrinoClient,
+)
 
-# Global app context for health check access
-app_context_global = None
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    _HAS_ORJSON = False
 
-@dataclass
+try:
+    import uvloop
+    _HAS_UVLOOP = True
+except ImportError:  # uvloop ships with uvicorn[standard]; fall back to the stdlib event loop
+    _HAS_UVLOOP = False
+
+def json_default(obj: Any) -> Any:
+    """
+    Encode a value JSON has no type for, the way FastAPI's encoder would.
+    
+    Decimals become numbers (None for NaN and infinities, which JSON can't
+    represent), Trino ROW values and other tuples and sets lists, dates and times
+    ISO 8601 strings, anything else str().
+    """
+    if isinstance(obj, Decimal):
+        if not obj.is_finite():
+            return None
+        # Always an int once finite; the check is for type checkers
+        exponent = obj.as_tuple().exponent
+        return int(obj) if isinstance(exponent, int) and exponent >= 0 else float(obj)
+    # orjson only encodes exact tuples; NamedRowTuple (a ROW) is a subclass
+    if isinstance(obj, (tuple, set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+def _json_dumps_bytes(obj: Any) -> bytes:
+    """Serialize obj to compact UTF-8 JSON bytes with the stdlib encoder."""
+    return json.dumps(obj, separators=(",", ":"), default=json_default).encode("utf-8")
+
+if _HAS_ORJSON:
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serialize obj to compact UTF-8 JSON bytes."""
+        try:
+            return orjson.dumps(obj, default=json_default)
+        except orjson.JSONEncodeError:
+            # orjson has no encoding for integers beyond 64 bits (e.g. DECIMAL(38,0)
+            # or large BIGINT products); the stdlib encoder writes them exactly
+            return _json_dumps_bytes(obj)
+else:
+    dumps_bytes = _json_dumps_bytes
+
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+# Results smaller than this are always sent as JSON, even when Arrow is requested
+ARROW_MIN_ROWS = 100
+
+@dataclass(slots=True)
 class AppContext:
     """Application context passed to all MCP handlers."""
     trino_client: TrinoClient
     config: ServerConfig
     is_healthy: bool = True
 
+# App context for the health check and API handlers; set once, before the servers
+# start, so every task on their event loop inherits it. Later (re)connects update
+# that same object in place rather than setting a new one
+app_context_var: ContextVar[Optional[AppContext]] = ContextVar("app_context", default=None)
+
+# Serializes retries of a failed start-up connect from concurrent requests
+_connect_lock = threading.Lock()
+
+def connect_app_context(app_context: AppContext) -> None:
+    """
+    Connect the context's Trino client and record the outcome on the context.
+    
+    Args:
+        app_context: The application context to connect and update in place.
+    """
+    config = app_context.config
+    with _connect_lock:
+        # Another request may have connected while this one waited
+        if app_context.trino_client.is_connected:
+            return
+        try:
+            logger.info(f"Connecting to Trino at {config.trino.host}:{config.trino.port}")
+            app_context.trino_client.connect()
+        except Exception as e:
+            logger.error(f"Failed to connect to Trino: {e}")
+            app_context.is_healthy = False
+        else:
+            app_context.is_healthy = True
+
+async def get_healthy_context() -> Optional[AppContext]:
+    """
+    Return the app context if it can serve queries, or None.
+    
+    A client that never connected (Trino was down at start-up) is retried here,
+    so the API recovers once Trino is reachable.
+    """
+    app_context = app_context_var.get()
+    if app_context is None:
+        return None
+    if not app_context.trino_client.is_connected:
+        await run_in_threadpool(connect_app_context, app_context)
+    return app_context if app_context.is_healthy else None
+
 # Models for the LLM API
 class QueryRequest(BaseModel):
     """Model for query requests."""
@@ -42,6 +149,9 @@ class QueryRequest(BaseModel):
     catalog: str = "memory"
     schema: Optional[str] = None
     explain: bool = False
+    format: str = "json"  # "json" or "arrow" (Arrow IPC stream for large results)
+    layout: str = "rows"  # JSON rows as "rows" (one object per row) or "columnar" (lists, in column order)
+    cache: bool = True  # Reuse a recent result for an identical read-only query
 
 class QueryResponse(BaseModel):
     """Model for query responses."""
@@ -60,7 +170,15 @@ async def app_lifespan(mcp: FastMCP) -> AsyncIterator[AppContext]:
     Yields:
         AppContext: The application context with initialized services.
     """
-    global app_context_global
+    # main() has already created the context and registered everything; every
+    # session shares that context (and its warm metadata cache) instead of
+    # starting over, and retries the connection in place if it never came up
+    app_context = app_context_var.get()
+    if app_context is not None:
+        if not app_context.trino_client.is_connected:
+            connect_app_context(app_context)
+        yield app_context
+        return
     
     logger.info("Initializing Trino MCP server")
     
@@ -70,9 +188,9 @@ async def app_lifespan(mcp: FastMCP) -> AsyncIterator[AppContext]:
     # Initialize Trino client
     trino_client = TrinoClient(config.trino)
     
-    # Create and set global app context
+    # Create and set the app context
     app_context = AppContext(trino_client=trino_client, config=config)
-    app_context_global = app_context
+    app_context_var.set(app_context)
     
     try:
         # Connect to Trino
@@ -94,15 +212,48 @@ async def app_lifespan(mcp: FastMCP) -> AsyncIterator[AppContext]:
     finally:
         # Cleanup on shutdown
         logger.info("Shutting down Trino MCP server")
-        if trino_client.conn:
-            trino_client.disconnect()
+        trino_client.disconnect()
         app_context.is_healthy = False
 
 
+def render_query_response(result: Any, layout: str) -> bytes:
+    """
+    Serialize a successful /api/query response body.
+    
+    Args:
+        result: The TrinoQueryResult.
+        layout: "columnar" sends rows as fetched; otherwise each row becomes a
+            dict keyed by column name.
+        
+    Returns:
+        bytes: The JSON body, in the QueryResponse shape.
+    """
+    if layout == "columnar":
+        formatted_rows = result.rows
+    else:
+        formatted_rows = list(map(dict, map(zip, itertools.repeat(result.columns), result.rows)))
+    
+    return dumps_bytes({
+        "success": True,
+        "message": "Query executed successfully",
+        "results": {
+            "query_id": result.query_id,
+            "columns": result.columns,
+            "rows": formatted_rows,
+            "row_count": result.row_count,
+            "execution_time_ms": result.query_time_ms
+        }
+    })
+
+
+@functools.lru_cache(maxsize=1)
 def parse_args() -> ServerConfig:
     """
     Parse command line arguments and return server configuration.
     
+    sys.argv doesn't change while the server runs, so only the first call parses;
+    `main()` and `app_lifespan` share the same (frozen) config.
+    
     Returns:
         ServerConfig: The server configuration.
     """
@@ -110,11 +261,14 @@ def parse_args() -> ServerConfig:
     
     # Server configuration
     parser.add_argument("--name", default="Trino MCP", help="Server name")
-    parser.add_argument("--version", default="0.1.0", help="Server version")
+    parser.add_argument("--version", default=__version__, help="Server version")
     parser.add_argument("--transport", default="stdio", choices=["stdio", "sse"], help="Transport type")
     parser.add_argument("--host", default="127.0.0.1", help="Host for HTTP server (SSE transport only)")
     parser.add_argument("--port", type=int, default=3000, help="Port for HTTP server (SSE transport only)")
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
+    parser.add_argument(
+        "--warm-metadata", action="store_true", help="Prefetch catalogs, schemas and tables at startup"
+    )
     
     # Trino connection
     parser.add_argument("--trino-host", default="localhost", help="Trino host")
@@ -124,6 +278,11 @@ def parse_args() -> ServerConfig:
     parser.add_argument("--trino-catalog", help="Default Trino catalog")
     parser.add_argument("--trino-schema", help="Default Trino schema")
     parser.add_argument("--trino-http-scheme", default="http", help="Trino HTTP scheme")
+    parser.add_argument("--trino-pool-size", type=int, default=10, help="Number of pooled Trino connections")
+    parser.add_argument(
+        "--trino-pool-timeout", type=float, default=30.0,
+        help="Seconds to wait for a free pooled Trino connection"
+    )
     
     args = parser.parse_args()
     
@@ -135,7 +294,9 @@ def parse_args() -> ServerConfig:
         password=args.trino_password,
         catalog=args.trino_catalog,
         schema=args.trino_schema,
-        http_scheme=args.trino_http_scheme
+        http_scheme=args.trino_http_scheme,
+        pool_size=args.trino_pool_size,
+        pool_timeout=args.trino_pool_timeout
     )
     
     # Create server configuration
@@ -146,6 +307,7 @@ def parse_args() -> ServerConfig:
         host=args.host,
         port=args.port,
         debug=args.debug,
+        warm_metadata=args.warm_metadata,
         trino=trino_config
     )
     
@@ -182,13 +344,11 @@ def create_health_app() -> FastAPI:
     app = FastAPI(
         title="Trino MCP API",
         description="API for health checks and LLM query access to Trino MCP",
-        version="0.1.0"
+        version=__version__
     )
     
     @app.get("/health")
     async def health():
-        global app_context_global
-        
         # For Docker health check, always return 200 during startup
         # This gives the app time to initialize
         return JSONResponse(
@@ -203,9 +363,8 @@ def create_health_app() -> FastAPI:
         
         This endpoint is designed to be used by LLMs to query Trino through MCP.
         """
-        global app_context_global
-        
-        if not app_context_global or not app_context_global.is_healthy:
+        app_context = await get_healthy_context()
+        if app_context is None:
             return JSONResponse(
                 status_code=503,
                 content={
@@ -214,41 +373,93 @@ def create_health_app() -> FastAPI:
                 }
             )
             
-        logger.info(f"LLM API Query: {request.query}")
+        logger.info("LLM API Query: {}", request.query)
         
         try:
             # Use the Trino client from the app context
-            client = app_context_global.trino_client
+            client = app_context.trino_client
             
             # Optionally add EXPLAIN
             query = request.query
             if request.explain:
                 query = f"EXPLAIN {query}"
-                
-            # Execute the query
-            result = client.execute_query(query, request.catalog, request.schema)
             
-            # Format the results for the response
-            formatted_rows = []
-            for row in result.rows:
-                # Convert row to dict using column names
-                row_dict = {}
-                for i, col in enumerate(result.columns):
-                    row_dict[col] = row[i]
-                formatted_rows.append(row_dict)
-                
-            return {
-                "success": True,
-                "message": "Query executed successfully",
-                "results": {
-                    "query_id": result.query_id,
-                    "columns": result.columns,
-                    "rows": formatted_rows,
-                    "row_count": result.row_count,
-                    "execution_time_ms": result.query_time_ms
-                }
-            }
+            # Execute the query on a worker thread; the DBAPI call blocks until
+            # Trino is done, and the event loop has other requests to serve.
+            # Identical read-only queries are answered by the client's result
+            # cache (the one the MCP tools use, cleared after writes and DDL), and
+            # ones that arrive while it is running share its execution
+            if request.cache:
+                result, cache_status = await run_in_threadpool(
+                    client.execute_cached, query, request.catalog, request.schema
+                )
+            else:
+                result = await run_in_threadpool(client.execute_query, query, request.catalog, request.schema)
+                cache_status = "MISS"
             
+            # Large results go out as a binary Arrow IPC stream; JSON stays the
+            # simpler choice for small previews
+            if request.format == "arrow" and ARROW_AVAILABLE and result.row_count >= ARROW_MIN_ROWS:
+                return Response(
+                    content=await run_in_threadpool(result.to_arrow_ipc),
+                    media_type=ARROW_STREAM_MEDIA_TYPE,
+                    headers={
+                        "X-Trino-Query-Id": str(result.query_id),
+                        "X-Execution-Time-Ms": str(result.query_time_ms),
+                        "X-Cache": cache_status
+                    }
+                )
+            
+            # A cached result usually comes back in the layout it was first asked
+            # for, so the rendered body is kept on the result as well
+            body = result.rendered.get(request.layout)
+            if body is None:
+                body = render_query_response(result, request.layout)
+                if request.cache:
+                    result.rendered[request.layout] = body
+            
+            # Serialized here (orjson when installed) and sent as-is, skipping
+            # response-model validation and jsonable_encoder on every row
+            return Response(content=body, media_type=JSON_MEDIA_TYPE, headers={"X-Cache": cache_status})
+            
+        except Exception as e:
+            logger.error(f"Error executing query: {e}")
+            return JSONResponse(
+                status_code=400,
+                content={
+                    "success": False,
+                    "message": f"Error executing query: {str(e)}"
+                }
+            )
+    
+    @app.post("/api/query/stream")
+    async def query_stream(request: QueryRequest):
+        """
+        Execute a SQL query against Trino and stream the rows as NDJSON.
+        
+        Each line is one row object. Rows are written as Trino batches arrive, so
+        large results never sit in memory in full; use /api/query for small ones.
+        """
+        app_context = await get_healthy_context()
+        if app_context is None:
+            return JSONResponse(
+                status_code=503,
+                content={
+                    "success": False,
+                    "message": "Trino MCP server is not healthy or not initialized"
+                }
+            )
+        
+        logger.info("LLM API streaming query: {}", request.query)
+        
+        client = app_context.trino_client
+        query = f"EXPLAIN {request.query}" if request.explain else request.query
+        
+        try:
+            # Start the query before the response does, so failures still get a 400
+            columns, batches = await run_in_threadpool(
+                client.open_query_stream, query, request.catalog, request.schema
+            )
         except Exception as e:
             logger.error(f"Error executing query: {e}")
             return JSONResponse(
@@ -258,16 +469,25 @@ def create_health_app() -> FastAPI:
                     "message": f"Error executing query: {str(e)}"
                 }
             )
+        
+        def ndjson() -> Iterator[bytes]:
+            # One write per fetched batch; iterated on a worker thread by Starlette
+            for batch in batches:
+                yield b"".join(dumps_bytes(dict(zip(columns, row))) + b"\n" for row in batch)
+        
+        return StreamingResponse(ndjson(), media_type=NDJSON_MEDIA_TYPE)
     
     @app.get("/api")
     async def api_root():
         """Root API endpoint with usage instructions."""
+        app_context = app_context_var.get()
         return {
             "message": "Trino MCP API for LLMs",
-            "version": app_context_global.config.version if app_context_global else "unknown",
+            "version": app_context.config.version if app_context else "unknown",
             "endpoints": {
                 "health": "GET /health - Check server health",
-                "query": "POST /api/query - Execute SQL queries"
+                "query": "POST /api/query - Execute SQL queries",
+                "query_stream": "POST /api/query/stream - Execute SQL queries, streaming rows as NDJSON"
             },
             "query_example": {
                 "query": "SELECT * FROM memory.bullshit.real_bullshit_data LIMIT 3",
@@ -279,6 +499,58 @@ def create_health_app() -> FastAPI:
     return app
 
 
+async def run_sse_server(mcp: FastMCP) -> None:
+    """
+    Run the MCP SSE server, surviving the known MCP 1.3.0 generator error.
+    
+    Args:
+        mcp: The MCP server instance.
+    """
+    import traceback
+    try:
+        await mcp.run_sse_async()
+    except RuntimeError as e:
+        if "generator didn't stop after athrow()" in str(e):
+            logger.error(f"Generator error in SSE server. This is a known issue with MCP 1.3.0: {e}")
+            
+            # Set unhealthy status for health checks
+            app_context = app_context_var.get()
+            if app_context:
+                app_context.is_healthy = False
+            
+            # The API server keeps running (and the container alive) on the same loop
+            logger.info("Server will continue running but may not function correctly.")
+        else:
+            logger.error(f"Fatal error running SSE server: {e}")
+            logger.error(traceback.format_exc())
+            raise
+    except Exception as e:
+        logger.error(f"Fatal error running SSE server: {e}")
+        logger.error(traceback.format_exc())
+        raise
+
+
+async def run_sse_servers(mcp: FastMCP, config: ServerConfig) -> None:
+    """
+    Run the MCP SSE server and the health/API server on one event loop.
+    
+    Both are uvicorn servers, so they can share the loop instead of running the
+    API app on a second thread with its own loop.
+    
+    Args:
+        mcp: The MCP server instance.
+        config: The server configuration.
+    """
+    # Use a different port for the health check endpoint
+    health_port = config.port + 1
+    logger.info(f"Starting API server on port {health_port}")
+    health_server = uvicorn.Server(
+        uvicorn.Config(create_health_app(), host=config.host, port=health_port)
+    )
+    
+    await asyncio.gather(run_sse_server(mcp), health_server.serve())
+
+
 def main() -> None:
     """
     Main entry point for the server.
@@ -287,32 +559,29 @@ def main() -> None:
     mcp = create_app()
     
     # ADDING EXPLICIT CONTEXT INITIALIZATION HERE
-    global app_context_global
-    try:
-        # Initialize the Trino client
-        logger.info(f"Connecting to Trino at {config.trino.host}:{config.trino.port}")
-        trino_client = TrinoClient(config.trino)
-        trino_client.connect()
-        
-        # Create application context
-        app_context = AppContext(
-            trino_client=trino_client,
-            config=config,
-            is_healthy=True
-        )
-        
-        # Set global context
-        app_context_global = app_context
-        
-        # Register resources and tools
-        register_trino_resources(mcp, trino_client)
-        register_trino_tools(mcp, trino_client)
-        
+    # The context exists (unhealthy) before the first connect and is set once, so
+    # the API and every MCP session see a later reconnect on the same object
+    trino_client = TrinoClient(config.trino)
+    app_context = AppContext(trino_client=trino_client, config=config, is_healthy=False)
+    app_context_var.set(app_context)
+    
+    # Register resources and tools; they only reach Trino when called
+    warm_metadata = register_trino_resources(mcp, trino_client)
+    register_trino_tools(mcp, trino_client)
+    
+    connect_app_context(app_context)
+    
+    # Optionally pay the first metadata round trips now rather than on the
+    # first client request
+    if app_context.is_healthy and config.warm_metadata:
+        logger.info("Prefetching Trino metadata")
+        try:
+            asyncio.run(warm_metadata())
+        except Exception as e:
+            logger.warning(f"Failed to prefetch Trino metadata: {e}")
+    
+    if app_context.is_healthy:
         logger.info("Trino MCP server initialized and ready")
-    except Exception as e:
-        logger.error(f"Error initializing Trino MCP: {e}")
-        if app_context_global:
-            app_context_global.is_healthy = False
     
     if config.transport_type == "stdio":
         # For STDIO transport, run directly
@@ -328,7 +597,6 @@ def main() -> None:
         os.environ["MCP_PORT"] = str(config.port)
         
         # Configure more robust error handling for the server
-        import traceback
         try:
             # Try to import and configure SSE settings if available in this version
             from mcp.server.sse import configure_sse
@@ -337,48 +605,11 @@ def main() -> None:
         except (ImportError, AttributeError):
             logger.warning("Could not configure SSE settings - this may be expected in some MCP versions")
         
-        # Start a separate thread for the health check endpoint
-        import threading
-        
-        def run_health_check():
-            """Run the health check FastAPI app."""
-            health_app = create_health_app()
-            # Use a different port for the health check endpoint
-            health_port = config.port + 1
-            logger.info(f"Starting API server on port {health_port}")
-            uvicorn.run(health_app, host=config.host, port=health_port)
-        
-        # Start the health check in a separate thread
-        health_thread = threading.Thread(target=run_health_check)
-        health_thread.daemon = True
-        health_thread.start()
-        
-        # Now run the SSE server with robust error handling
-        try:
-            asyncio.run(mcp.run_sse_async())
-        except RuntimeError as e:
-            if "generator didn't stop after athrow()" in str(e):
-                logger.error(f"Generator error in SSE server. This is a known issue with MCP 1.3.0: {e}")
-                
-                # Set unhealthy status for health checks
-                if app_context_global:
-                    app_context_global.is_healthy = False
-                
-                logger.info("Server will continue running but may not function correctly.")
-                
-                # Keep the server alive despite the error
-                import time
-                while True:
-                    time.sleep(60)  # Sleep to keep the container running
-                    
-            else:
-                logger.error(f"Fatal error running SSE server: {e}")
-                logger.error(traceback.format_exc())
-                raise
-        except Exception as e:
-            logger.error(f"Fatal error running SSE server: {e}")
-            logger.error(traceback.format_exc())
-            raise
+        # Serve MCP SSE and the health/API app from the same event loop. uvicorn
+        # picks httptools for HTTP parsing by itself, but the loop is ours to create
+        if _HAS_UVLOOP:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        asyncio.run(run_sse_servers(mcp, config))
 
 
 if __name__ == "__main__":
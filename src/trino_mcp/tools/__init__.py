@@ -1,6 +1,8 @@
 """
 MCP tools for executing operations on Trino.
 """
+import asyncio
+import base64
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Union
 
@@ -9,21 +11,28 @@ from mcp.server.fastmcp import Context, FastMCP
 
 from trino_mcp.trino_client import TrinoClient
 
+# Rows returned inline by execute_query
+PREVIEW_ROWS = 20
+
 
 def register_trino_tools(mcp: FastMCP, client: TrinoClient) -> None:
     """
     Register Trino tools with the MCP server.
     
+    The tools are coroutines that run the blocking Trino client calls on worker
+    threads, so one long query doesn't hold up every other request on the loop.
+    
     Args:
         mcp: The MCP server instance.
         client: The Trino client instance.
     """
     
     @mcp.tool()
-    def execute_query(
+    async def execute_query(
         sql: str, 
         catalog: Optional[str] = None, 
-        schema: Optional[str] = None
+        schema: Optional[str] = None,
+        cache: bool = True
     ) -> Dict[str, Any]:
         """
         Execute a SQL query against Trino.
@@ -32,14 +41,19 @@ def register_trino_tools(mcp: FastMCP, client: TrinoClient) -> None:
             sql: The SQL query to execute.
             catalog: Optional catalog name to use for the query.
             schema: Optional schema name to use for the query.
+            cache: Reuse a recent result of the same read-only query; set False to
+                always run it.
             
         Returns:
             Dict[str, Any]: Query results including metadata.
         """
-        logger.info(f"Executing query: {sql}")
+        logger.info("Executing query: {}", sql)
         
         try:
-            result = client.execute_query(sql, catalog, schema)
+            # Only the preview is returned, so only the preview rows are kept
+            result = await asyncio.to_thread(
+                client.execute_query, sql, catalog, schema, cache=cache, max_rows=PREVIEW_ROWS
+            )
             
             # Format the result in a structured way
             formatted_result = {
@@ -49,17 +63,10 @@ def register_trino_tools(mcp: FastMCP, client: TrinoClient) -> None:
                 "query_time_ms": result.query_time_ms
             }
             
-            # Add preview of results (first 20 rows)
-            preview_rows = []
-            max_preview_rows = min(20, len(result.rows))
-            
-            for i in range(max_preview_rows):
-                row_dict = {}
-                for j, col in enumerate(result.columns):
-                    row_dict[col] = result.rows[i][j]
-                preview_rows.append(row_dict)
-                
-            formatted_result["preview_rows"] = preview_rows
+            # Add preview of results (first PREVIEW_ROWS rows), one dict per row
+            formatted_result["preview_rows"] = [
+                dict(zip(result.columns, row)) for row in result.rows[:PREVIEW_ROWS]
+            ]
             
             # Include a resource path for full results
             formatted_result["resource_path"] = f"trino://query/{result.query_id}"
@@ -75,7 +82,50 @@ def register_trino_tools(mcp: FastMCP, client: TrinoClient) -> None:
             }
     
     @mcp.tool()
-    def cancel_query(query_id: str) -> Dict[str, Any]:
+    async def execute_query_arrow(
+        sql: str,
+        catalog: Optional[str] = None,
+        schema: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute a SQL query against Trino and return all rows as Arrow IPC.
+        
+        Unlike execute_query, which returns a JSON preview of the first rows, the
+        full result is sent as a base64-encoded Arrow IPC stream.
+        
+        Args:
+            sql: The SQL query to execute.
+            catalog: Optional catalog name to use for the query.
+            schema: Optional schema name to use for the query.
+        
+        Returns:
+            Dict[str, Any]: Query metadata plus the encoded rows in "arrow_ipc".
+        """
+        logger.info("Executing query (Arrow): {}", sql)
+        
+        try:
+            result = await asyncio.to_thread(client.execute_query, sql, catalog, schema)
+            arrow_ipc = await asyncio.to_thread(result.to_arrow_ipc)
+            
+            return {
+                "query_id": result.query_id,
+                "columns": result.columns,
+                "row_count": result.row_count,
+                "query_time_ms": result.query_time_ms,
+                "format": "arrow",
+                "arrow_ipc": base64.b64encode(arrow_ipc).decode("ascii")
+            }
+        
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"Query execution failed: {error_msg}")
+            return {
+                "error": error_msg,
+                "query": sql
+            }
+    
+    @mcp.tool()
+    async def cancel_query(query_id: str) -> Dict[str, Any]:
         """
         Cancel a running query.
         
@@ -85,10 +135,10 @@ def register_trino_tools(mcp: FastMCP, client: TrinoClient) -> None:
         Returns:
             Dict[str, Any]: Result of the cancellation operation.
         """
-        logger.info(f"Cancelling query: {query_id}")
+        logger.info("Cancelling query: {}", query_id)
         
         try:
-            success = client.cancel_query(query_id)
+            success = await asyncio.to_thread(client.cancel_query, query_id)
             
             if success:
                 return {
@@ -111,7 +161,7 @@ def register_trino_tools(mcp: FastMCP, client: TrinoClient) -> None:
             }
     
     @mcp.tool()
-    def inspect_table(
+    async def inspect_table(
         catalog: str, 
         schema: str, 
         table: str
@@ -127,41 +177,15 @@ def register_trino_tools(mcp: FastMCP, client: TrinoClient) -> None:
         Returns:
             Dict[str, Any]: Table metadata including columns, statistics, etc.
         """
-        logger.info(f"Inspecting table: {catalog}.{schema}.{table}")
+        logger.info("Inspecting table: {}.{}.{}", catalog, schema, table)
         
         try:
-            table_details = client.get_table_details(catalog, schema, table)
-            
-            # Get additional info from the information_schema if available
-            try:
-                info_schema_query = f"""
-                SELECT column_name, data_type, is_nullable, column_default
-                FROM {catalog}.information_schema.columns
-                WHERE table_catalog = '{catalog}'
-                AND table_schema = '{schema}'
-                AND table_name = '{table}'
-                """
-                info_schema_result = client.execute_query(info_schema_query)
-                
-                enhanced_columns = []
-                for col in table_details["columns"]:
-                    enhanced_col = col.copy()
-                    
-                    # Find matching info_schema row
-                    for row in info_schema_result.rows:
-                        if row[0] == col["name"]:
-                            enhanced_col["data_type"] = row[1]
-                            enhanced_col["is_nullable"] = row[2]
-                            enhanced_col["default"] = row[3]
-                            break
-                            
-                    enhanced_columns.append(enhanced_col)
-                    
-                table_details["columns"] = enhanced_columns
-            except Exception as e:
-                logger.warning(f"Failed to get column details from information_schema: {e}")
-                
-            return table_details
+            # Columns (with nullability and defaults) and table info in one round trip
+            return await asyncio.to_thread(
+                client.metadata_cache.get,
+                ("table_metadata", catalog, schema, table),
+                client.get_table_metadata, catalog, schema, table
+            )
         
         except Exception as e:
             error_msg = str(e)
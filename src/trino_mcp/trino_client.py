@@ -3,15 +3,152 @@ Trino client wrapper for interacting with Trino.
 """
 from __future__ import annotations
 
+import hashlib
+import importlib.util
+import queue
+import re
+import sys
 import time
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple, Union
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, Union
 
-import trino
 from loguru import logger
 
+from trino_mcp.cache import TTLCache
 from trino_mcp.config import TrinoConfig
 
+if TYPE_CHECKING:
+    import pyarrow
+
+# pyarrow is optional (only the Arrow result format needs it) and slow to import,
+# so it is only looked up here and imported on first use
+ARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# Media type of an Arrow IPC stream, used for binary results over HTTP
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# How long (seconds) catalog/schema/table metadata is served from memory
+METADATA_TTL = 60.0
+
+# Upper bound on cached metadata entries
+METADATA_CACHE_SIZE = 1024
+
+# EXPLAIN ANALYZE really runs the statement it explains
+_EXPLAIN_ANALYZE = r"\s*(?:EXPLAIN\s+ANALYZE\s+(?:VERBOSE\s+)?)?"
+# Statements that can change catalog/schema/table metadata
+DDL_PATTERN = re.compile(_EXPLAIN_ANALYZE + r"(CREATE|DROP|ALTER|TRUNCATE|COMMENT)\b", re.IGNORECASE)
+# Statements that change data (and so any cached result) but not metadata
+WRITE_PATTERN = re.compile(_EXPLAIN_ANALYZE + r"(INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+
+# Rows per fetchmany() call when a query's rows are read in batches
+FETCH_SIZE = 4096
+
+# Recent results of read-only queries run with cache=True are reused for this long (seconds)
+RESULT_CACHE_TTL = 60.0
+RESULT_CACHE_SIZE = 256
+# Bounds on the estimated size of the cached results, all together and one at a time
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+RESULT_CACHE_MAX_ENTRY_BYTES = 8 * 1024 * 1024
+# Rows looked at to estimate the size of a result
+SIZE_SAMPLE_ROWS = 100
+
+# Only statements that read data are cached (no INSERT/CREATE/DROP/... side effects);
+# EXPLAIN ANALYZE is not one of them, as it runs the statement
+CACHEABLE_SQL_PREFIXES = ("select", "with", "show", "describe", "values", "explain")
+
+# String literals and quoted identifiers, which canonicalize_sql leaves untouched
+_SQL_QUOTED = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+_SQL_WHITESPACE = re.compile(r"\s+")
+# Functions that return something different on every run
+_SQL_NONDETERMINISTIC = re.compile(
+    r"\b(rand|random|uuid|shuffle|now|current_(date|time|timestamp)|localtime|localtimestamp)\b"
+)
+
+# Runs the independent sub-queries of a metadata lookup side by side, each on its
+# own pooled connection
+_metadata_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="trino-metadata")
+
+
+def canonicalize_sql(sql: str) -> str:
+    """
+    Normalize SQL text so trivially different spellings share a cache entry.
+    
+    Outside string literals and quoted identifiers, runs of whitespace collapse
+    to one space and keywords/identifiers are lowercased; a trailing semicolon
+    is dropped.
+    
+    Args:
+        sql: The SQL text.
+        
+    Returns:
+        str: The canonical SQL.
+    """
+    parts = _SQL_QUOTED.split(sql.strip().rstrip(";").strip())
+    # split() with a capturing group puts the quoted pieces at odd indexes
+    return "".join(
+        part if i % 2 else _SQL_WHITESPACE.sub(" ", part).lower()
+        for i, part in enumerate(parts)
+    )
+
+
+def query_cache_key(canonical_sql: str, catalog: Optional[str], schema: Optional[str], explain: bool) -> str:
+    """
+    Return the result cache key for a canonical query.
+    
+    Args:
+        canonical_sql: The query, as returned by canonicalize_sql.
+        catalog: The catalog the query runs in.
+        schema: The schema the query runs in.
+        explain: Whether the query is run under EXPLAIN.
+        
+    Returns:
+        str: A fixed-size hex digest.
+    """
+    key = f"{catalog}|{schema}|{explain}|{canonical_sql}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def is_cacheable_sql(canonical_sql: str) -> bool:
+    """
+    Whether a query's result can be reused for an identical query.
+    
+    Only statements that read data qualify, and only if they call no function
+    whose result changes between runs (rand(), now(), ...).
+    
+    Args:
+        canonical_sql: The query, as returned by canonicalize_sql.
+        
+    Returns:
+        bool: True if the result may be cached.
+    """
+    return (
+        canonical_sql.startswith(CACHEABLE_SQL_PREFIXES)
+        and not canonical_sql.startswith("explain analyze")
+        and _SQL_NONDETERMINISTIC.search(canonical_sql) is None
+    )
+
+
+def _import_pyarrow() -> Any:
+    """Return the pyarrow module, or raise RuntimeError if it is not installed."""
+    if not ARROW_AVAILABLE:
+        raise RuntimeError("pyarrow is required for Arrow results")
+    import pyarrow
+    import pyarrow.ipc
+    return pyarrow
+
+
+def sql_string(value: str) -> str:
+    """Return `value` as a SQL string literal, with embedded quotes doubled."""
+    return "'{}'".format(value.replace("'", "''"))
+
+
+def sql_identifier(*parts: str) -> str:
+    """Return a (dotted) name with each part double-quoted, e.g. "catalog"."schema"."""
+    return ".".join('"{}"'.format(part.replace('"', '""')) for part in parts)
+
 
 @dataclass
 class TrinoQueryResult:
@@ -21,6 +158,68 @@ class TrinoQueryResult:
     rows: List[List[Any]]
     query_time_ms: float
     row_count: int
+    # Serialized response bodies by layout, reused while the result is cached
+    rendered: Dict[str, bytes] = field(default_factory=dict, repr=False, compare=False)
+
+    def estimated_size(self) -> int:
+        """
+        Roughly how many bytes the rows take in memory.
+        
+        Extrapolated from an evenly spaced sample of at most SIZE_SAMPLE_ROWS
+        rows, so wide rows count for more than narrow ones without every cell
+        being measured.
+        """
+        if not self.rows:
+            return 0
+        sample = self.rows[::max(1, len(self.rows) // SIZE_SAMPLE_ROWS)]
+        sample_size = sum(sys.getsizeof(row) + sum(map(sys.getsizeof, row)) for row in sample)
+        return sample_size * len(self.rows) // len(sample)
+
+    def to_arrow(self) -> "pyarrow.Table":
+        """
+        Return the rows as a columnar pyarrow Table.
+        
+        Each column is built once from the row data as a typed Arrow array, so
+        consumers that work column by column (or hand the data to NumPy/pandas)
+        don't walk the rows cell by cell.
+        
+        Returns:
+            pyarrow.Table: One column per result column, in result order.
+            
+        Raises:
+            RuntimeError: If pyarrow is not installed.
+        """
+        return _import_pyarrow().Table.from_arrays(self._arrow_arrays(), names=self.columns)
+    
+    def to_arrow_ipc(self) -> bytes:
+        """
+        Serialize the rows as an Arrow IPC stream.
+        
+        Columns are sent as typed Arrow arrays instead of one JSON object per row,
+        so wide or numeric results are much smaller and the receiver can load them
+        into NumPy/pandas without building a Python object per cell.
+        
+        Returns:
+            bytes: The IPC stream (schema followed by one record batch).
+            
+        Raises:
+            RuntimeError: If pyarrow is not installed.
+        """
+        pyarrow = _import_pyarrow()
+        batch = pyarrow.RecordBatch.from_arrays(self._arrow_arrays(), names=self.columns)
+        
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, batch.schema) as writer:
+            writer.write_batch(batch)
+        payload: bytes = sink.getvalue().to_pybytes()
+        return payload
+    
+    def _arrow_arrays(self) -> List[Any]:
+        """Build one typed Arrow array per column (null-typed when there are no rows)."""
+        pyarrow = _import_pyarrow()
+        if self.rows:
+            return [pyarrow.array(list(values)) for values in zip(*self.rows)]
+        return [pyarrow.array([], type=pyarrow.null()) for _ in self.columns]
 
 
 class TrinoClient:
@@ -36,120 +235,382 @@ class TrinoClient:
             config: Trino connection configuration.
         """
         self.config = config
-        self.conn = None
+        # Idle connections; most recently returned first, so a hot catalog stays hot
+        self._pool: Optional[queue.LifoQueue[Any]] = None
+        # Defaults for calls that don't name a catalog/schema. Never changed by a
+        # query: calls run concurrently on worker threads, so each one resolves
+        # its own catalog and schema (see resolve_target)
         self.current_catalog = config.catalog
         self.current_schema = config.schema
+        # Metadata lookups shared by the resources and tools; cleared after DDL.
+        # Keyed by ("kind", name, ...), so the values are of several kinds
+        self.metadata_cache: TTLCache[Tuple[Any, ...], Any] = TTLCache(
+            ttl=METADATA_TTL, maxsize=METADATA_CACHE_SIZE
+        )
+        # Results of execute_query(..., cache=True), by (query key, max_rows);
+        # cleared after DDL and writes
+        self.result_cache: TTLCache[Tuple[str, Optional[int]], TrinoQueryResult] = TTLCache(
+            ttl=RESULT_CACHE_TTL,
+            maxsize=RESULT_CACHE_SIZE,
+            max_cost=RESULT_CACHE_MAX_BYTES,
+            cost=TrinoQueryResult.estimated_size,
+            max_entry_cost=RESULT_CACHE_MAX_ENTRY_BYTES
+        )
+        
+    @property
+    def is_connected(self) -> bool:
+        """Whether the connection pool has been opened."""
+        return self._pool is not None
         
     def connect(self) -> None:
         """
         Connect to the Trino server.
         
-        This will connect to Trino with the catalog parameter if provided.
+        Opens a pool of `config.pool_size` connections, each with its own
+        keep-alive HTTP session, so concurrent requests don't serialize on one
+        connection. Connections use the catalog from the config if provided.
         """
-        logger.info(f"Connecting to Trino at {self.config.host}:{self.config.port} with catalog {self.config.catalog}")
+        logger.info(
+            f"Connecting to Trino at {self.config.host}:{self.config.port} with catalog "
+            f"{self.config.catalog} (pool size {self.config.pool_size})"
+        )
         
         # Create connection params including catalog from config
         conn_params = self.config.connection_params
         logger.info(f"Connection parameters: {conn_params}")
         
+        # Imported here rather than at module level: the driver (and requests,
+        # urllib3, ...) takes a while to load and isn't needed until now
+        import trino.dbapi
+        
         # Connect to Trino with proper parameters
-        self.conn = trino.dbapi.connect(**conn_params)
+        pool: queue.LifoQueue[Any] = queue.LifoQueue(maxsize=self.config.pool_size)
+        for _ in range(self.config.pool_size):
+            pool.put(trino.dbapi.connect(**conn_params))
+        self._pool = pool
         
     def disconnect(self) -> None:
         """
         Disconnect from the Trino server.
+        
+        Idle connections are closed now; connections still checked out are
+        closed when they are released.
         """
-        if self.conn:
+        if self._pool is not None:
             logger.info("Disconnecting from Trino")
-            self.conn.close()
-            self.conn = None
+            pool, self._pool = self._pool, None
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
             
     def ensure_connection(self) -> None:
         """
         Ensure that the client is connected to Trino.
         """
-        if not self.conn:
+        if self._pool is None:
             self.connect()
             
+    def resolve_target(self, catalog: Optional[str], schema: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Return the catalog and schema a call runs in.
+        
+        Missing values fall back to the client defaults; the default schema only
+        applies along with the default catalog, so a call naming another catalog
+        is never sent a schema from a different one.
+        
+        Args:
+            catalog: The catalog the call asked for, if any.
+            schema: The schema the call asked for, if any.
+            
+        Returns:
+            Tuple[Optional[str], Optional[str]]: The catalog and schema.
+        """
+        use_catalog = catalog or self.current_catalog
+        if schema:
+            return use_catalog, schema
+        return use_catalog, self.current_schema if use_catalog == self.current_catalog else None
+    
+    @contextmanager
+    def acquire(self, catalog: Optional[str] = None) -> Iterator[Any]:
+        """
+        Check a connection out of the pool for the duration of a with block.
+        
+        Waits up to `config.pool_timeout` seconds while every pooled connection
+        is in use.
+        
+        Args:
+            catalog: Optional catalog name; defaults to the client's default catalog.
+            
+        Yields:
+            A Trino DBAPI connection for that catalog.
+            
+        Raises:
+            TimeoutError: If no connection became free in time.
+        """
+        self.ensure_connection()
+        pool = self._pool
+        if pool is None:
+            # Another thread disconnected since ensure_connection()
+            raise RuntimeError("Not connected to Trino")
+        try:
+            conn = pool.get(timeout=self.config.pool_timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"All {self.config.pool_size} Trino connections stayed busy for "
+                f"{self.config.pool_timeout} seconds"
+            ) from None
+        
+        try:
+            use_catalog = catalog or self.current_catalog
+            
+            # The catalog is sent as the X-Trino-Catalog header on every request, so
+            # switching only updates the client session; the HTTP session is kept
+            session = conn._client_session
+            if session.catalog != use_catalog:
+                logger.debug("Switching pooled connection from catalog {} to {}", session.catalog, use_catalog)
+                session.catalog = use_catalog
+                conn.catalog = use_catalog
+            
+            yield conn
+        finally:
+            if self._pool is pool:
+                pool.put(conn)
+            else:
+                conn.close()
+            
+    def _prepare_cursor(self, conn: Any, schema: Optional[str]) -> Any:
+        """
+        Return a cursor on a pooled connection, with the schema set.
+        
+        Args:
+            conn: A connection from acquire().
+            schema: The schema the query runs in, as resolved by resolve_target.
+            
+        Returns:
+            A Trino DBAPI cursor.
+        """
+        # The schema goes out as the X-Trino-Schema header with the query itself,
+        # like the catalog, instead of costing a USE statement first. It is set on
+        # every checkout, so nothing a previous borrower left behind carries over
+        session = conn._client_session
+        if schema and not session.catalog:
+            logger.warning("Cannot set schema without catalog")
+            session.schema = None
+        elif session.schema != schema:
+            logger.debug("Setting schema to {}", schema)
+            session.schema = schema
+        
+        # Create a cursor
+        return conn.cursor()
+    
+    def _invalidate_caches(self, sql: str) -> None:
+        """Forget cached metadata and results that `sql` may have changed."""
+        if DDL_PATTERN.match(sql):
+            logger.debug("DDL statement executed, clearing the metadata and result caches")
+            self.metadata_cache.clear()
+            self.result_cache.clear()
+        elif WRITE_PATTERN.match(sql):
+            logger.debug("Write statement executed, clearing the result cache")
+            self.result_cache.clear()
+    
     def execute_query(
         self, 
         sql: str, 
         catalog: Optional[str] = None, 
-        schema: Optional[str] = None
+        schema: Optional[str] = None,
+        cache: bool = False,
+        max_rows: Optional[int] = None
     ) -> TrinoQueryResult:
         """
         Execute a SQL query against Trino.
         
-        Important note on catalog handling: This method properly sets the catalog by updating
-        the connection parameters, rather than using unreliable "USE catalog" statements. The catalog
-        is passed directly to the connection, which is more reliable than SQL-based catalog switching.
+        Important note on catalog handling: This method sets the catalog on the pooled
+        connection's client session rather than using unreliable "USE catalog" statements.
+        The catalog is sent with each request, so switching needs no reconnect.
         
         Args:
             sql: The SQL query to execute.
             catalog: Optional catalog name to use for the query.
             schema: Optional schema name to use for the query.
+            cache: Reuse the result of an identical read-only query run in the last
+                RESULT_CACHE_TTL seconds (and cache this one). Identical queries
+                arriving while one is running wait for and share its result.
+            max_rows: Keep only the first `max_rows` rows. The rest are still read
+                (so `row_count` is the full count) but never accumulated.
             
         Returns:
             TrinoQueryResult: The result of the query.
         """
-        # If we're switching catalogs or don't have a connection, we need to reconnect
-        use_catalog = catalog or self.current_catalog
+        if cache:
+            return self.execute_cached(sql, catalog, schema, max_rows)[0]
         
-        if self.conn and (use_catalog != self.current_catalog):
-            logger.info(f"Switching catalog from {self.current_catalog} to {use_catalog}, reconnecting...")
-            self.disconnect()
+        catalog, schema = self.resolve_target(catalog, schema)
+        return self._execute(sql, catalog, schema, max_rows)
+    
+    def execute_cached(
+        self,
+        sql: str,
+        catalog: Optional[str] = None,
+        schema: Optional[str] = None,
+        max_rows: Optional[int] = None
+    ) -> Tuple[TrinoQueryResult, str]:
+        """
+        Execute a query through the result cache and report how it was answered.
         
-        # Update current catalog and schema
-        self.current_catalog = use_catalog
-        if schema:
-            self.current_schema = schema
+        Same as execute_query(..., cache=True); the status is what the HTTP API
+        sends back as its X-Cache header.
+        
+        Args:
+            sql: The SQL query to execute.
+            catalog: Optional catalog name to use for the query.
+            schema: Optional schema name to use for the query.
+            max_rows: See execute_query.
             
-        # Update the config catalog before connecting
-        if use_catalog:
-            self.config.catalog = use_catalog
+        Returns:
+            Tuple[TrinoQueryResult, str]: The result, and "HIT" if it came from the
+            cache, "SHARED" if an identical running query's result was waited
+            for, or "MISS" if the query ran (cacheable or not).
+        """
+        catalog, schema = self.resolve_target(catalog, schema)
+        canonical_sql = canonicalize_sql(sql)
+        if not is_cacheable_sql(canonical_sql):
+            return self._execute(sql, catalog, schema, max_rows), "MISS"
         
-        # Ensure connection with updated catalog
-        self.ensure_connection()
+        cache_key = (query_cache_key(canonical_sql, catalog, schema, False), max_rows)
+        result = self.result_cache.lookup(cache_key)
+        if result is not None:
+            logger.debug("Serving query from the result cache: {}", sql)
+            return result, "HIT"
         
-        # Create a cursor
-        cursor = self.conn.cursor()
+        ran = []
+        
+        def load() -> TrinoQueryResult:
+            ran.append(True)
+            return self._execute(sql, catalog, schema, max_rows)
         
-        # If we have a schema, try to set it
-        # This still uses a USE statement, but catalogs are now set in the connection
-        if self.current_schema:
+        result = self.result_cache.get(cache_key, load)
+        return result, "MISS" if ran else "SHARED"
+    
+    def _execute(
+        self,
+        sql: str,
+        catalog: Optional[str],
+        schema: Optional[str],
+        max_rows: Optional[int] = None
+    ) -> TrinoQueryResult:
+        """Run a query on a pooled connection and fetch its result (see execute_query)."""
+        with self.acquire(catalog) as conn:
+            cursor = self._prepare_cursor(conn, schema)
+            
             try:
-                logger.debug(f"Setting schema to {self.current_schema}")
+                # Execute the query and time it
+                logger.debug("Executing query: {}", sql)
+                start_time = time.time()
+                cursor.execute(sql)
+                query_time = time.time() - start_time
+                self._invalidate_caches(sql)
+                
+                # Fetch the query ID, metadata and results
+                query_id = cursor.stats.get("queryId", "unknown")
+                columns = [desc[0] for desc in cursor.description] if cursor.description else []
+                rows = []
+                row_count = 0
+                if cursor.description:
+                    if max_rows is None:
+                        rows = cursor.fetchall()
+                        row_count = len(rows)
+                    else:
+                        # Count every row but only hold on to the first max_rows
+                        while True:
+                            batch = cursor.fetchmany(FETCH_SIZE)
+                            if not batch:
+                                break
+                            if len(rows) < max_rows:
+                                rows.extend(batch[:max_rows - len(rows)])
+                            row_count += len(batch)
                 
-                # Make sure to include catalog with schema to avoid errors
-                if self.current_catalog:
-                    cursor.execute(f"USE {self.current_catalog}.{self.current_schema}")
-                else:
-                    logger.warning("Cannot set schema without catalog")
+                return TrinoQueryResult(
+                    query_id=query_id,
+                    columns=columns,
+                    rows=rows,
+                    query_time_ms=query_time * 1000,
+                    row_count=row_count
+                )
             except Exception as e:
-                logger.warning(f"Failed to set schema: {e}")
+                logger.error(f"Query execution failed: {e}")
+                raise
+    
+    def execute_query_stream(
+        self,
+        sql: str,
+        catalog: Optional[str] = None,
+        schema: Optional[str] = None,
+        fetch_size: int = FETCH_SIZE
+    ) -> Iterator[List[List[Any]]]:
+        """
+        Execute a SQL query against Trino and yield the rows in batches.
         
-        try:
-            # Execute the query and time it
-            logger.debug(f"Executing query: {sql}")
-            start_time = time.time()
-            cursor.execute(sql)
-            query_time = time.time() - start_time
-            
-            # Fetch the query ID, metadata and results
-            query_id = cursor.stats.get("queryId", "unknown")
-            columns = [desc[0] for desc in cursor.description] if cursor.description else []
-            rows = cursor.fetchall() if cursor.description else []
-            
-            return TrinoQueryResult(
-                query_id=query_id,
-                columns=columns,
-                rows=rows,
-                query_time_ms=query_time * 1000,
-                row_count=len(rows)
-            )
-        except Exception as e:
-            logger.error(f"Query execution failed: {e}")
-            raise
+        Rows are fetched with `fetchmany(fetch_size)` as they are consumed, so memory
+        stays bounded by the batch size instead of growing with the result. The
+        pooled connection is held until the generator is exhausted or closed.
+        
+        Args:
+            sql: The SQL query to execute.
+            catalog: Optional catalog name to use for the query.
+            schema: Optional schema name to use for the query.
+            fetch_size: Maximum number of rows per batch.
+            
+        Yields:
+            List[List[Any]]: The next batch of rows.
+        """
+        _, batches = self.open_query_stream(sql, catalog, schema, fetch_size)
+        yield from batches
+    
+    def open_query_stream(
+        self,
+        sql: str,
+        catalog: Optional[str] = None,
+        schema: Optional[str] = None,
+        fetch_size: int = FETCH_SIZE
+    ) -> Tuple[List[str], Iterator[List[List[Any]]]]:
+        """
+        Start a SQL query and return its column names plus a lazy batch iterator.
+        
+        Unlike execute_query_stream, the query runs before this returns, so failures
+        are raised here, and the column names are known before any row is read.
+        
+        Args:
+            sql: The SQL query to execute.
+            catalog: Optional catalog name to use for the query.
+            schema: Optional schema name to use for the query.
+            fetch_size: Maximum number of rows per batch.
+            
+        Returns:
+            Tuple[List[str], Iterator[List[List[Any]]]]: The column names and the
+            row batches (see execute_query_stream).
+        """
+        use_catalog, use_schema = self.resolve_target(catalog, schema)
+        
+        def stream() -> Iterator[Any]:
+            with self.acquire(use_catalog) as conn:
+                cursor = self._prepare_cursor(conn, use_schema)
+                
+                logger.debug("Executing streaming query: {}", sql)
+                cursor.execute(sql)
+                self._invalidate_caches(sql)
+                yield [desc[0] for desc in cursor.description] if cursor.description else []
+                
+                while True:
+                    batch = cursor.fetchmany(fetch_size)
+                    if not batch:
+                        break
+                    yield batch
+        
+        batches = stream()
+        columns = next(batches)
+        return columns, batches
     
     def get_catalogs(self) -> List[Dict[str, str]]:
         """
@@ -171,9 +632,39 @@ class TrinoClient:
         Returns:
             List[Dict[str, str]]: A list of schema metadata.
         """
-        result = self.execute_query(f"SHOW SCHEMAS FROM {catalog}", catalog=catalog)
+        result = self.execute_query(f"SHOW SCHEMAS FROM {sql_identifier(catalog)}", catalog=catalog)
         return [{"name": row[0], "catalog": catalog} for row in result.rows]
     
+    def get_all_schemas(self) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Get every catalog and its schemas with a single query.
+        
+        Joins `system.metadata.catalogs` to `system.jdbc.schemas` instead of
+        running SHOW CATALOGS and then one SHOW SCHEMAS per catalog.
+        
+        Returns:
+            Dict[str, List[Dict[str, str]]]: Schema metadata (in the same shape as
+            get_schemas) keyed by catalog name, in catalog order; catalogs
+            without schemas map to an empty list.
+        """
+        result = self.execute_query(
+            """
+            SELECT c.catalog_name, s.table_schem
+            FROM system.metadata.catalogs c
+            LEFT JOIN system.jdbc.schemas s ON s.table_catalog = c.catalog_name
+            ORDER BY c.catalog_name, s.table_schem
+            """,
+            catalog="system"
+        )
+        
+        schemas: Dict[str, List[Dict[str, str]]] = {}
+        for catalog, schema in result.rows:
+            catalog_schemas = schemas.setdefault(catalog, [])
+            if schema is not None:
+                catalog_schemas.append({"name": schema, "catalog": catalog})
+            
+        return schemas
+    
     def get_tables(self, catalog: str, schema: str) -> List[Dict[str, str]]:
         """
         Get a list of all tables in a schema.
@@ -185,9 +676,44 @@ class TrinoClient:
         Returns:
             List[Dict[str, str]]: A list of table metadata.
         """
-        result = self.execute_query(f"SHOW TABLES FROM {catalog}.{schema}", catalog=catalog, schema=schema)
+        result = self.execute_query(f"SHOW TABLES FROM {sql_identifier(catalog, schema)}", catalog=catalog, schema=schema)
         return [{"name": row[0], "catalog": catalog, "schema": schema} for row in result.rows]
     
+    def get_tables_bulk(self, catalog: str, schemas: List[str]) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Get the tables of several schemas with a single query.
+        
+        Reads `information_schema.tables` once instead of running one SHOW TABLES
+        per schema.
+        
+        Args:
+            catalog: The catalog name.
+            schemas: The schema names.
+            
+        Returns:
+            Dict[str, List[Dict[str, str]]]: Table metadata (in the same shape as
+            get_tables) keyed by schema; every requested schema has an entry.
+        """
+        tables: Dict[str, List[Dict[str, str]]] = {schema: [] for schema in schemas}
+        if not schemas:
+            return tables
+        
+        schema_list = ", ".join(map(sql_string, schemas))
+        result = self.execute_query(
+            f"""
+            SELECT table_schema, table_name
+            FROM {sql_identifier(catalog, "information_schema", "tables")}
+            WHERE table_schema IN ({schema_list})
+            ORDER BY table_schema, table_name
+            """,
+            catalog=catalog
+        )
+        
+        for schema, name in result.rows:
+            tables[schema].append({"name": name, "catalog": catalog, "schema": schema})
+            
+        return tables
+    
     def get_columns(self, catalog: str, schema: str, table: str) -> List[Dict[str, Any]]:
         """
         Get a list of all columns in a table.
@@ -201,7 +727,7 @@ class TrinoClient:
             List[Dict[str, Any]]: A list of column metadata.
         """
         result = self.execute_query(
-            f"DESCRIBE {catalog}.{schema}.{table}", 
+            f"DESCRIBE {sql_identifier(catalog, schema, table)}", 
             catalog=catalog, 
             schema=schema
         )
@@ -219,6 +745,77 @@ class TrinoClient:
             
         return columns
     
+    def get_columns_bulk(
+        self,
+        catalog: str,
+        schemas: List[str],
+        tables: Optional[List[str]] = None
+    ) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """
+        Get the columns of every table in several schemas with a single query.
+        
+        Reads `information_schema.columns` once instead of running one DESCRIBE
+        per table, and groups the rows by table.
+        
+        Args:
+            catalog: The catalog name.
+            schemas: The schema names.
+            tables: Optional table names to restrict the lookup to.
+            
+        Returns:
+            Dict[Tuple[str, str], List[Dict[str, Any]]]: Column metadata (in the
+            same shape as get_columns) keyed by (schema, table).
+        """
+        if not schemas or tables == []:
+            return {}
+        
+        where = f"table_schema IN ({', '.join(map(sql_string, schemas))})"
+        if tables is not None:
+            where += f" AND table_name IN ({', '.join(map(sql_string, tables))})"
+        result = self.execute_query(
+            f"""
+            SELECT table_schema, table_name, column_name, data_type, extra_info
+            FROM {sql_identifier(catalog, "information_schema", "columns")}
+            WHERE {where}
+            ORDER BY table_schema, table_name, ordinal_position
+            """,
+            catalog=catalog
+        )
+        
+        columns: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for schema, table, name, data_type, extra in result.rows:
+            columns.setdefault((schema, table), []).append({
+                "name": name,
+                "type": data_type,
+                "extra": extra,
+                "catalog": catalog,
+                "schema": schema,
+                "table": table
+            })
+            
+        return columns
+    
+    def get_table_columns(self, catalog: str, schema: str, table: str) -> List[str]:
+        """
+        Get the column names of a table without transferring any rows.
+        
+        Runs `SELECT * ... LIMIT 0` and reads the names from the cursor description.
+        
+        Args:
+            catalog: The catalog name.
+            schema: The schema name.
+            table: The table name.
+            
+        Returns:
+            List[str]: The column names in table order.
+        """
+        with self.acquire(catalog) as conn:
+            cursor = self._prepare_cursor(conn, schema)
+            cursor.execute(f"SELECT * FROM {sql_identifier(catalog, schema, table)} LIMIT 0")
+            # Finish the (empty) query so the column metadata has arrived
+            cursor.fetchall()
+            return [desc[0] for desc in cursor.description] if cursor.description else []
+    
     def get_table_details(self, catalog: str, schema: str, table: str) -> Dict[str, Any]:
         """
         Get detailed information about a table including columns and statistics.
@@ -231,50 +828,145 @@ class TrinoClient:
         Returns:
             Dict[str, Any]: Detailed table information.
         """
+        # The two lookups are independent; run the statistics query alongside DESCRIBE
+        stats_future = _metadata_executor.submit(self._get_table_statistics, catalog, schema, table)
         columns = self.get_columns(catalog, schema, table)
         
+        return {
+            "name": table,
+            "catalog": catalog,
+            "schema": schema,
+            "columns": columns,
+            "statistics": stats_future.result()
+        }
+    
+    def _get_table_statistics(self, catalog: str, schema: str, table: str) -> Dict[str, Any]:
+        """
+        Get a table's `information_schema.tables` row as a dict.
+        
+        Returns an empty dict when the lookup fails, since not every connector
+        supports it.
+        """
         # Get table statistics if available (might not be supported by all connectors)
         try:
+            # Only the standard columns; SELECT * makes some connectors load more
             stats_query = f"""
-            SELECT * FROM {catalog}.information_schema.tables
-            WHERE table_catalog = '{catalog}'
-            AND table_schema = '{schema}'
-            AND table_name = '{table}'
+            SELECT table_catalog, table_schema, table_name, table_type
+            FROM {sql_identifier(catalog, "information_schema", "tables")}
+            WHERE table_catalog = {sql_string(catalog)}
+            AND table_schema = {sql_string(schema)}
+            AND table_name = {sql_string(table)}
             """
             stats_result = self.execute_query(stats_query, catalog=catalog)
             stats = {}
             
             if stats_result.rows:
-                row = stats_result.rows[0]
-                for i, col in enumerate(stats_result.columns):
-                    stats[col.lower()] = row[i]
+                stats = dict(zip(map(str.lower, stats_result.columns), stats_result.rows[0]))
         except Exception as e:
             logger.warning(f"Failed to get table statistics: {e}")
             stats = {}
             
+        return stats
+    
+    def get_table_metadata(self, catalog: str, schema: str, table: str) -> Dict[str, Any]:
+        """
+        Get a table's columns, with nullability and defaults, plus its table info.
+        
+        Everything comes from one `information_schema` query (the table info as an
+        uncorrelated subquery Trino evaluates once), instead of a DESCRIBE, a
+        tables lookup and a columns lookup.
+        
+        Args:
+            catalog: The catalog name.
+            schema: The schema name.
+            table: The table name.
+            
+        Returns:
+            Dict[str, Any]: The get_table_details shape, with each column's
+            "data_type", "is_nullable" and "default" added.
+            
+        Raises:
+            ValueError: If the table does not exist.
+        """
+        where = (
+            f"table_catalog = {sql_string(catalog)} AND table_schema = {sql_string(schema)} "
+            f"AND table_name = {sql_string(table)}"
+        )
+        result = self.execute_query(
+            f"""
+            SELECT column_name, data_type, extra_info, is_nullable, column_default,
+                (SELECT table_type FROM {sql_identifier(catalog, "information_schema", "tables")} WHERE {where}) AS table_type
+            FROM {sql_identifier(catalog, "information_schema", "columns")}
+            WHERE {where}
+            ORDER BY ordinal_position
+            """,
+            catalog=catalog
+        )
+        if not result.rows:
+            raise ValueError(f"Table {catalog}.{schema}.{table} does not exist")
+        
+        columns = [
+            {
+                "name": name,
+                "type": data_type,
+                "extra": extra,
+                "catalog": catalog,
+                "schema": schema,
+                "table": table,
+                "data_type": data_type,
+                "is_nullable": is_nullable,
+                "default": default
+            }
+            for name, data_type, extra, is_nullable, default, _ in result.rows
+        ]
+        
         return {
             "name": table,
             "catalog": catalog,
             "schema": schema,
             "columns": columns,
-            "statistics": stats
+            "statistics": {
+                "table_catalog": catalog,
+                "table_schema": schema,
+                "table_name": table,
+                "table_type": result.rows[0][5]
+            }
         }
     
     def cancel_query(self, query_id: str) -> bool:
         """
         Cancel a running query.
         
+        Sends one DELETE to the coordinator's /v1/query/{query_id} endpoint, and
+        only falls back to the system.runtime.kill_query procedure (a full query
+        of its own) if that fails.
+        
         Args:
             query_id: The ID of the query to cancel.
             
         Returns:
             bool: True if the query was successfully canceled, False otherwise.
         """
-        self.ensure_connection()
+        try:
+            with self.acquire() as conn:
+                # Built like a statement request, so it carries the user and auth
+                request = conn._create_request()
+                response = conn._http_session.delete(
+                    request.get_url(f"/v1/query/{urllib.parse.quote(query_id, safe='')}"),
+                    headers=request.http_headers,
+                    timeout=self.config.request_timeout
+                )
+            if response.status_code in (200, 204):
+                return True
+            logger.warning(
+                "Cancelling query {} over HTTP returned {}, trying kill_query", query_id, response.status_code
+            )
+        except Exception as e:
+            logger.warning(f"Cancelling query {query_id} over HTTP failed, trying kill_query: {e}")
         
         try:
             # Use system procedures to cancel the query
-            self.execute_query(f"CALL system.runtime.kill_query(query_id => '{query_id}')")
+            self.execute_query(f"CALL system.runtime.kill_query(query_id => {sql_string(query_id)})")
             return True
         except Exception as e:
             logger.error(f"Failed to cancel query {query_id}: {e}")
@@ -8,6 +8,24 @@ import subprocess
 import sys
 import time
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
+
+if orjson is not None:
+    def dumps(obj):
+        """Serialize obj to a compact JSON string."""
+        return orjson.dumps(obj).decode("utf-8")
+
+    loads = orjson.loads
+else:
+    def dumps(obj):
+        """Serialize obj to a compact JSON string."""
+        return json.dumps(obj, separators=(",", ":"))
+
+    loads = json.loads
+
 def test_bullshit_query():
     """Run a query against our bullshit data using the MCP STDIO transport."""
     print("🚀 Testing Bullshit Data with MCP STDIO Transport")
@@ -50,7 +68,7 @@ def test_bullshit_query():
             Returns:
                 The JSON-RPC response, or None if no response is expected
             """
-            request_str = json.dumps(request) + "\n"
+            request_str = dumps(request) + "\n"
             print(f"\n📤 Sending: {request_str.strip()}")
             
             try:
@@ -70,7 +88,7 @@ def test_bullshit_query():
                 response_str = process.stdout.readline()
                 if response_str:
                     print(f"📩 Received response")
-                    return json.loads(response_str)
+                    return loads(response_str)
                 else:
                     print("❌ No response received")
                     return None
@@ -165,7 +183,7 @@ def test_bullshit_query():
             # Parse the nested JSON in the content field
             try:
                 content_text = query_response.get("result", {}).get("content", [{}])[0].get("text", "{}")
-                result_data = json.loads(content_text)
+                result_data = loads(content_text)
                 
                 # Now we have the actual query result
                 columns = result_data.get("columns", [])
@@ -226,7 +244,7 @@ def test_bullshit_query():
             # Parse the nested JSON in the content field
             try:
                 content_text = schema_response.get("result", {}).get("content", [{}])[0].get("text", "{}")
-                result_data = json.loads(content_text)
+                result_data = loads(content_text)
                 
                 # Extract schema names
                 preview_rows = result_data.get("preview_rows", [])
@@ -5,60 +5,172 @@ Test script for the LLM API endpoint in the Trino MCP server.
 This script tests the various endpoints of the API server to verify functionality.
 """
 
+import asyncio
 import json
-import requests
-from rich.console import Console
-from rich.table import Table
-from typing import Dict, Any, List, Optional
+import os
+
+import httpx
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 # Configuration
 API_HOST = "localhost"
 API_PORT = 9097
 API_BASE_URL = f"http://{API_HOST}:{API_PORT}"
 
-console = Console()
+# Rich output (styles and tables) only when asked for (MCP_TEST_VERBOSE=1); otherwise
+# plain print, which skips Rich's import and rendering cost on every line
+VERBOSE = os.environ.get("MCP_TEST_VERBOSE") == "1"
+
+# Set by _init_console() in verbose mode
+console = None
+
+def _init_console() -> None:
+    """Create the Rich console used for verbose output."""
+    global console
+    from rich.console import Console
+    console = Console()
+
+def log(message: str, style: Optional[str] = None) -> None:
+    """Print a line, styled with Rich in verbose mode."""
+    if console is not None:
+        console.print(message, style=style)
+    else:
+        print(message)
+
+def print_table(title: str, columns: List[str], rows: List[List[str]]) -> None:
+    """Print rows as a Rich table in verbose mode, or as plain tab separated lines."""
+    if console is None:
+        print(title)
+        for row in [columns, *rows]:
+            print("\t".join(row))
+        return
+    
+    from rich.table import Table
+    table = Table(title=title)
+    for column in columns:
+        table.add_column(column)
+    for row in rows:
+        table.add_row(*row)
+    console.print(table)
+
+# Every probe goes to the same host, so share one keep-alive connection pool
+SESSION = httpx.Client(
+    headers={"Accept": "application/json"},
+    limits=httpx.Limits(max_keepalive_connections=16),
+    timeout=5
+)
 
-def test_endpoint(url: str, method: str = "GET", data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+def report_response(response: httpx.Response) -> Dict[str, Any]:
+    """Print a response and summarize it."""
+    status_color = "green" if response.status_code < 400 else "red"
+    log(f"Status: {response.status_code} - {response.reason_phrase}", f"bold {status_color}")
+    
+    # Try to parse response as JSON
+    try:
+        data = response.json()
+        log("Response data:")
+        log(json.dumps(data, indent=2))
+        return {
+            "success": response.status_code < 400,
+            "status_code": response.status_code,
+            "data": data
+        }
+    except ValueError:
+        log(f"Response text: {response.text[:500]}")
+        return {
+            "success": response.status_code < 400,
+            "status_code": response.status_code,
+            "text": response.text[:500]
+        }
+
+def test_endpoint(
+    url: str,
+    method: str = "GET",
+    data: Optional[Dict[str, Any]] = None,
+    session: Optional[httpx.Client] = None
+) -> Dict[str, Any]:
     """Test an endpoint and return the response with detailed info."""
-    console.print(f"\n[bold blue]Testing {method} {url}[/bold blue]")
+    log(f"\nTesting {method} {url}", "bold blue")
+    session = session or SESSION
     
     try:
         if method.upper() == "GET":
-            response = requests.get(url, timeout=5)
+            response = session.get(url)
         elif method.upper() == "POST":
-            response = requests.post(url, json=data, timeout=5)
+            response = session.post(url, json=data)
         else:
-            console.print(f"[bold red]Unsupported method: {method}[/bold red]")
+            log(f"Unsupported method: {method}", "bold red")
             return {"success": False, "status_code": 0, "error": f"Unsupported method: {method}"}
         
-        status_color = "green" if response.status_code < 400 else "red"
-        console.print(f"Status: [bold {status_color}]{response.status_code} - {response.reason}[/bold {status_color}]")
-        
-        # Try to parse response as JSON
-        try:
-            data = response.json()
-            console.print("Response data:")
-            console.print(json.dumps(data, indent=2))
-            return {
-                "success": response.status_code < 400,
-                "status_code": response.status_code,
-                "data": data
-            }
-        except ValueError:
-            console.print(f"Response text: {response.text[:500]}")
-            return {
-                "success": response.status_code < 400,
-                "status_code": response.status_code,
-                "text": response.text[:500]
-            }
+        return report_response(response)
             
     except Exception as e:
-        console.print(f"[bold red]Error: {str(e)}[/bold red]")
+        log(f"Error: {str(e)}", "bold red")
         return {"success": False, "error": str(e)}
 
+def async_client() -> httpx.AsyncClient:
+    """Create an async client for probes that are sent concurrently."""
+    return httpx.AsyncClient(
+        headers={"Accept": "application/json"},
+        limits=httpx.Limits(max_keepalive_connections=16),
+        timeout=5
+    )
+
+async def probe_endpoints(endpoints: List[str]) -> List[Any]:
+    """GET every endpoint concurrently; each entry is a response or the exception raised."""
+    async with async_client() as client:
+        return await asyncio.gather(
+            *(client.get(f"{API_BASE_URL}{endpoint}") for endpoint in endpoints),
+            return_exceptions=True
+        )
+
+async def _probe_query(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    payload: Dict[str, Any]
+) -> Tuple[str, Dict[str, Any]]:
+    """POST a query to one endpoint and report the response."""
+    try:
+        response = await client.post(f"{API_BASE_URL}{endpoint}", json=payload)
+    except httpx.HTTPError as e:
+        log(f"\nError from POST {endpoint}: {str(e)}", "bold red")
+        return endpoint, {"success": False, "error": str(e)}
+    
+    log(f"\nResponse from POST {endpoint}", "bold blue")
+    return endpoint, report_response(response)
+
+async def race_query_endpoints(
+    endpoints: List[str],
+    payload: Dict[str, Any],
+    accept: Callable[[Dict[str, Any]], bool]
+) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    POST a query to every endpoint at once and return the first accepted result.
+    
+    Args:
+        endpoints: The endpoint paths to try.
+        payload: The query request body.
+        accept: Decides whether a result is the one we are looking for.
+        
+    Returns:
+        (endpoint, result) for the first accepted result, or None if none was;
+        the requests still in flight at that point are cancelled.
+    """
+    async with async_client() as client:
+        tasks = [asyncio.ensure_future(_probe_query(client, endpoint, payload)) for endpoint in endpoints]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                endpoint, result = await next_done
+                if accept(result):
+                    return endpoint, result
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+
 def discover_all_endpoints() -> None:
     """Discover available endpoints by trying common paths."""
-    console.print("[bold yellow]Discovering endpoints...[/bold yellow]")
+    log("Discovering endpoints...", "bold yellow")
     
     # Common endpoints to check
     endpoints = [
@@ -72,10 +184,17 @@ def discover_all_endpoints() -> None:
         "/query"
     ]
     
+    # The probes are independent, so send them all at once and report in order
+    responses = asyncio.run(probe_endpoints(endpoints))
+    
     results = []
-    for endpoint in endpoints:
-        url = f"{API_BASE_URL}{endpoint}"
-        result = test_endpoint(url)
+    for endpoint, response in zip(endpoints, responses):
+        log(f"\nTesting GET {API_BASE_URL}{endpoint}", "bold blue")
+        if isinstance(response, Exception):
+            log(f"Error: {str(response)}", "bold red")
+            result = {"success": False, "error": str(response)}
+        else:
+            result = report_response(response)
         results.append({
             "endpoint": endpoint,
             "status": result["status_code"] if "status_code" in result else "Error",
@@ -83,39 +202,33 @@ def discover_all_endpoints() -> None:
         })
     
     # Display results in a table
-    table = Table(title="API Endpoint Discovery Results")
-    table.add_column("Endpoint", style="cyan")
-    table.add_column("Status", style="magenta")
-    table.add_column("Result", style="green")
-    
+    rows = []
     for result in results:
-        status = str(result["status"])
-        status_style = "green" if result["success"] else "red"
         result_text = "✅ Available" if result["success"] else "❌ Not Available"
-        table.add_row(result["endpoint"], f"[{status_style}]{status}[/{status_style}]", result_text)
+        rows.append([result["endpoint"], str(result["status"]), result_text])
     
-    console.print(table)
+    print_table("API Endpoint Discovery Results", ["Endpoint", "Status", "Result"], rows)
 
-def test_api_docs() -> bool:
+def test_api_docs(session: Optional[httpx.Client] = None) -> bool:
     """Test the API documentation endpoint."""
-    console.print("\n[bold yellow]Testing API documentation...[/bold yellow]")
+    log("\nTesting API documentation...", "bold yellow")
     
     # Try the /docs endpoint first
     url = f"{API_BASE_URL}/docs"
-    result = test_endpoint(url)
+    result = test_endpoint(url, session=session)
     
     if result.get("success", False):
-        console.print("[bold green]API documentation is available at /docs[/bold green]")
+        log("API documentation is available at /docs", "bold green")
         return True
     else:
-        console.print("[bold red]API documentation not available at /docs[/bold red]")
+        log("API documentation not available at /docs", "bold red")
         
         # Try the OpenAPI JSON endpoint
         url = f"{API_BASE_URL}/openapi.json"
-        result = test_endpoint(url)
+        result = test_endpoint(url, session=session)
         
         if result.get("success", False):
-            console.print("[bold green]OpenAPI spec is available at /openapi.json[/bold green]")
+            log("OpenAPI spec is available at /openapi.json", "bold green")
             
             # Try to extract query endpoint from the spec
             if "data" in result:
@@ -123,19 +236,19 @@ def test_api_docs() -> bool:
                     paths = result["data"].get("paths", {})
                     for path, methods in paths.items():
                         if "post" in methods and ("/query" in path or "/api/query" in path):
-                            console.print(f"[bold green]Found query endpoint in OpenAPI spec: {path}[/bold green]")
+                            log(f"Found query endpoint in OpenAPI spec: {path}", "bold green")
                             return True
                 except:
-                    console.print("[bold red]Failed to parse OpenAPI spec[/bold red]")
+                    log("Failed to parse OpenAPI spec", "bold red")
             
             return True
         else:
-            console.print("[bold red]OpenAPI spec not available[/bold red]")
+            log("OpenAPI spec not available", "bold red")
             return False
 
 def test_valid_query() -> bool:
     """Test a valid SQL query against the API."""
-    console.print("\n[bold yellow]Testing valid SQL query...[/bold yellow]")
+    log("\nTesting valid SQL query...", "bold yellow")
     
     # Try multiple potential query endpoints
     query_payload = {
@@ -145,28 +258,28 @@ def test_valid_query() -> bool:
     }
     
     endpoints = ["/api/query", "/query"]
+    log(f"Trying endpoints: {', '.join(endpoints)}", "bold")
+    
+    winner = asyncio.run(race_query_endpoints(
+        endpoints, query_payload, lambda result: result.get("success", False)
+    ))
     
-    for endpoint in endpoints:
-        url = f"{API_BASE_URL}{endpoint}"
-        console.print(f"[bold]Trying endpoint: {endpoint}[/bold]")
+    if winner:
+        endpoint, result = winner
+        log(f"Successfully executed query at {endpoint}", "bold green")
         
-        result = test_endpoint(url, method="POST", data=query_payload)
+        # Display results if available
+        if "data" in result and "results" in result["data"]:
+            display_query_results(result["data"]["results"])
         
-        if result.get("success", False):
-            console.print(f"[bold green]Successfully executed query at {endpoint}[/bold green]")
-            
-            # Display results if available
-            if "data" in result and "results" in result["data"]:
-                display_query_results(result["data"]["results"])
-            
-            return True
+        return True
     
-    console.print("[bold red]Failed to execute query on any endpoint[/bold red]")
+    log("Failed to execute query on any endpoint", "bold red")
     return False
 
 def test_invalid_query() -> bool:
     """Test an invalid SQL query to check error handling."""
-    console.print("\n[bold yellow]Testing invalid SQL query (error handling)...[/bold yellow]")
+    log("\nTesting invalid SQL query (error handling)...", "bold yellow")
     
     query_payload = {
         "query": "SELECT * FROM nonexistent_table",
@@ -176,63 +289,62 @@ def test_invalid_query() -> bool:
     
     # Try the same endpoints as for valid query
     endpoints = ["/api/query", "/query"]
+    log(f"Trying endpoints: {', '.join(endpoints)}", "bold")
     
-    for endpoint in endpoints:
-        url = f"{API_BASE_URL}{endpoint}"
-        console.print(f"[bold]Trying endpoint: {endpoint}[/bold]")
-        
-        result = test_endpoint(url, method="POST", data=query_payload)
-        
-        # Check if we got a proper error response (should be 400 Bad Request)
-        if "status_code" in result and result["status_code"] == 400:
-            console.print(f"[bold green]API correctly rejected invalid query at {endpoint} with 400 status[/bold green]")
-            return True
+    # Check if we got a proper error response (should be 400 Bad Request)
+    winner = asyncio.run(race_query_endpoints(
+        endpoints, query_payload, lambda result: result.get("status_code") == 400
+    ))
     
-    console.print("[bold red]Failed to properly handle invalid query on any endpoint[/bold red]")
+    if winner:
+        log(f"API correctly rejected invalid query at {winner[0]} with 400 status", "bold green")
+        return True
+    
+    log("Failed to properly handle invalid query on any endpoint", "bold red")
     return False
 
 def display_query_results(results: Dict[str, Any]) -> None:
     """Display query results in a formatted table."""
     if not results or "rows" not in results or not results["rows"]:
-        console.print("[italic yellow]No results returned[/italic yellow]")
+        log("No results returned", "italic yellow")
         return
     
-    table = Table(title="Query Results")
-    
-    # Add columns to the table
-    for column in results.get("columns", []):
-        table.add_column(column)
+    columns = results.get("columns", [])
+    rows = results["rows"]
     
-    # Add data rows
-    for row in results.get("rows", []):
-        if isinstance(row, dict):
-            table.add_row(*[str(row.get(col, "")) for col in results.get("columns", [])])
-        elif isinstance(row, list):
-            table.add_row(*[str(val) for val in row])
+    # Rows in one response all have the same shape, so pick the formatter once
+    if isinstance(rows[0], dict):
+        table_rows = [[str(row.get(col, "")) for col in columns] for row in rows]
+    elif isinstance(rows[0], list):
+        table_rows = [list(map(str, row)) for row in rows]
+    else:
+        table_rows = []
     
-    console.print(table)
-    console.print(f"[italic]Total rows: {results.get('row_count', len(results.get('rows', [])))}[/italic]")
+    print_table("Query Results", columns, table_rows)
+    log(f"Total rows: {results.get('row_count', len(rows))}", "italic")
     if "execution_time_ms" in results:
-        console.print(f"[italic]Execution time: {results['execution_time_ms']} ms[/italic]")
+        log(f"Execution time: {results['execution_time_ms']} ms", "italic")
 
 def main() -> None:
     """Run all tests."""
-    console.print("[bold green]=== Trino MCP LLM API Test ===\n[/bold green]")
+    if VERBOSE:
+        _init_console()
+    log("=== Trino MCP LLM API Test ===\n", "bold green")
     
     # First discover all available endpoints
     discover_all_endpoints()
     
     # Test API documentation
-    docs_available = test_api_docs()
+    docs_available = test_api_docs(SESSION)
     
     # Only test queries if docs are available
     if docs_available:
         test_valid_query()
         test_invalid_query()
     else:
-        console.print("[bold red]Skipping query tests as API documentation is not available[/bold red]")
+        log("Skipping query tests as API documentation is not available", "bold red")
     
-    console.print("\n[bold green]=== Test completed ===\n[/bold green]")
+    log("\n=== Test completed ===\n", "bold green")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -5,9 +5,104 @@ This script demonstrates the end-to-end flow of initializing MCP, listing tools,
 querying data, and shutting down using the STDIO transport.
 """
 import json
+import os
+import queue
 import subprocess
 import sys
-import time
+import threading
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
+
+if orjson is not None:
+    dumps_bytes = orjson.dumps
+    loads = orjson.loads
+else:
+    def dumps_bytes(obj):
+        """Serialize obj to compact UTF-8 JSON bytes."""
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    loads = json.loads
+
+def encode_frame(message):
+    """Serialize a JSON-RPC message as one newline-terminated STDIO frame."""
+    return dumps_bytes(message) + b"\n"
+
+# Every message this test sends is fixed, so encode them all once at import
+INITIALIZE_FRAME = encode_frame({
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2024-11-05",
+        "clientInfo": {
+            "name": "trino-mcp-stdio-test",
+            "version": "1.0.0"
+        },
+        "capabilities": {
+            "tools": True,
+            "resources": {
+                "supportedSources": ["trino://catalog"]
+            }
+        }
+    }
+})
+
+INITIALIZED_FRAME = encode_frame({
+    "jsonrpc": "2.0",
+    "method": "notifications/initialized",
+    "params": {}
+})
+
+TOOLS_LIST_FRAME = encode_frame({
+    "jsonrpc": "2.0",
+    "id": 2,
+    "method": "tools/list"
+})
+
+QUERY_FRAME = encode_frame({
+    "jsonrpc": "2.0",
+    "id": 3,
+    "method": "tools/call",
+    "params": {
+        "name": "execute_query",
+        "arguments": {
+            "sql": "SELECT 'Hello from Trino MCP' AS message",
+            "catalog": "memory"
+        }
+    }
+})
+
+BS_QUERY_FRAME = encode_frame({
+    "jsonrpc": "2.0",
+    "id": 4,
+    "method": "tools/call",
+    "params": {
+        "name": "execute_query",
+        "arguments": {
+            "sql": "SELECT * FROM memory.bullshit.bullshit_data LIMIT 3",
+            "catalog": "memory"
+        }
+    }
+})
+
+FALLBACK_QUERY_FRAME = encode_frame({
+    "jsonrpc": "2.0",
+    "id": 5,
+    "method": "tools/call",
+    "params": {
+        "name": "execute_query",
+        "arguments": {
+            "sql": "SHOW SCHEMAS FROM memory",
+            "catalog": "memory"
+        }
+    }
+})
+
+# Seconds to wait for each response before giving up on the server
+RESPONSE_TIMEOUT = 30
 
 def test_mcp_stdio():
     """Run an end-to-end test of Trino MCP using STDIO transport."""
@@ -32,75 +127,128 @@ def test_mcp_stdio():
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=sys.stderr,  # Pass stderr through to see logs directly
-            text=True,
-            bufsize=1  # Line buffered
+            bufsize=0  # Unbuffered binary pipes: each frame is written in one call
         )
         
-        # Sleep a bit to let the server initialize
-        time.sleep(2)
+        # No warm-up sleep: the initialize request waits in the stdin pipe until
+        # the server reads it, so its response is the readiness signal
+        
+        # A background thread drains stdout into a queue of complete lines, so
+        # the server never blocks on a full pipe while we are busy with a
+        # response, and a crashed server or a partial line ends in a timeout
+        # instead of blocking the test forever
+        stdout_lines = queue.Queue()
         
-        # Helper function to send a request and get a response
-        def send_request(request, expect_response=True):
+        def read_stdout():
+            """Split stdout into lines until EOF, which is signalled with None."""
+            buffer = bytearray()
+            try:
+                while True:
+                    chunk = os.read(process.stdout.fileno(), 64 * 1024)
+                    if not chunk:
+                        break
+                    buffer.extend(chunk)
+                    *lines, rest = buffer.split(b"\n")
+                    buffer = bytearray(rest)
+                    for line in lines:
+                        line = line.strip()
+                        if line:
+                            stdout_lines.put(bytes(line))
+            except OSError:
+                pass  # stdout was closed while the process was shutting down
+            stdout_lines.put(None)
+        
+        threading.Thread(target=read_stdout, daemon=True).start()
+        
+        def read_response(timeout=RESPONSE_TIMEOUT):
             """
-            Send a request to the MCP server and get the response.
+            Wait for the next complete JSON-RPC line on stdout.
             
             Args:
-                request: The JSON-RPC request to send
-                expect_response: Whether to wait for a response
+                timeout: Seconds to wait before giving up
                 
             Returns:
-                The JSON-RPC response, or None if no response is expected
+                The raw line, or None on timeout or if the server exited
+            """
+            try:
+                line = stdout_lines.get(timeout=timeout)
+            except queue.Empty:
+                return None
+            if line is None:
+                stdout_lines.put(None)  # Keep reporting EOF to later callers
+            return line
+        
+        # Responses read while waiting for other ids, keyed by request id
+        responses = {}
+        
+        def send(frame):
+            """
+            Write a request to the MCP server without waiting for a response.
+            
+            Args:
+                frame: The pre-encoded JSON-RPC request to send
+                
+            Returns:
+                True if the request was written, False if the server has gone away
             """
-            request_str = json.dumps(request) + "\n"
-            print(f"\n📤 Sending: {request_str.strip()}")
+            print(f"\n📤 Sending: {frame.decode('utf-8').strip()}")
             
             try:
-                process.stdin.write(request_str)
-                process.stdin.flush()
+                process.stdin.write(frame)
             except BrokenPipeError:
                 print("❌ Broken pipe - server has closed the connection")
+                return False
+            return True
+        
+        def drain_until(ids):
+            """
+            Read responses until there is one for every id in `ids`.
+            
+            Args:
+                ids: The request ids to wait for
+                
+            Returns:
+                Response by request id; ids that got no response before the
+                timeout (or before the server exited) map to None
+            """
+            print(f"Waiting for responses to {sorted(ids)}...")
+            while not ids <= responses.keys():
+                response_line = read_response()
+                if not response_line:
+                    print("❌ No response received")
+                    break
+                print(f"📩 Received: {response_line.decode('utf-8', 'replace')}")
+                try:
+                    response = loads(response_line)
+                except ValueError as e:
+                    print(f"❌ Error reading response: {e}")
+                    continue
+                responses[response.get("id")] = response
+            return {request_id: responses.pop(request_id, None) for request_id in ids}
+        
+        def send_request(frame, request_id=None):
+            """
+            Send a request to the MCP server and get the response.
+            
+            Args:
+                frame: The pre-encoded JSON-RPC request to send
+                request_id: The id to wait for a response to; None for a notification
+                
+            Returns:
+                The JSON-RPC response, or None if no response is expected
+            """
+            if not send(frame):
                 return None
                 
-            if not expect_response:
+            if request_id is None:
                 print("✅ Sent notification (no response expected)")
                 return None
                 
-            # Read the response
-            print("Waiting for response...")
-            try:
-                response_str = process.stdout.readline()
-                if response_str:
-                    print(f"📩 Received: {response_str.strip()}")
-                    return json.loads(response_str)
-                else:
-                    print("❌ No response received")
-                    return None
-            except Exception as e:
-                print(f"❌ Error reading response: {e}")
-                return None
+            return drain_until({request_id})[request_id]
         
         # ===== STEP 1: Initialize MCP =====
         print("\n===== STEP 1: Initialize MCP =====")
-        initialize_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "clientInfo": {
-                    "name": "trino-mcp-stdio-test",
-                    "version": "1.0.0"
-                },
-                "capabilities": {
-                    "tools": True,
-                    "resources": {
-                        "supportedSources": ["trino://catalog"]
-                    }
-                }
-            }
-        }
-        
-        init_response = send_request(initialize_request)
+        init_response = send_request(INITIALIZE_FRAME, 1)
         if not init_response:
             print("❌ Failed to initialize MCP - exiting test")
             return
@@ -112,23 +260,17 @@ def test_mcp_stdio():
         
         # ===== STEP 2: Send initialized notification =====
         print("\n===== STEP 2: Send initialized notification =====")
-        initialized_notification = {
-            "jsonrpc": "2.0",
-            "method": "notifications/initialized",
-            "params": {}
-        }
+        send_request(INITIALIZED_FRAME)
         
-        send_request(initialized_notification, expect_response=False)
+        # Steps 3-5 do not depend on each other, so send all three requests up
+        # front and let the server work on them while we wait for the responses
+        for frame in (TOOLS_LIST_FRAME, QUERY_FRAME, BS_QUERY_FRAME):
+            send(frame)
+        pipelined = drain_until({2, 3, 4})
         
         # ===== STEP 3: List available tools =====
         print("\n===== STEP 3: List available tools =====")
-        tools_request = {
-            "jsonrpc": "2.0",
-            "id": 2,
-            "method": "tools/list"
-        }
-        
-        tools_response = send_request(tools_request)
+        tools_response = pipelined[2]
         if not tools_response or "result" not in tools_response:
             print("❌ Failed to get tools list")
         else:
@@ -139,20 +281,7 @@ def test_mcp_stdio():
         
         # ===== STEP 4: Execute a simple query =====
         print("\n===== STEP 4: Execute a simple query =====")
-        query_request = {
-            "jsonrpc": "2.0",
-            "id": 3,
-            "method": "tools/call",
-            "params": {
-                "name": "execute_query",
-                "arguments": {
-                    "sql": "SELECT 'Hello from Trino MCP' AS message",
-                    "catalog": "memory"
-                }
-            }
-        }
-        
-        query_response = send_request(query_request)
+        query_response = pipelined[3]
         if not query_response:
             print("❌ Failed to execute query")
         elif "error" in query_response:
@@ -179,20 +308,7 @@ def test_mcp_stdio():
                 
         # Try the bullshit table query - this is what the original script wanted
         print("\n===== STEP 5: Query the Bullshit Table =====")
-        bs_query_request = {
-            "jsonrpc": "2.0",
-            "id": 4,
-            "method": "tools/call",
-            "params": {
-                "name": "execute_query",
-                "arguments": {
-                    "sql": "SELECT * FROM memory.bullshit.bullshit_data LIMIT 3",
-                    "catalog": "memory"
-                }
-            }
-        }
-        
-        bs_query_response = send_request(bs_query_request)
+        bs_query_response = pipelined[4]
         if not bs_query_response:
             print("❌ Failed to execute bullshit table query")
         elif "error" in bs_query_response:
@@ -204,19 +320,7 @@ def test_mcp_stdio():
                 
             # Try with information_schema as fallback
             print("\n----- Fallback Query: Checking Available Schemas -----")
-            fallback_query = {
-                "jsonrpc": "2.0",
-                "id": 5,
-                "method": "tools/call",
-                "params": {
-                    "name": "execute_query",
-                    "arguments": {
-                        "sql": "SHOW SCHEMAS FROM memory",
-                        "catalog": "memory"
-                    }
-                }
-            }
-            schemas_response = send_request(fallback_query)
+            schemas_response = send_request(FALLBACK_QUERY_FRAME, 5)
             if schemas_response and "result" in schemas_response:
                 result = schemas_response["result"]
                 if isinstance(result, dict) and "content" in result:
@@ -2,14 +2,31 @@
 Pytest configuration for the Trino MCP server tests.
 """
 
+import functools
 import os
 import time
 import json
+import httpx
 import pytest
-import requests
+import socket
 import subprocess
 import signal
-from typing import Dict, Any, Iterator, Tuple
+from typing import Dict, Any, Iterator
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
+
+if orjson is not None:
+    dumps_bytes = orjson.dumps
+    loads = orjson.loads
+else:
+    def dumps_bytes(obj):
+        """Serialize obj to compact UTF-8 JSON bytes."""
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    loads = json.loads
 
 # Define constants
 TEST_SERVER_PORT = 7000  # Using port 7000 to avoid ALL conflicts with existing containers
@@ -25,6 +42,7 @@ class TrinoMCPTestServer:
     def __init__(self, port: int = TEST_SERVER_PORT):
         self.port = port
         self.process = None
+        self._session = None
         
     def start(self) -> None:
         """Start the server process."""
@@ -50,6 +68,10 @@ class TrinoMCPTestServer:
             text=True
         )
         
+        # Reused across health probes instead of building a session per attempt;
+        # opened here so a stopped server can be started again
+        self._session = httpx.Client(timeout=0.5)
+        
         # Wait for server to start
         self._wait_for_server()
         
@@ -59,28 +81,49 @@ class TrinoMCPTestServer:
             self.process.send_signal(signal.SIGINT)
             self.process.wait()
             self.process = None
+        if self._session:
+            self._session.close()
+            self._session = None
             
     def _wait_for_server(self, max_retries: int = 10, retry_interval: float = 0.5) -> None:
-        """Wait for the server to become available."""
-        for _ in range(max_retries):
+        """
+        Wait for the server to become available.
+        
+        Probes start 50ms apart and back off to `retry_interval`, so a server that
+        comes up quickly is seen quickly; the total wait is still bounded by
+        `max_retries * retry_interval`. Until the port accepts connections each
+        probe is a bare TCP connect; only then is /mcp fetched over HTTP.
+        """
+        deadline = time.monotonic() + max_retries * retry_interval
+        interval = 0.05
+        listening = False
+        while True:
             try:
-                response = requests.get(f"{TEST_SERVER_URL}/mcp")
+                if not listening:
+                    with socket.create_connection(("localhost", self.port), timeout=0.1):
+                        listening = True
+                response = self._session.get(f"http://localhost:{self.port}/mcp")
                 if response.status_code == 200:
                     return
-            except requests.exceptions.ConnectionError:
+            except (OSError, httpx.TransportError):
                 pass
             
-            time.sleep(retry_interval)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 1.7, retry_interval)
             
         raise TimeoutError(f"Server did not start within {max_retries * retry_interval} seconds")
 
 
+@functools.lru_cache(maxsize=1)
 def check_trino_available() -> bool:
-    """Check if Trino server is available for testing."""
+    """Check if Trino server is available for testing (probed once per process)."""
     try:
-        response = requests.get(f"http://{TRINO_HOST}:{TRINO_PORT}/v1/info")
+        response = httpx.get(f"http://{TRINO_HOST}:{TRINO_PORT}/v1/info")
         return response.status_code == 200
-    except requests.exceptions.ConnectionError:
+    except httpx.TransportError:
         return False
 
 
@@ -91,6 +134,12 @@ class MCPClient:
         self.base_url = base_url
         self.next_id = 1
         self.initialized = False
+        # One keep-alive connection for every request instead of a new one per call
+        self._session = httpx.Client(
+            headers={"Content-Type": "application/json"},
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=1),
+            timeout=30.0  # Tool calls run real Trino queries
+        )
         
     def initialize(self) -> Dict[str, Any]:
         """Initialize the MCP session."""
@@ -138,6 +187,10 @@ class MCPClient:
         self.initialized = False
         return response
     
+    def close(self) -> None:
+        """Close the HTTP connection to the server."""
+        self._session.close()
+    
     def _send_request(self, method: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
         """Send a JSON-RPC request to the server."""
         request = {
@@ -151,15 +204,16 @@ class MCPClient:
             
         self.next_id += 1
         
-        response = requests.post(
+        # Encoded to bytes ourselves (orjson when available) rather than via json=
+        response = self._session.post(
             f"{self.base_url}/mcp/message",
-            json=request
+            content=dumps_bytes(request)
         )
         
         if response.status_code != 200:
             raise Exception(f"Request failed with status {response.status_code}: {response.text}")
             
-        return response.json()
+        return loads(response.content)
 
 
 @pytest.fixture(scope="session")
@@ -190,11 +244,14 @@ def mcp_server(trino_available) -> Iterator[None]:
         server.stop()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mcp_client(mcp_server) -> Iterator[MCPClient]:
     """
     Create a test MCP client connected to the test server.
     
+    The client is initialized once and shared by every test in the session, so
+    the whole suite runs over one MCP session and one keep-alive connection.
+    
     Args:
         mcp_server: The server fixture.
         
@@ -209,4 +266,31 @@ def mcp_client(mcp_server) -> Iterator[MCPClient]:
         try:
             client.shutdown()
         except:
-            pass  # Ignore errors during shutdown 
\ No newline at end of file
+            pass  # Ignore errors during shutdown
+        client.close()
+
+
+class FakeClock:
+    """A monotonic clock that only moves when told to."""
+    
+    def __init__(self):
+        self.now = 1000.0
+        
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    """
+    Replace time.monotonic with a FakeClock for the duration of a test.
+    
+    The modules under test call `time.monotonic()` through the time module, so
+    patching it there is enough for all of them.
+    
+    Returns:
+        FakeClock: The clock; advance it by adding to `now`.
+    """
+    clock = FakeClock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    return clock
@@ -0,0 +1,107 @@
+"""
+Tests for the per-catalog/schema async MCP session pool.
+"""
+import asyncio
+
+from async_mcp import AsyncMCPPool
+
+
+class FakeSession:
+    """Stands in for AsyncMCPSession; only records how it was made and closed."""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    return AsyncMCPPool(session_factory=FakeSession, **kwargs)
+
+
+def test_same_catalog_and_schema_share_a_session(clock):
+    pool = make_pool()
+
+    async def run():
+        async with pool.acquire("memory", "bullshit") as first:
+            async with pool.acquire("memory", "bullshit") as second:
+                assert second is first
+                assert pool._entries[("memory", "bullshit")].refcount == 2
+            assert pool._entries[("memory", "bullshit")].refcount == 1
+        async with pool.acquire("memory", "bullshit") as third:
+            assert third is first
+        async with pool.acquire("memory", "tiny") as other:
+            assert other is not first
+        return first
+
+    session = asyncio.run(run())
+    assert pool._entries[("memory", "bullshit")].refcount == 0
+    assert not session.closed
+
+
+def test_least_recently_used_idle_session_is_evicted(clock):
+    pool = make_pool(max_sessions=2)
+
+    async def run():
+        sessions = {}
+        for catalog in ("a", "b", "a", "c"):
+            async with pool.acquire(catalog) as session:
+                sessions[catalog] = session
+        return sessions
+
+    sessions = asyncio.run(run())
+    assert sessions["b"].closed
+    assert not sessions["a"].closed and not sessions["c"].closed
+    assert list(pool._entries) == [("a", None), ("c", None)]
+
+
+def test_sessions_in_use_are_never_evicted(clock):
+    pool = make_pool(max_sessions=1)
+
+    async def run():
+        async with pool.acquire("a") as held:
+            async with pool.acquire("b") as other:
+                pass
+            # "b" went over capacity once released; "a" is still held
+            assert other.closed
+            assert not held.closed
+        return held
+
+    held = asyncio.run(run())
+    assert not held.closed
+    assert list(pool._entries) == [("a", None)]
+
+
+def test_idle_sessions_expire(clock):
+    pool = make_pool(idle_timeout=60)
+
+    async def run():
+        async with pool.acquire("a") as old:
+            pass
+        clock.now += 61
+        async with pool.acquire("b") as new:
+            pass
+        return old, new
+
+    old, new = asyncio.run(run())
+    assert old.closed
+    assert not new.closed
+    assert list(pool._entries) == [("b", None)]
+
+
+def test_close_closes_every_session(clock):
+    pool = make_pool()
+
+    async def run():
+        async with pool.acquire("a") as a:
+            pass
+        async with pool.acquire("b") as b:
+            pass
+        await pool.close()
+        return a, b
+
+    a, b = asyncio.run(run())
+    assert a.closed and b.closed
+    assert not pool._entries
@@ -0,0 +1,233 @@
+"""
+Tests for the in-process TTL/LRU cache.
+"""
+import threading
+import time
+
+import pytest
+
+from trino_mcp.cache import TTLCache
+
+
+def test_lookup_returns_value_until_it_expires(clock):
+    cache = TTLCache(ttl=10, maxsize=4)
+    cache.put("a", 1)
+
+    clock.now += 9.9
+    assert cache.lookup("a") == 1
+
+    clock.now += 0.1
+    assert cache.lookup("a") is None
+    assert cache.lookup("a", "missing") == "missing"
+
+
+def test_cached_none_is_distinguished_from_a_miss(clock):
+    cache = TTLCache(ttl=10, maxsize=4)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return None
+
+    assert cache.get("a", load) is None
+    assert cache.get("a", load) is None
+    assert len(calls) == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(ttl=10, maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.lookup("a")  # "b" is now the least recently used
+    cache.put("c", 3)
+
+    assert cache.lookup("a") == 1
+    assert cache.lookup("b") is None
+    assert cache.lookup("c") == 3
+
+
+def test_expired_entries_are_evicted_before_live_ones(clock):
+    cache = TTLCache(ttl=10, maxsize=2)
+    cache.put("old", 1)
+    clock.now += 5
+    cache.put("new", 2)
+    cache.lookup("old")  # Most recently used, but the first to expire
+    clock.now += 6
+    cache.put("newer", 3)
+
+    assert cache.lookup("old") is None
+    assert cache.lookup("new") == 2
+    assert cache.lookup("newer") == 3
+
+
+def test_overwriting_a_key_evicts_nothing(clock):
+    cache = TTLCache(ttl=10, maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("a", 3)
+
+    assert cache.lookup("a") == 3
+    assert cache.lookup("b") == 2
+
+
+def test_get_passes_arguments_to_load_and_caches_the_result(clock):
+    cache = TTLCache(ttl=10, maxsize=4)
+    calls = []
+
+    def load(x, y):
+        calls.append((x, y))
+        return x + y
+
+    assert cache.get("k", load, 1, 2) == 3
+    assert cache.get("k", load, 1, 2) == 3
+    assert calls == [(1, 2)]
+
+    clock.now += 10
+    assert cache.get("k", load, 1, 2) == 3
+    assert len(calls) == 2
+
+
+def test_failed_load_is_not_cached(clock):
+    cache = TTLCache(ttl=10, maxsize=4)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get("k", fail)
+    assert cache.get("k", lambda: "loaded") == "loaded"
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache(ttl=60, maxsize=4)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("k", load))) for _ in range(8)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)  # Let the others reach the key lock
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+    assert cache._loading == {}
+
+
+def run_concurrently(cache, load, callers=4):
+    """Call cache.get("k", load) from several threads while the first load blocks."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_load():
+        started.set()
+        release.wait(5)
+        return load()
+
+    outcomes = []
+
+    def call():
+        try:
+            outcomes.append(cache.get("k", blocking_load))
+        except Exception as e:
+            outcomes.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)  # Let the others join the running load
+    return release, threads, outcomes
+
+
+def test_value_too_costly_to_store_is_still_shared():
+    cache = TTLCache(ttl=60, maxsize=4, max_cost=10, cost=len, max_entry_cost=4)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return "x" * 100
+
+    release, threads, outcomes = run_concurrently(cache, load)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert outcomes == ["x" * 100] * 4
+    assert len(calls) == 1
+    assert cache.lookup("k") is None
+
+
+def test_failed_load_is_raised_to_every_caller_sharing_it():
+    cache = TTLCache(ttl=60, maxsize=4)
+
+    def load():
+        raise RuntimeError("boom")
+
+    release, threads, outcomes = run_concurrently(cache, load)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(outcomes) == 4
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert cache._loading == {}
+
+
+def test_load_running_across_clear_is_not_stored():
+    cache = TTLCache(ttl=60, maxsize=4)
+
+    release, threads, outcomes = run_concurrently(cache, lambda: "stale", callers=1)
+    cache.clear()  # e.g. a write ran while the read was in flight
+    # A miss after the clear does not share the stale load
+    assert cache.get("k", lambda: "fresh") == "fresh"
+    release.set()
+    threads[0].join(5)
+
+    assert outcomes == ["stale"]
+    assert cache.lookup("k") == "fresh"
+
+
+def test_clear_forgets_everything(clock):
+    cache = TTLCache(ttl=10, maxsize=4, max_cost=100, cost=len)
+    cache.put("a", "xx")
+    cache.clear()
+
+    assert cache.lookup("a") is None
+    assert cache._total_cost == 0
+
+
+def test_total_cost_is_bounded(clock):
+    cache = TTLCache(ttl=10, maxsize=10, max_cost=10, cost=len)
+    cache.put("a", "xxxx")
+    cache.put("b", "xxxx")
+    cache.put("c", "xxxx")  # Pushes out "a", the least recently used
+
+    assert cache.lookup("a") is None
+    assert cache.lookup("b") == "xxxx"
+    assert cache.lookup("c") == "xxxx"
+    assert cache._total_cost == 8
+
+
+def test_entries_costing_too_much_are_not_stored(clock):
+    cache = TTLCache(ttl=10, maxsize=10, max_cost=10, cost=len, max_entry_cost=4)
+    cache.put("small", "xxxx")
+    cache.put("big", "xxxxx")
+
+    assert cache.lookup("small") == "xxxx"
+    assert cache.lookup("big") is None
+    assert cache.get("big", lambda: "xxxxx") == "xxxxx"
+    assert cache.lookup("big") is None
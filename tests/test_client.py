@@ -3,84 +3,152 @@
 Simple test script for the Trino MCP client.
 This script connects to the Trino MCP server and performs some basic operations.
 """
+import asyncio
 import json
 import os
+import re
 import sys
 import time
-import threading
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Tuple, Union
 
-import requests
-import sseclient
+import httpx
+from httpx_sse import connect_sse
 import logging
 from rich.console import Console
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
+
+loads = orjson.loads if orjson is not None else json.loads
+
 # Default port for MCP server, changed to match docker-compose.yml
 DEFAULT_MCP_HOST = "localhost"
 DEFAULT_MCP_PORT = 9096
 
 
+# The blank line that ends an SSE event
+_EVENT_END = re.compile(rb"\r\n\r\n|\n\n|\r\r")
+
+
 class SSEListener:
     """
     Server-Sent Events (SSE) listener for MCP.
-    This runs in a separate thread to receive notifications from the server.
+    This runs as an asyncio task on the caller's event loop to receive
+    notifications from the server.
     """
     
-    def __init__(self, url: str, message_callback: Callable[[Dict[str, Any]], None]):
+    def __init__(
+        self,
+        url: str,
+        message_callback: Union[Callable[[Dict[str, Any]], None], List[Callable[[Dict[str, Any]], None]]]
+    ):
         """
         Initialize the SSE listener.
         
         Args:
             url: The SSE endpoint URL.
-            message_callback: Callback function to handle incoming messages.
+            message_callback: Callback function (or list of them) to handle incoming
+                messages; each message is parsed once and passed to every callback.
         """
         self.url = url
-        self.message_callback = message_callback
+        self.callbacks = list(message_callback) if isinstance(message_callback, list) else [message_callback]
         self.running = False
-        self.thread = None
+        self.task: Optional[asyncio.Task] = None
         
-    def start(self) -> None:
-        """Start the SSE listener in a separate thread."""
+    async def start(self) -> None:
+        """Start the SSE listener as a background task."""
         if self.running:
             return
             
         self.running = True
-        self.thread = threading.Thread(target=self._listen)
-        self.thread.daemon = True
-        self.thread.start()
+        self.task = asyncio.create_task(self._listen())
         
-    def stop(self) -> None:
+    async def stop(self) -> None:
         """Stop the SSE listener."""
         self.running = False
-        if self.thread:
-            self.thread.join(timeout=1.0)
-            self.thread = None
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+    
+    def run(self) -> None:
+        """Listen in the foreground until the stream ends, for callers without an event loop."""
+        self.running = True
+        asyncio.run(self._listen())
             
-    def _listen(self) -> None:
+    async def _listen(self) -> None:
         """Listen for SSE events."""
         try:
             headers = {"Accept": "text/event-stream"}
-            response = requests.get(self.url, headers=headers, stream=True)
-            client = sseclient.SSEClient(response)
-            
-            for event in client.events():
-                if not self.running:
-                    break
-                    
-                try:
-                    if event.data:
-                        data = json.loads(event.data)
-                        self.message_callback(data)
-                except json.JSONDecodeError:
-                    print(f"Failed to parse SSE message: {event.data}")
-                except Exception as e:
-                    print(f"Error processing SSE message: {e}")
+            async with httpx.AsyncClient(timeout=None) as client:
+                async with client.stream("GET", self.url, headers=headers) as response:
+                    # Events are framed straight from the raw bytes: each one ends
+                    # with a blank line, whatever line endings the server uses
+                    buffer = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        if not self.running:
+                            break
+                        
+                        buffer += chunk
+                        start = 0
+                        while True:
+                            end = _EVENT_END.search(buffer, start)
+                            if end is None:
+                                break
+                            self._dispatch(bytes(buffer[start:end.start()]))
+                            start = end.end()
+                        del buffer[:start]
                     
         except Exception as e:
             if self.running:
                 print(f"SSE connection error: {e}")
         finally:
             self.running = False
+    
+    def _dispatch(self, event: bytes) -> None:
+        """Parse one event's data and hand it to every callback."""
+        data = b"\n".join(
+            line[6:] if line.startswith(b"data: ") else line[5:]
+            for line in event.splitlines() if line.startswith(b"data:")
+        )
+        if not data:
+            return  # Comments and keep-alives carry no data
+        
+        try:
+            message = loads(data)
+        except json.JSONDecodeError:
+            print(f"Failed to parse SSE message: {data.decode('utf-8', 'replace')}")
+            return
+        
+        for callback in self.callbacks:
+            try:
+                callback(message)
+            except Exception as e:
+                print(f"Error processing SSE message: {e}")
+
+
+async def probe_endpoint(client: httpx.AsyncClient, url: str) -> Tuple[Optional[int], str]:
+    """GET one URL; returns (status, body prefix) or (None, error message)."""
+    try:
+        response = await client.get(url)
+        return response.status_code, response.text[:500]
+    except Exception as e:
+        return None, str(e)
+
+
+async def probe_endpoints(base_url: str, endpoints: List[str]) -> List[Tuple[str, Optional[int], str]]:
+    """GET every endpoint concurrently; returns (endpoint, status, body prefix or error) in order."""
+    # One pooled client with room for every probe at once; a short timeout so
+    # a hung endpoint doesn't hold up the report
+    limits = httpx.Limits(max_connections=16, max_keepalive_connections=16)
+    async with httpx.AsyncClient(timeout=2, limits=limits) as client:
+        results = await asyncio.gather(*(probe_endpoint(client, f"{base_url}{endpoint}") for endpoint in endpoints))
+    return [(endpoint, *result) for endpoint, result in zip(endpoints, results)]
 
 
 def test_sse_client(base_url=f"http://localhost:{DEFAULT_MCP_PORT}"):
@@ -94,13 +162,6 @@ def test_sse_client(base_url=f"http://localhost:{DEFAULT_MCP_PORT}"):
     
     # First, let's check what endpoints are available
     print("Checking available endpoints...")
-    try:
-        response = requests.get(base_url)
-        print(f"Root path status: {response.status_code}")
-        if response.status_code == 200:
-            print(f"Content: {response.text[:500]}")  # Print first 500 chars
-    except Exception as e:
-        print(f"Error checking root path: {e}")
     
     # Try common MCP endpoints
     endpoints_to_check = [
@@ -112,16 +173,25 @@ def test_sse_client(base_url=f"http://localhost:{DEFAULT_MCP_PORT}"):
         "/api/mcp/sse"
     ]
     
-    for endpoint in endpoints_to_check:
-        try:
-            url = f"{base_url}{endpoint}"
-            print(f"\nChecking endpoint: {url}")
-            response = requests.get(url)
-            print(f"Status: {response.status_code}")
-            if response.status_code == 200:
-                print(f"Content: {response.text[:100]}")  # Print first 100 chars
-        except Exception as e:
-            print(f"Error: {e}")
+    # The probes are independent, so send them all at once and report in order
+    root_result, *results = asyncio.run(probe_endpoints(base_url, ["", *endpoints_to_check]))
+    
+    _, status, content = root_result
+    if status is None:
+        print(f"Error checking root path: {content}")
+    else:
+        print(f"Root path status: {status}")
+        if status == 200:
+            print(f"Content: {content[:500]}")  # Print first 500 chars
+    
+    for endpoint, status, content in results:
+        print(f"\nChecking endpoint: {base_url}{endpoint}")
+        if status is None:
+            print(f"Error: {content}")
+            continue
+        print(f"Status: {status}")
+        if status == 200:
+            print(f"Content: {content[:100]}")  # Print first 100 chars
     
     # Try the /sse endpoint with proper SSE headers
     print("\nChecking SSE endpoint with proper headers...")
@@ -133,20 +203,19 @@ def test_sse_client(base_url=f"http://localhost:{DEFAULT_MCP_PORT}"):
         def handle_sse_message(message):
             print(f"Received SSE message: {message.data}")
         
-        # Use the SSEClient to connect properly
+        # httpx-sse parses the stream and sends the text/event-stream Accept header
         print("Starting SSE connection...")
-        headers = {"Accept": "text/event-stream"}
-        response = requests.get(sse_url, headers=headers, stream=True)
-        client = sseclient.SSEClient(response)
-        
-        # Try to get the first few events
-        print("Waiting for SSE events...")
-        event_count = 0
-        for event in client.events():
-            print(f"Event received: {event.data}")
-            event_count += 1
-            if event_count >= 3:  # Get at most 3 events
-                break
+        # Give up quickly if nothing is listening, but wait as long as it takes between events
+        timeout = httpx.Timeout(None, connect=2)
+        with httpx.Client(timeout=timeout) as client, connect_sse(client, "GET", sse_url) as event_source:
+            # Try to get the first few events
+            print("Waiting for SSE events...")
+            event_count = 0
+            for event in event_source.iter_sse():
+                print(f"Event received: {event.data}")
+                event_count += 1
+                if event_count >= 3:  # Get at most 3 events
+                    break
             
     except Exception as e:
         print(f"Error with SSE connection: {e}")
@@ -0,0 +1,37 @@
+"""
+Tests for the JSON encoding of query results in the HTTP API.
+"""
+import datetime
+from decimal import Decimal
+
+import pytest
+from trino.types import NamedRowTuple
+
+from trino_mcp.server import _json_dumps_bytes, dumps_bytes
+
+
+@pytest.fixture(params=["default", "stdlib"])
+def dumps(request):
+    """Both encoders: orjson (when installed) with its fallback, and the stdlib one."""
+    return dumps_bytes if request.param == "default" else _json_dumps_bytes
+
+
+@pytest.mark.parametrize("value, expected", [
+    (Decimal("12"), b"12"),
+    (Decimal("1.5"), b"1.5"),
+    (Decimal("NaN"), b"null"),
+    (Decimal("-Infinity"), b"null"),
+    (datetime.date(2024, 1, 2), b'"2024-01-02"'),
+])
+def test_values_json_has_no_type_for(dumps, value, expected):
+    assert dumps([value]) == b"[" + expected + b"]"
+
+
+def test_rows_are_encoded_as_lists(dumps):
+    row = NamedRowTuple([1, "x"], ["a", "b"], ["integer", "varchar"])
+    assert dumps({"row": row}) == b'{"row":[1,"x"]}'
+
+
+@pytest.mark.parametrize("value", [2 ** 70, Decimal("12345678901234567890123456789012345678")])
+def test_integers_beyond_64_bits_are_exact(dumps, value):
+    assert dumps({"n": value}) == b'{"n":%d}' % int(value)
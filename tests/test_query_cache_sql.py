@@ -0,0 +1,71 @@
+"""
+Tests for the SQL helpers behind the query result cache.
+"""
+import pytest
+
+from trino_mcp.trino_client import (
+    DDL_PATTERN,
+    WRITE_PATTERN,
+    canonicalize_sql,
+    is_cacheable_sql,
+    query_cache_key,
+)
+
+
+def test_canonicalize_collapses_whitespace_and_case():
+    assert canonicalize_sql("  SELECT *\n\tFROM   Foo  ;") == "select * from foo"
+
+
+def test_canonicalize_keeps_literals_and_quoted_identifiers():
+    sql = """SELECT 'Mixed  Case', "Quoted  Col" FROM t WHERE x = 'it''s  HERE'"""
+    assert canonicalize_sql(sql) == """select 'Mixed  Case', "Quoted  Col" from t where x = 'it''s  HERE'"""
+
+
+def test_differently_spelled_queries_share_a_key():
+    a = canonicalize_sql("select 1")
+    b = canonicalize_sql("SELECT\n 1;")
+    assert query_cache_key(a, "memory", "bullshit", False) == query_cache_key(b, "memory", "bullshit", False)
+
+
+@pytest.mark.parametrize("catalog, schema, explain", [
+    ("tpch", "bullshit", False),
+    ("memory", "tiny", False),
+    ("memory", None, False),
+    ("memory", "bullshit", True),
+])
+def test_key_depends_on_catalog_schema_and_explain(catalog, schema, explain):
+    sql = canonicalize_sql("select 1")
+    assert query_cache_key(sql, catalog, schema, explain) != query_cache_key(sql, "memory", "bullshit", False)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM t",
+    "WITH x AS (SELECT 1) SELECT * FROM x",
+    "SHOW CATALOGS",
+    "DESCRIBE t",
+    "VALUES 1, 2",
+    "EXPLAIN SELECT 1",
+])
+def test_reads_are_cacheable(sql):
+    assert is_cacheable_sql(canonicalize_sql(sql))
+
+
+@pytest.mark.parametrize("sql", [
+    "INSERT INTO t VALUES 1",
+    "CREATE TABLE t (x int)",
+    "DELETE FROM t",
+    "EXPLAIN ANALYZE INSERT INTO t VALUES 1",
+    "explain  analyze verbose SELECT 1",
+    "SELECT rand()",
+    "SELECT now()",
+    "SELECT current_timestamp",
+    "SELECT uuid()",
+])
+def test_writes_and_nondeterministic_queries_are_not_cacheable(sql):
+    assert not is_cacheable_sql(canonicalize_sql(sql))
+
+
+def test_explain_analyze_of_a_write_invalidates_like_the_write():
+    assert WRITE_PATTERN.match("EXPLAIN ANALYZE INSERT INTO t VALUES 1")
+    assert DDL_PATTERN.match("explain analyze verbose CREATE TABLE t AS SELECT 1")
+    assert not WRITE_PATTERN.match("EXPLAIN SELECT 1")
@@ -0,0 +1,155 @@
+"""
+Tests for TrinoClient's pooled connections and result cache, against fake DBAPI connections.
+"""
+import queue
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from trino_mcp.config import TrinoConfig
+from trino_mcp.trino_client import TrinoClient
+
+
+class FakeCursor:
+    """Answers every query with one row: the catalog and schema it ran in."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+        self.stats = {}
+
+    def execute(self, sql):
+        session = self.conn._client_session
+        self.ran_in = [session.catalog, session.schema]
+        self.conn.executed.append((sql, session.catalog, session.schema))
+        self.conn.release.wait(5)
+        self.description = [("catalog",), ("schema",)]
+        self.stats = {"queryId": f"q{len(self.conn.executed)}"}
+
+    def fetchall(self):
+        return [self.ran_in]
+
+
+class FakeConnection:
+    def __init__(self, catalog, executed, release):
+        self._client_session = SimpleNamespace(catalog=catalog, schema=None)
+        self.catalog = catalog
+        self.executed = executed
+        self.release = release
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def release():
+    """Set to let queries finish; clear it to hold them in execute()."""
+    event = threading.Event()
+    event.set()
+    return event
+
+
+def make_client(release, pool_size=4):
+    """A client whose pool holds fake connections; `client.executed` logs their queries."""
+    client = TrinoClient(TrinoConfig(catalog="memory", schema="bullshit", pool_size=pool_size))
+    client.executed = []
+    client._pool = queue.LifoQueue()
+    for _ in range(pool_size):
+        client._pool.put(FakeConnection("memory", client.executed, release))
+    return client
+
+
+@pytest.fixture
+def client(release):
+    return make_client(release)
+
+
+@pytest.mark.parametrize("catalog, schema, expected", [
+    (None, None, ("memory", "bullshit")),
+    ("memory", None, ("memory", "bullshit")),
+    ("tpch", None, ("tpch", None)),
+    ("tpch", "tiny", ("tpch", "tiny")),
+    (None, "other", ("memory", "other")),
+])
+def test_resolve_target(client, catalog, schema, expected):
+    assert client.resolve_target(catalog, schema) == expected
+
+
+def test_catalog_and_schema_are_set_per_call_on_pooled_connections(release):
+    client = make_client(release, pool_size=1)
+
+    assert client.execute_query("SELECT 1", "tpch", "tiny").rows == [["tpch", "tiny"]]
+    # The same connection, with nothing left over from the previous call
+    assert client.execute_query("SELECT 1").rows == [["memory", "bullshit"]]
+    assert client.execute_query("SELECT 1", "tpch").rows == [["tpch", None]]
+    assert client.current_catalog == "memory"
+    assert client.current_schema == "bullshit"
+
+
+def test_repeated_query_is_a_hit(client):
+    first, status = client.execute_cached("SELECT 1")
+    assert status == "MISS"
+
+    second, status = client.execute_cached("select  1;")
+    assert status == "HIT"
+    assert second is first
+    assert len(client.executed) == 1
+
+
+def test_cache_key_includes_the_target(client):
+    client.execute_cached("SELECT 1")
+    _, status = client.execute_cached("SELECT 1", "tpch", "tiny")
+
+    assert status == "MISS"
+    assert len(client.executed) == 2
+
+
+def test_uncacheable_queries_always_run(client):
+    for _ in range(2):
+        _, status = client.execute_cached("SELECT rand()")
+        assert status == "MISS"
+    assert len(client.executed) == 2
+
+
+def test_concurrent_identical_queries_share_one_execution(client, release):
+    release.clear()
+    statuses = []
+    threads = [
+        threading.Thread(target=lambda: statuses.append(client.execute_cached("SELECT 1")[1]))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)  # Let all three reach the cache
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert sorted(statuses) == ["MISS", "SHARED", "SHARED"]
+    assert len(client.executed) == 1
+
+
+def test_writes_clear_the_result_cache(client):
+    client.execute_cached("SELECT 1")
+    client.metadata_cache.put(("catalogs",), [{"name": "memory"}])
+    client.execute_query("INSERT INTO t VALUES 1")
+
+    _, status = client.execute_cached("SELECT 1")
+    assert status == "MISS"
+    # Writes leave metadata alone
+    assert client.metadata_cache.lookup(("catalogs",)) == [{"name": "memory"}]
+
+
+def test_ddl_clears_the_metadata_and_result_caches(client):
+    client.execute_cached("SELECT 1")
+    client.metadata_cache.put(("catalogs",), [{"name": "memory"}])
+    client.execute_query("CREATE TABLE t (x int)")
+
+    assert client.metadata_cache.lookup(("catalogs",)) is None
+    _, status = client.execute_cached("SELECT 1")
+    assert status == "MISS"
@@ -0,0 +1,122 @@
+"""
+Tests for the Trino DBAPI connection pool.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from trino_pool import TrinoConnectionPool
+
+
+class FakeConnection:
+    """Stands in for a trino.dbapi.Connection, with the session it keeps settings on."""
+
+    def __init__(self, fail_close=False):
+        self._client_session = SimpleNamespace(catalog="memory", schema=None)
+        self.closed = False
+        self.fail_close = fail_close
+
+    def close(self):
+        self.closed = True
+        if self.fail_close:
+            raise RuntimeError("close failed")
+
+
+class Factory:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.made = []
+
+    def __call__(self):
+        conn = FakeConnection(**self.kwargs)
+        self.made.append(conn)
+        return conn
+
+
+def test_connections_are_reused():
+    factory = Factory()
+    pool = TrinoConnectionPool(factory, size=2)
+
+    with pool.acquire() as first:
+        pass
+    with pool.acquire() as second:
+        pass
+
+    assert second is first
+    assert len(factory.made) == 1
+
+
+def test_connection_is_discarded_when_the_block_raises():
+    factory = Factory()
+    pool = TrinoConnectionPool(factory, size=1, timeout=0.1)
+
+    with pytest.raises(ValueError):
+        with pool.acquire() as broken:
+            raise ValueError("query failed")
+
+    assert broken.closed
+    # The slot came back, and the broken connection did not
+    with pool.acquire() as conn:
+        assert conn is not broken
+    assert len(factory.made) == 2
+
+
+def test_discard_ignores_close_errors():
+    pool = TrinoConnectionPool(Factory(fail_close=True), size=1, timeout=0.1)
+
+    with pytest.raises(ValueError):
+        with pool.acquire():
+            raise ValueError("query failed")
+
+    with pool.acquire():
+        pass
+
+
+def test_failed_connect_releases_its_slot():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("Trino is down")
+        return FakeConnection()
+
+    pool = TrinoConnectionPool(factory, size=1, timeout=0.1)
+    with pytest.raises(ConnectionError):
+        with pool.acquire():
+            pass
+    with pool.acquire():
+        pass
+
+
+def test_exhausted_pool_times_out():
+    pool = TrinoConnectionPool(Factory(), size=1, timeout=0.05)
+
+    with pool.acquire():
+        with pytest.raises(TimeoutError):
+            with pool.acquire():
+                pass
+
+
+def test_catalog_and_schema_are_restored_before_reuse():
+    pool = TrinoConnectionPool(Factory(), size=1)
+
+    with pool.acquire("tpch", "tiny") as conn:
+        assert (conn._client_session.catalog, conn._client_session.schema) == ("tpch", "tiny")
+        # What a USE sent back by the server would leave behind
+        conn._client_session.schema = "sf1"
+
+    with pool.acquire() as reused:
+        assert reused is conn
+        assert (reused._client_session.catalog, reused._client_session.schema) == ("memory", None)
+
+
+def test_close_closes_idle_connections():
+    factory = Factory()
+    pool = TrinoConnectionPool(factory, size=2)
+
+    with pool.acquire():
+        pass
+    pool.close()
+
+    assert factory.made[0].closed
@@ -2,149 +2,221 @@
 """
 Create a bullshit parquet file full of random silly data for Trino to query.
 """
+import argparse
+import itertools
 import os
+import string
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
-import string
 
-# Make this shit reproducible
-random.seed(42069)
-np.random.seed(42069)
+# Make this shit reproducible: every random column is drawn from this one generator
+rng = np.random.default_rng(42069)
 
-def random_company_name():
-    """Generate a ridiculous startup name."""
-    prefixes = ["Block", "Hash", "Crypto", "Data", "Quantum", "Neural", "Cloud", "Cyber", "Meta", "Digital", 
-                "AI", "ML", "Algo", "Bit", "Logic", "Hyper", "Ultra", "Deep", "Sync", "Tech"]
-    suffixes = ["Chain", "Flow", "Mind", "Logic", "Base", "Scale", "Cube", "Stream", "Grid", "Verse", 
-                "Net", "Ware", "Hub", "Pulse", "Sense", "Node", "Edge", "Core", "Link", "Matrix"]
-    
-    return f"{random.choice(prefixes)}{random.choice(suffixes)}"
-
-def random_bullshit_job_title():
-    """Generate a bullshit job title."""
-    prefix = ["Chief", "Senior", "Lead", "Global", "Dynamic", "Principal", "Executive", "Head of", 
-              "Director of", "VP of", "Distinguished", "Advanced", "Master", "Innovation", "Transformation"]
-    middle = ["Digital", "Data", "Blockchain", "AI", "Experience", "Product", "Solutions", "Technical", 
-              "Strategic", "Cloud", "Enterprise", "Creative", "Platform", "Innovation", "Disruption"]
-    suffix = ["Officer", "Architect", "Evangelist", "Guru", "Ninja", "Rockstar", "Wizard", "Jedi", 
-              "Explorer", "Catalyst", "Visionary", "Storyteller", "Hacker", "Champion", "Designer"]
-    
-    return f"{random.choice(prefix)} {random.choice(middle)} {random.choice(suffix)}"
+# Rows generated, converted and written at a time, so memory use stays bounded
+# however many rows are asked for
+BATCH_ROWS = 100_000
 
-def random_email(name):
-    """Generate a random email based on a name."""
-    domains = ["gmail.com", "hotmail.com", "yahoo.com", "outlook.com", "icloud.com", 
-               "protonmail.com", "example.com", "bullshit.io", "fakeaf.dev", "notreal.net"]
-    
-    name_part = name.lower().replace(" ", "")
-    return f"{name_part}{random.randint(1, 999)}@{random.choice(domains)}"
-
-def random_ip():
-    """Generate a random IP address."""
-    return f"{random.randint(1, 255)}.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(0, 255)}"
-
-def random_name():
-    """Generate a random person name."""
-    first_names = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", 
-                   "William", "Elizabeth", "David", "Susan", "Richard", "Jessica", "Joseph", "Sarah", 
-                   "Thomas", "Karen", "Charles", "Nancy", "Skyler", "Jesse", "Walter", "Saul", "Mike"]
-    
-    last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", 
-                  "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", 
-                  "White", "Goodman", "Pinkman", "Fring", "Ehrmantraut", "Schrader", "Wexler"]
-    
-    return f"{random.choice(first_names)} {random.choice(last_names)}"
+# Low-cardinality string columns, stored as categories
+CATEGORY_COLUMNS = ["company", "account_status", "favorite_framework", "preferred_language", "enum_field"]
 
-def random_sentence():
-    """Generate a random bullshit sentence."""
-    subjects = ["Our company", "The team", "This product", "The algorithm", "Our platform", "The API", 
-                "Our solution", "The dashboard", "Our methodology", "The framework", "This breakthrough"]
-    
-    verbs = ["leverages", "utilizes", "implements", "optimizes", "integrates", "streamlines", "facilitates", 
-             "enables", "empowers", "revolutionizes", "disrupts", "transforms", "synergizes with"]
-    
-    adjectives = ["cutting-edge", "next-generation", "state-of-the-art", "innovative", "advanced", 
-                  "robust", "scalable", "agile", "dynamic", "intuitive", "seamless", "bleeding-edge"]
-    
-    nouns = ["blockchain", "AI", "machine learning", "cloud computing", "big data", "IoT", "microservices", 
-             "neural networks", "quantum computing", "edge computing", "digital transformation", "DevOps"]
-    
-    benefits = ["increasing efficiency", "maximizing ROI", "driving growth", "boosting productivity", 
-                "enhancing performance", "reducing overhead", "optimizing workflows", "minimizing downtime", 
-                "accelerating innovation", "enabling scalability", "facilitating collaboration"]
-    
-    return f"{random.choice(subjects)} {random.choice(verbs)} {random.choice(adjectives)} {random.choice(nouns)} for {random.choice(benefits)}."
+# Word pools as fixed-width NumPy string arrays, so drawing from them and
+# joining the draws never creates a Python str per row
+COMPANY_PREFIXES = np.array(["Block", "Hash", "Crypto", "Data", "Quantum", "Neural", "Cloud", "Cyber", "Meta", "Digital", 
+                            "AI", "ML", "Algo", "Bit", "Logic", "Hyper", "Ultra", "Deep", "Sync", "Tech"])
+COMPANY_SUFFIXES = np.array(["Chain", "Flow", "Mind", "Logic", "Base", "Scale", "Cube", "Stream", "Grid", "Verse", 
+                            "Net", "Ware", "Hub", "Pulse", "Sense", "Node", "Edge", "Core", "Link", "Matrix"])
+JOB_TITLE_PREFIXES = np.array(["Chief", "Senior", "Lead", "Global", "Dynamic", "Principal", "Executive", "Head of", 
+                              "Director of", "VP of", "Distinguished", "Advanced", "Master", "Innovation", "Transformation"])
+JOB_TITLE_MIDDLES = np.array(["Digital", "Data", "Blockchain", "AI", "Experience", "Product", "Solutions", "Technical", 
+                             "Strategic", "Cloud", "Enterprise", "Creative", "Platform", "Innovation", "Disruption"])
+JOB_TITLE_SUFFIXES = np.array(["Officer", "Architect", "Evangelist", "Guru", "Ninja", "Rockstar", "Wizard", "Jedi", 
+                              "Explorer", "Catalyst", "Visionary", "Storyteller", "Hacker", "Champion", "Designer"])
+EMAIL_DOMAINS = np.array(["gmail.com", "hotmail.com", "yahoo.com", "outlook.com", "icloud.com", 
+                         "protonmail.com", "example.com", "bullshit.io", "fakeaf.dev", "notreal.net"])
+FIRST_NAMES = np.array(["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", 
+                       "William", "Elizabeth", "David", "Susan", "Richard", "Jessica", "Joseph", "Sarah",
+                       "Thomas", "Karen", "Charles", "Nancy", "Skyler", "Jesse", "Walter", "Saul", "Mike"])
+LAST_NAMES = np.array(["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", 
+                      "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson",
+                      "White", "Goodman", "Pinkman", "Fring", "Ehrmantraut", "Schrader", "Wexler"])
+SENTENCE_SUBJECTS = np.array(["Our company", "The team", "This product", "The algorithm", "Our platform", "The API", 
+                             "Our solution", "The dashboard", "Our methodology", "The framework", "This breakthrough"])
+SENTENCE_VERBS = np.array(["leverages", "utilizes", "implements", "optimizes", "integrates", "streamlines", "facilitates", 
+                          "enables", "empowers", "revolutionizes", "disrupts", "transforms", "synergizes with"])
+SENTENCE_ADJECTIVES = np.array(["cutting-edge", "next-generation", "state-of-the-art", "innovative", "advanced", 
+                               "robust", "scalable", "agile", "dynamic", "intuitive", "seamless", "bleeding-edge"])
+SENTENCE_NOUNS = np.array(["blockchain", "AI", "machine learning", "cloud computing", "big data", "IoT", "microservices", 
+                          "neural networks", "quantum computing", "edge computing", "digital transformation", "DevOps"])
+SENTENCE_BENEFITS = np.array(["increasing efficiency", "maximizing ROI", "driving growth", "boosting productivity", 
+                             "enhancing performance", "reducing overhead", "optimizing workflows", "minimizing downtime",
+                             "accelerating innovation", "enabling scalability", "facilitating collaboration"])
 
-def generate_bullshit_data(num_rows=1000):
-    """Generate a DataFrame of complete bullshit data."""
-    print(f"Generating {num_rows} rows of absolute bullshit...")
+# Lower-cases and drops spaces in a single pass when turning names into emails
+EMAIL_NAME_TRANS = str.maketrans(string.ascii_uppercase, string.ascii_lowercase, " ")
+
+def join_words(*parts, sep=" "):
+    """Join equal-length string arrays element-wise, whole arrays at a time."""
+    joined = parts[0]
+    for part in parts[1:]:
+        joined = np.char.add(np.char.add(joined, sep), part) if sep else np.char.add(joined, part)
+    return joined
+
+def random_company_names(num_rows):
+    """Generate ridiculous startup names."""
+    return join_words(rng.choice(COMPANY_PREFIXES, num_rows), rng.choice(COMPANY_SUFFIXES, num_rows), sep="")
+
+def random_bullshit_job_titles(num_rows):
+    """Generate bullshit job titles."""
+    return join_words(
+        rng.choice(JOB_TITLE_PREFIXES, num_rows), rng.choice(JOB_TITLE_MIDDLES, num_rows),
+        rng.choice(JOB_TITLE_SUFFIXES, num_rows)
+    )
+
+def random_emails(names):
+    """Generate random emails based on names."""
+    num_rows = len(names)
+    name_part = np.char.translate(names, EMAIL_NAME_TRANS)
+    local_part = join_words(name_part, rng.integers(1, 1000, num_rows).astype(str), sep="")
+    return join_words(local_part, rng.choice(EMAIL_DOMAINS, num_rows), sep="@")
+
+def random_ips(num_rows):
+    """Generate random IP addresses."""
+    octets = rng.integers(0, 256, (num_rows, 4))
+    octets[:, 0] = rng.integers(1, 256, num_rows)
+    return join_words(*octets.T.astype(str), sep=".")
+
+def random_names(num_rows):
+    """Generate random person names."""
+    return join_words(rng.choice(FIRST_NAMES, num_rows), rng.choice(LAST_NAMES, num_rows))
+
+def random_sentences(num_rows):
+    """Generate random bullshit sentences."""
+    sentences = join_words(
+        rng.choice(SENTENCE_SUBJECTS, num_rows), rng.choice(SENTENCE_VERBS, num_rows),
+        rng.choice(SENTENCE_ADJECTIVES, num_rows), rng.choice(SENTENCE_NOUNS, num_rows),
+        np.full(num_rows, "for"), rng.choice(SENTENCE_BENEFITS, num_rows)
+    )
+    return np.char.add(sentences, ".")
+
+def random_timestamps(num_rows, max_days_ago):
+    """Generate whole-second timestamps up to max_days_ago days in the past.
+    
+    Kept as datetime64 rather than formatted strings, so parquet stores them as
+    timestamp[us] and Trino sees a TIMESTAMP column instead of a VARCHAR.
+    """
+    now = pd.Timestamp.now().floor("s")
+    seconds_ago = rng.integers(0, max_days_ago * 86400 + 1, num_rows).astype("timedelta64[s]")
+    return (now - pd.to_timedelta(seconds_ago)).as_unit("us")
+
+def generate_bullshit_data(num_rows=1000, first_id=1):
+    """Generate a DataFrame of complete bullshit data, with ids counting up from first_id."""
+    # Columns other fields are derived from
+    names = random_names(num_rows)
+    bugs_created = rng.integers(0, 100, num_rows)
+    fix_rate = rng.uniform(0.5, 1.2, num_rows)  # Sometimes they fix more bugs than they create!
     
     # Generate random data
     data = {
-        "id": list(range(1, num_rows + 1)),
-        "name": [random_name() for _ in range(num_rows)],
-        "email": [],  # Will fill after generating names
-        "company": [random_company_name() for _ in range(num_rows)],
-        "job_title": [random_bullshit_job_title() for _ in range(num_rows)],
-        "salary": np.random.normal(150000, 50000, num_rows).astype(int),  # Ridiculously high tech salaries
-        "bullshit_factor": np.random.randint(1, 11, num_rows),  # On a scale of 1-10
-        "ip_address": [random_ip() for _ in range(num_rows)],
-        "created_at": [(datetime.now() - timedelta(days=random.randint(0, 365 * 3))).strftime('%Y-%m-%d %H:%M:%S') for _ in range(num_rows)],
-        "last_active": [(datetime.now() - timedelta(days=random.randint(0, 30))).strftime('%Y-%m-%d %H:%M:%S') for _ in range(num_rows)],
-        "account_status": np.random.choice(['active', 'inactive', 'suspended', 'pending'], num_rows, p=[0.7, 0.1, 0.1, 0.1]),
-        "login_count": np.random.randint(1, 1000, num_rows),
-        "buzzword_quota": np.random.randint(5, 100, num_rows),
-        "bullshit_statement": [random_sentence() for _ in range(num_rows)],
-        "favorite_framework": np.random.choice(['React', 'Angular', 'Vue', 'Svelte', 'Django', 'Flask', 'Spring', 'Rails'], num_rows),
-        "preferred_language": np.random.choice(['Python', 'JavaScript', 'Java', 'C#', 'Go', 'Rust', 'TypeScript', 'Ruby'], num_rows),
-        "coffee_consumption": np.random.randint(1, 10, num_rows),  # Cups per day
-        "meeting_hours": np.random.randint(0, 40, num_rows),  # Hours per week
-        "actual_work_hours": np.random.randint(0, 40, num_rows),  # Hours per week
-        "bugs_created": np.random.randint(0, 100, num_rows),
-        "bugs_fixed": [], # Will calculate after bugs_created
-        "productivity_score": np.random.rand(num_rows) * 100,
-        "gitlab_commits": np.random.negative_binomial(5, 0.5, num_rows), # Most people commit very little
-        "stackoverflow_reputation": np.random.exponential(1000, num_rows).astype(int),
-        "random_float": np.random.rand(num_rows) * 100,
-        "boolean_flag": np.random.choice([True, False], num_rows),
-        "enum_field": np.random.choice(['Option A', 'Option B', 'Option C', 'Option D'], num_rows),
-        "null_percentage": np.random.rand(num_rows) * 100,
+        "id": np.arange(first_id, first_id + num_rows),
+        "name": names,
+        "email": random_emails(names),  # Email based on name
+        "company": random_company_names(num_rows),
+        "job_title": random_bullshit_job_titles(num_rows),
+        "salary": rng.normal(150000, 50000, num_rows).astype(int),  # Ridiculously high tech salaries
+        "bullshit_factor": rng.integers(1, 11, num_rows),  # On a scale of 1-10
+        "ip_address": random_ips(num_rows),
+        "created_at": random_timestamps(num_rows, 365 * 3),
+        "last_active": random_timestamps(num_rows, 30),
+        "account_status": rng.choice(['active', 'inactive', 'suspended', 'pending'], num_rows, p=[0.7, 0.1, 0.1, 0.1]),
+        "login_count": rng.integers(1, 1000, num_rows),
+        "buzzword_quota": rng.integers(5, 100, num_rows),
+        "bullshit_statement": random_sentences(num_rows),
+        "favorite_framework": rng.choice(['React', 'Angular', 'Vue', 'Svelte', 'Django', 'Flask', 'Spring', 'Rails'], num_rows),
+        "preferred_language": rng.choice(['Python', 'JavaScript', 'Java', 'C#', 'Go', 'Rust', 'TypeScript', 'Ruby'], num_rows),
+        "coffee_consumption": rng.integers(1, 10, num_rows),  # Cups per day
+        "meeting_hours": rng.integers(0, 40, num_rows),  # Hours per week
+        "actual_work_hours": rng.integers(0, 40, num_rows),  # Hours per week
+        "bugs_created": bugs_created,
+        "bugs_fixed": (bugs_created * fix_rate).astype(int),  # Some percentage of bugs created
+        "productivity_score": rng.random(num_rows) * 100,
+        "gitlab_commits": rng.negative_binomial(5, 0.5, num_rows), # Most people commit very little
+        "stackoverflow_reputation": rng.exponential(1000, num_rows).astype(int),
+        "random_float": rng.random(num_rows) * 100,
+        "boolean_flag": rng.choice([True, False], num_rows),
+        "enum_field": rng.choice(['Option A', 'Option B', 'Option C', 'Option D'], num_rows),
+        "null_percentage": rng.random(num_rows) * 100,
     }
     
-    # Generate dependent fields
-    for i in range(num_rows):
-        # Email based on name
-        data["email"].append(random_email(data["name"][i]))
-        
-        # Bugs fixed is some percentage of bugs created
-        fix_rate = random.uniform(0.5, 1.2)  # Sometimes they fix more bugs than they create!
-        data["bugs_fixed"].append(int(data["bugs_created"][i] * fix_rate))
+    # Create DataFrame, with nullable dtypes so the NULLs below don't turn
+    # int and bool columns into float or object
+    df = pd.DataFrame(data).convert_dtypes()
     
-    # Create DataFrame
-    df = pd.DataFrame(data)
+    # Add some NULL values for realism: one mask for the whole frame
+    null_mask = rng.random(df.shape) < 0.05  # 5% chance of NULL
+    null_mask[:, df.columns.get_loc("id")] = False  # Keep id intact
+    df = df.mask(null_mask)
     
-    # Add some NULL values for realism
-    for col in df.columns:
-        if col != 'id':  # Keep id intact
-            null_mask = np.random.random(num_rows) < 0.05  # 5% chance of NULL
-            df.loc[null_mask, col] = None
+    # Categories hold each distinct value once plus small integer codes per row,
+    # and are written to parquet dictionary encoded
+    df[CATEGORY_COLUMNS] = df[CATEGORY_COLUMNS].astype("category")
     
     return df
 
+def generate_bullshit_batches(num_rows, batch_rows=BATCH_ROWS):
+    """Yield num_rows rows of bullshit as DataFrames of at most batch_rows rows."""
+    print(f"Generating {num_rows} rows of absolute bullshit...")
+    for first_id in range(1, num_rows + 1, batch_rows):
+        yield generate_bullshit_data(min(batch_rows, num_rows + 1 - first_id), first_id)
+
+def write_parquet(batches, path):
+    """
+    Stream frames into one parquet file with pyarrow: ZSTD compressed,
+    dictionary encoded, 1MB pages. Only one frame is converted at a time.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    batches = iter(batches)
+    first = pa.Table.from_pandas(next(batches), preserve_index=False)
+    # Every batch is converted to one schema. Category columns get int32
+    # dictionary indices up front: pandas picks the narrowest width per batch,
+    # which could otherwise differ between row groups
+    schema = pa.schema(
+        [
+            field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+            if pa.types.is_dictionary(field.type) else field
+            for field in first.schema
+        ],
+        metadata=first.schema.metadata
+    )
+    first = first.cast(schema)
+    with pq.ParquetWriter(
+        path, schema,
+        compression="zstd", compression_level=3,
+        use_dictionary=True, write_statistics=True,
+        data_page_size=1 << 20
+    ) as writer:
+        writer.write_table(first)
+        for df in batches:
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+
 def main():
     """Main function to create and save the bullshit data."""
+    parser = argparse.ArgumentParser(description="Create a bullshit parquet file for Trino")
+    parser.add_argument("--csv", action="store_true", help="Also save a CSV copy for easy inspection")
+    args = parser.parse_args()
+    
     # Create data directory if it doesn't exist
     data_dir = "data"
     os.makedirs(data_dir, exist_ok=True)
     
-    # Generate bullshit data
-    df = generate_bullshit_data(num_rows=10000)  # 10,000 rows of pure nonsense
+    # Generate bullshit data, keeping the first batch around to show
+    batches = generate_bullshit_batches(num_rows=10000)  # 10,000 rows of pure nonsense
+    df = next(batches)
     
     # Save as parquet
     parquet_path = os.path.join(data_dir, "bullshit_data.parquet")
-    df.to_parquet(parquet_path, index=False)
+    write_parquet(itertools.chain([df], batches), parquet_path)
     print(f"Saved bullshit data to {parquet_path}")
     
     # Print some sample data
@@ -155,14 +227,23 @@ def main():
     print("\nColumn data types:")
     print(df.dtypes)
     
-    # Print basic stats
-    print("\nBasic statistics:")
+    # Print basic stats (of the first batch: the whole file at the default size)
+    print(f"\nBasic statistics (first {len(df)} rows):")
     print(df.describe())
     
-    # Also save as CSV for easy inspection
-    csv_path = os.path.join(data_dir, "bullshit_data.csv")
-    df.to_csv(csv_path, index=False)
-    print(f"Also saved as CSV to {csv_path} for easy inspection")
+    # Also save as CSV for easy inspection, when asked for; written by
+    # pyarrow's C++ writer (already required for the parquet file), copied
+    # over from the parquet file one row group at a time
+    if args.csv:
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+        
+        csv_path = os.path.join(data_dir, "bullshit_data.csv")
+        parquet_file = pq.ParquetFile(parquet_path)
+        with pa_csv.CSVWriter(csv_path, parquet_file.schema_arrow) as writer:
+            for batch in parquet_file.iter_batches():
+                writer.write_batch(batch)
+        print(f"Also saved as CSV to {csv_path} for easy inspection")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -3,18 +3,24 @@
 Set up the bullshit schema and table in Trino
 """
 import os
+import socket
 import time
 import trino
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from trino.exceptions import TrinoExternalError
 
 # Connect to Trino
 def connect_to_trino():
     print("Waiting for Trino to become available...")
     max_attempts = 20
-    attempt = 0
-    while attempt < max_attempts:
+    delay = 0.25  # Doubles after every failed attempt, up to 5 seconds
+    for attempt in range(1, max_attempts + 1):
         try:
+            # Probe the port first: this fails fast while Trino is still down,
+            # without going through the driver
+            socket.create_connection(("localhost", 9095), timeout=0.5).close()
+            
             conn = trino.dbapi.connect(
                 host="localhost",
                 port=9095,
@@ -31,9 +37,9 @@ def connect_to_trino():
             print("Trino is available!")
             return conn
         except Exception as e:
-            attempt += 1
-            print(f"Attempt {attempt}/{max_attempts}: Trino not yet available. Waiting 5 seconds... ({str(e)})")
-            time.sleep(5)
+            print(f"Attempt {attempt}/{max_attempts}: Trino not yet available. Waiting {delay:g} seconds... ({str(e)})")
+            time.sleep(delay)
+            delay = min(delay * 2, 5.0)
     
     raise Exception("Failed to connect to Trino after multiple attempts")
 
@@ -61,29 +67,33 @@ def create_schema(conn):
             print(f"Error creating schema: {e}")
             # Continue anyway, the error might be that the schema already exists
 
+# Map parquet (Arrow) types to Trino types
+TYPE_MAPPING = {
+    pa.int64(): 'BIGINT',
+    pa.int32(): 'INTEGER',
+    pa.float64(): 'DOUBLE',
+    pa.float32(): 'REAL',
+    pa.string(): 'VARCHAR',
+    pa.large_string(): 'VARCHAR',
+    pa.bool_(): 'BOOLEAN',
+}
+
+def trino_type(arrow_type):
+    """Return the Trino type for an Arrow type, defaulting to VARCHAR."""
+    if pa.types.is_dictionary(arrow_type):
+        # Categorical columns: Trino sees the dictionary's values
+        arrow_type = arrow_type.value_type
+    if pa.types.is_timestamp(arrow_type):
+        return 'TIMESTAMP'
+    return TYPE_MAPPING.get(arrow_type, 'VARCHAR')
+
 # Get table schema from parquet file
 def get_parquet_schema():
     print("Reading parquet file to determine schema...")
     try:
-        df = pd.read_parquet('data/bullshit_data.parquet')
-        
-        # Map pandas dtypes to Trino types
-        type_mapping = {
-            'int64': 'INTEGER',
-            'int32': 'INTEGER',
-            'float64': 'DOUBLE',
-            'float32': 'DOUBLE',
-            'object': 'VARCHAR',
-            'bool': 'BOOLEAN',
-            'datetime64[ns]': 'TIMESTAMP',
-        }
-        
-        columns = []
-        for col_name, dtype in df.dtypes.items():
-            trino_type = type_mapping.get(str(dtype), 'VARCHAR')
-            columns.append(f'"{col_name}" {trino_type}')
-        
-        return columns
+        # Only the footer is read, not the data
+        schema = pq.read_schema('data/bullshit_data.parquet')
+        return [f'"{field.name}" {trino_type(field.type)}' for field in schema]
     except Exception as e:
         print(f"Error reading parquet file: {e}")
         return None
@@ -115,15 +125,14 @@ def verify_table(conn):
     print("Verifying table creation...")
     with conn.cursor() as cursor:
         try:
-            cursor.execute("SELECT * FROM bullshit.datasets.employees LIMIT 5")
-            rows = cursor.fetchall()
-            print(f"Successfully queried table with {len(rows)} rows")
+            # Only the first row is shown, so only one is asked for
+            cursor.execute("SELECT * FROM bullshit.datasets.employees LIMIT 1")
+            row = cursor.fetchone()
+            print(f"Successfully queried table with {1 if row else 0} rows")
             
-            if rows:
+            if row:
                 print("First row:")
-                for row in rows:
-                    print(row)
-                    break
+                print(row)
         except Exception as e:
             print(f"Error verifying table: {e}")
 
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Thread-safe pool of Trino DBAPI connections.
+
+Opening a `trino.dbapi.connect` per request pays the connection set-up on every
+small query, so callers borrow an already-open connection instead:
+
+    pool = TrinoConnectionPool()
+    with pool.acquire() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+"""
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+import requests
+import trino
+from requests.adapters import HTTPAdapter
+
+# Direct Trino connection settings - override with environment variables
+TRINO_HOST = os.environ.get("TRINO_HOST", "localhost")
+TRINO_PORT = int(os.environ.get("TRINO_PORT", "9095"))
+TRINO_USER = os.environ.get("TRINO_USER", "trino")
+TRINO_CATALOG = os.environ.get("TRINO_CATALOG", "memory")
+TRINO_POOL_SIZE = int(os.environ.get("TRINO_POOL_SIZE", "10"))
+
+def create_http_session(pool_maxsize: int = TRINO_POOL_SIZE) -> requests.Session:
+    """
+    Create a keep-alive HTTP session to share between Trino connections.
+
+    Each Trino connection otherwise gets its own `requests.Session`, so every new
+    connection starts with fresh TCP (and TLS) handshakes. Retries are left to
+    the Trino client's own `max_attempts`.
+
+    Args:
+        pool_maxsize: Number of HTTP connections kept alive per host
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def default_connection_factory(http_session: Optional[requests.Session] = None) -> Any:
+    """Open a new Trino connection using the module-level settings."""
+    return trino.dbapi.connect(
+        host=TRINO_HOST,
+        port=TRINO_PORT,
+        user=TRINO_USER,
+        catalog=TRINO_CATALOG,
+        http_session=http_session
+    )
+
+class TrinoConnectionPool:
+    """
+    A bounded pool of Trino DBAPI connections.
+
+    Connections are created lazily by `factory` up to `size`; once the pool is
+    exhausted, `acquire()` blocks until another caller returns a connection.
+    """
+
+    def __init__(
+        self,
+        factory: Optional[Callable[[], Any]] = None,
+        size: int = TRINO_POOL_SIZE,
+        timeout: Optional[float] = 30.0
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            factory: Callable that opens a new connection (default: connect with the
+                module-level settings over one shared keep-alive HTTP session)
+            size: Maximum number of open connections
+            timeout: Seconds to wait for a free connection (None waits forever)
+        """
+        if factory is None:
+            http_session = create_http_session(size)
+            factory = lambda: default_connection_factory(http_session)
+        self.factory = factory
+        self.size = size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _get(self) -> Any:
+        """Take a free slot, then reuse an idle connection or open a new one."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No Trino connection available within {self.timeout} seconds")
+
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        try:
+            return self.factory()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _discard(self, conn: Any) -> None:
+        """Close a connection without returning it to the pool."""
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def acquire(self, catalog: Optional[str] = None, schema: Optional[str] = None) -> Iterator[Any]:
+        """
+        Borrow a connection for the duration of a `with` block.
+
+        The connection goes back to the pool on normal exit and is closed and
+        discarded if the block raises, so a broken connection is never reused.
+
+        Trino sends a `USE` back as session headers that the client keeps on the
+        connection, so the session catalog/schema are put back as they were before
+        the connection is returned: the next borrower never inherits them.
+
+        Args:
+            catalog: Session catalog for this borrow (default: the connection's own)
+            schema: Session schema for this borrow; only applied along with `catalog`
+        """
+        conn = self._get()
+        session = getattr(conn, "_client_session", None)
+        defaults = (session.catalog, session.schema) if session is not None else None
+        try:
+            if session is not None and catalog is not None:
+                session.catalog = catalog
+                session.schema = schema
+            yield conn
+        except BaseException:
+            self._discard(conn)
+            raise
+        else:
+            if session is not None:
+                session.catalog, session.schema = defaults
+            self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)